@@ -0,0 +1,28 @@
+"""
+QuickBite Connect - Analytics Admin
+"""
+from django.contrib import admin
+from .models import StoreDailyStats, StoreHourlyStats, ProductDailyStats
+
+
+@admin.register(StoreDailyStats)
+class StoreDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('store', 'date', 'orders_placed', 'orders_delivered', 'orders_cancelled', 'gross_revenue')
+    list_filter = ('date',)
+    search_fields = ('store__name',)
+    list_select_related = ('store',)
+
+
+@admin.register(StoreHourlyStats)
+class StoreHourlyStatsAdmin(admin.ModelAdmin):
+    list_display = ('store', 'hour', 'orders_placed', 'gross_revenue')
+    search_fields = ('store__name',)
+    list_select_related = ('store',)
+
+
+@admin.register(ProductDailyStats)
+class ProductDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('product', 'date', 'orders', 'quantity_sold', 'revenue')
+    list_filter = ('date',)
+    search_fields = ('product__name',)
+    list_select_related = ('product',)
@@ -0,0 +1,118 @@
+"""
+QuickBite Connect - Analytics Backfill
+Rebuilds the rollup tables from orders and reviews
+"""
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from products.models import Product
+from reviews.models import StoreReview, ProductReview
+from stores.models import Store
+from .models import StoreDailyStats, StoreHourlyStats, ProductDailyStats
+
+ZERO = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _ratings(review_model, target, since):
+    reviews = review_model.objects.filter(is_approved=True)
+    if since:
+        reviews = reviews.filter(created_at__gte=_start_of(since))
+    return reviews.annotate(day=TruncDate('created_at')).values(target, 'day').annotate(
+        rating_sum=Sum('rating'), rating_count=Count('id')
+    ).order_by()
+
+
+def backfill_store_stats(since=None, batch_size=1000):
+    orders = Order.objects.all()
+    if since:
+        orders = orders.filter(created_at__gte=_start_of(since))
+
+    rows = defaultdict(dict)
+    daily = orders.annotate(day=TruncDate('created_at')).values('store_id', 'day').annotate(
+        orders_placed=Count('id'),
+        orders_delivered=Count('id', filter=Q(status='delivered')),
+        orders_cancelled=Count('id', filter=Q(status='cancelled')),
+        gross_revenue=Coalesce(Sum('total_amount'), ZERO),
+        delivered_revenue=Coalesce(Sum('total_amount', filter=Q(status='delivered')), ZERO),
+    ).order_by()
+    for row in daily:
+        rows[row.pop('store_id'), row.pop('day')].update(row)
+    for row in _ratings(StoreReview, 'store_id', since):
+        rows[row.pop('store_id'), row.pop('day')].update(row)
+
+    hourly = orders.annotate(hour=TruncHour('created_at')).values('store_id', 'hour').annotate(
+        orders_placed=Count('id'), gross_revenue=Coalesce(Sum('total_amount'), ZERO)
+    ).order_by()
+
+    StoreDailyStats.objects.bulk_create(
+        [StoreDailyStats(store_id=store_id, date=day, **values) for (store_id, day), values in rows.items()],
+        batch_size=batch_size
+    )
+    StoreHourlyStats.objects.bulk_create([StoreHourlyStats(**row) for row in hourly], batch_size=batch_size)
+    return len(rows)
+
+
+def backfill_product_stats(since=None, batch_size=1000):
+    items = OrderItem.objects.filter(product__isnull=False).exclude(order__status='cancelled')
+    if since:
+        items = items.filter(order__created_at__gte=_start_of(since))
+
+    rows = defaultdict(dict)
+    daily = items.annotate(day=TruncDate('order__created_at')).values('product_id', 'day').annotate(
+        orders=Count('order_id', distinct=True),
+        quantity_sold=Sum('quantity'),
+        revenue=Coalesce(Sum('subtotal'), ZERO),
+    ).order_by()
+    for row in daily:
+        rows[row.pop('product_id'), row.pop('day')].update(row)
+    for row in _ratings(ProductReview, 'product_id', since):
+        rows[row.pop('product_id'), row.pop('day')].update(row)
+
+    ProductDailyStats.objects.bulk_create(
+        [ProductDailyStats(product_id=product_id, date=day, **values) for (product_id, day), values in rows.items()],
+        batch_size=batch_size
+    )
+    return len(rows)
+
+
+def rebuild_totals():
+    """Recompute Store.total_orders and Product.total_sold from orders"""
+    order_count = Order.objects.filter(store=OuterRef('pk')).order_by().values('store').annotate(
+        count=Count('id')
+    ).values('count')
+    sold = OrderItem.objects.filter(product=OuterRef('pk')).exclude(order__status='cancelled').order_by().values(
+        'product'
+    ).annotate(quantity=Sum('quantity')).values('quantity')
+    Store.objects.update(total_orders=Coalesce(Subquery(order_count, output_field=IntegerField()), 0))
+    Product.objects.update(total_sold=Coalesce(Subquery(sold, output_field=IntegerField()), 0))
+
+
+def backfill(since=None, batch_size=1000):
+    """
+    Replace rollup rows from since (a date; everything when None) with
+    totals recomputed from orders and approved reviews.
+
+    Hourly rows are keyed by timestamp, so the cut-off applies from the
+    start of that day. Returns (store days, product days) written.
+    """
+    with transaction.atomic():
+        for model, field in ((StoreDailyStats, 'date'), (ProductDailyStats, 'date'), (StoreHourlyStats, 'hour')):
+            rollups = model.objects.all()
+            if since:
+                cutoff = since if field == 'date' else _start_of(since)
+                rollups = rollups.filter(**{f'{field}__gte': cutoff})
+            rollups.delete()
+        stores = backfill_store_stats(since, batch_size)
+        products = backfill_product_stats(since, batch_size)
+        if not since:
+            rebuild_totals()
+    return stores, products
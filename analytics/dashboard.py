@@ -0,0 +1,86 @@
+"""
+QuickBite Connect - Store Dashboard
+Dashboard figures assembled from the rollup tables only
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+from .models import StoreDailyStats, StoreHourlyStats, ProductDailyStats
+
+DAILY_FIELDS = (
+    'orders_placed', 'orders_delivered', 'orders_cancelled',
+    'gross_revenue', 'delivered_revenue', 'rating_sum', 'rating_count',
+)
+TOP_PRODUCTS = 10
+CENT = Decimal('0.01')
+
+
+def _average_basket(revenue, orders):
+    return str((revenue / orders).quantize(CENT)) if orders else None
+
+
+def _average_rating(rating_sum, count):
+    return round(rating_sum / count, 2) if count else None
+
+
+def _figures(row):
+    return {
+        'orders_placed': row['orders_placed'],
+        'orders_delivered': row['orders_delivered'],
+        'orders_cancelled': row['orders_cancelled'],
+        'gross_revenue': str(row['gross_revenue']),
+        'delivered_revenue': str(row['delivered_revenue']),
+        'average_basket': _average_basket(row['gross_revenue'], row['orders_placed']),
+        'reviews': row['rating_count'],
+        'average_rating': _average_rating(row['rating_sum'], row['rating_count']),
+    }
+
+
+def build_dashboard(store, date_from, date_to):
+    """Totals, daily series, busiest hours and top products for a date range"""
+    daily = list(
+        StoreDailyStats.objects.filter(store=store, date__range=(date_from, date_to))
+        .order_by('date').values('date', *DAILY_FIELDS)
+    )
+    totals = {field: sum((row[field] for row in daily), Decimal(0) if 'revenue' in field else 0) for field in DAILY_FIELDS}
+
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    hours = (
+        StoreHourlyStats.objects.filter(store=store, hour__gte=start, hour__lt=end)
+        .annotate(hour_of_day=ExtractHour('hour')).values('hour_of_day')
+        .annotate(orders_placed=Sum('orders_placed'), gross_revenue=Sum('gross_revenue'))
+        .order_by('hour_of_day')
+    )
+    top_products = (
+        ProductDailyStats.objects.filter(product__store=store, date__range=(date_from, date_to))
+        .values('product_id', 'product__name')
+        .annotate(orders=Sum('orders'), quantity_sold=Sum('quantity_sold'), revenue=Sum('revenue'))
+        .filter(quantity_sold__gt=0)
+        .order_by('-revenue', '-quantity_sold')[:TOP_PRODUCTS]
+    )
+
+    return {
+        'store_id': str(store.pk),
+        'from': date_from,
+        'to': date_to,
+        'totals': _figures(totals),
+        'daily': [dict(date=row['date'], **_figures(row)) for row in daily],
+        'hours': [
+            {'hour': row['hour_of_day'], 'orders_placed': row['orders_placed'], 'gross_revenue': str(row['gross_revenue'])}
+            for row in hours
+        ],
+        'top_products': [
+            {
+                'product_id': str(row['product_id']),
+                'name': row['product__name'],
+                'orders': row['orders'],
+                'quantity_sold': row['quantity_sold'],
+                'revenue': str(row['revenue']),
+            }
+            for row in top_products
+        ],
+    }
@@ -0,0 +1,28 @@
+"""
+QuickBite Connect - Backfill Analytics Command
+Rebuilds the dashboard rollup tables from orders and reviews
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from analytics.backfill import backfill
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds store/product daily and hourly rollups (and order/sales counters) from raw orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild rollups from this date (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('--since must be a date (YYYY-MM-DD)')
+
+        stores, products = backfill(since, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {stores} store days and {products} product days'
+            + ('' if since else ', store order counts and product sales')
+        ))
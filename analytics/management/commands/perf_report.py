@@ -0,0 +1,74 @@
+"""
+QuickBite Connect - Performance Report Command
+Prints per-endpoint latency percentiles and SQL statistics
+"""
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from config.profiling import buffer, summarize
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints p50/p95/p99, SQL counts and likely N+1 queries per endpoint, either from a running '
+        "server's /api/_perf/ or by replaying requests in this process"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://localhost:8000')
+        parser.add_argument('--user', help='Staff email for --url (HTTP basic auth)')
+        parser.add_argument('--password', help='Password for --user')
+        parser.add_argument('--path', action='append', help='Path to request in-process (repeatable)')
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per --path')
+        parser.add_argument('--as-user', help='Email of the user to make --path requests as')
+        parser.add_argument('--top', type=int, default=20, help='Endpoints to show')
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == bool(options['path']):
+            raise CommandError('Pass either --url or one or more --path')
+        endpoints = self.fetch(options) if options['url'] else self.replay(options)
+        if not endpoints:
+            self.stdout.write(self.style.WARNING('No samples recorded (is PROFILING_SAMPLE_RATE > 0?)'))
+            return
+        self.print_report(endpoints[:options['top']])
+
+    def fetch(self, options):
+        auth = (options['user'], options['password']) if options['user'] else None
+        try:
+            response = requests.get(f"{options['url'].rstrip('/')}/api/_perf/", auth=auth, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise CommandError(f'Could not fetch the profile: {e}')
+        return response.json()['endpoints']
+
+    def replay(self, options):
+        client = Client(HTTP_HOST=next((host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost'))
+        if options['as_user']:
+            try:
+                client.force_login(User.objects.get(email=options['as_user']))
+            except User.DoesNotExist:
+                raise CommandError(f"No user {options['as_user']}")
+
+        buffer.clear()
+        with override_settings(PROFILING_SAMPLE_RATE=1.0):
+            for path in options['path']:
+                for _ in range(options['repeat']):
+                    client.get(path)
+        return summarize(buffer.snapshot())
+
+    def print_report(self, endpoints):
+        header = f"{'endpoint':<48} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'sql ms':>8} {'bytes':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in endpoints:
+            self.stdout.write(
+                f"{row['endpoint'][:48]:<48} {row['count']:>5} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['p99_ms']:>8.1f} {row['avg_queries']:>8.1f} {row['avg_sql_ms']:>8.1f} "
+                f"{row['avg_bytes'] if row['avg_bytes'] is not None else '-':>9}"
+            )
+            for duplicate in row['duplicate_queries']:
+                self.stdout.write(self.style.WARNING(
+                    f"    x{duplicate['max_per_request']} per request: {duplicate['sql'][:110]}"
+                ))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0005_product_search_vector'),
+        ('stores', '0004_store_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Daily Stats',
+                'verbose_name_plural': 'Product Daily Stats',
+                'db_table': 'product_daily_stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date'), name='product_daily_stats_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoreDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_placed', models.IntegerField(default=0)),
+                ('orders_delivered', models.IntegerField(default=0)),
+                ('orders_cancelled', models.IntegerField(default=0)),
+                ('gross_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('delivered_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='stores.store')),
+            ],
+            options={
+                'verbose_name': 'Store Daily Stats',
+                'verbose_name_plural': 'Store Daily Stats',
+                'db_table': 'store_daily_stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('store', 'date'), name='store_daily_stats_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoreHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('orders_placed', models.IntegerField(default=0)),
+                ('gross_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='stores.store')),
+            ],
+            options={
+                'verbose_name': 'Store Hourly Stats',
+                'verbose_name_plural': 'Store Hourly Stats',
+                'db_table': 'store_hourly_stats',
+                'ordering': ['-hour'],
+                'constraints': [models.UniqueConstraint(fields=('store', 'hour'), name='store_hourly_stats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+"""
+QuickBite Connect - Analytics Models
+Rollup tables behind the store dashboards
+"""
+from django.db import models
+from stores.models import Store
+from products.models import Product
+
+
+class StoreDailyStats(models.Model):
+    """Per-store order, revenue and rating totals for one day"""
+    
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    
+    # Orders placed that day, by current outcome
+    orders_placed = models.IntegerField(default=0)
+    orders_delivered = models.IntegerField(default=0)
+    orders_cancelled = models.IntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    delivered_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Approved reviews written that day
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'store_daily_stats'
+        verbose_name = 'Store Daily Stats'
+        verbose_name_plural = 'Store Daily Stats'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'date'], name='store_daily_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.store_id} - {self.date}"
+
+
+class StoreHourlyStats(models.Model):
+    """Per-store orders placed in one hour"""
+    
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='hourly_stats')
+    hour = models.DateTimeField()
+    orders_placed = models.IntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'store_hourly_stats'
+        verbose_name = 'Store Hourly Stats'
+        verbose_name_plural = 'Store Hourly Stats'
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'hour'], name='store_hourly_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.store_id} - {self.hour}"
+
+
+class ProductDailyStats(models.Model):
+    """Per-product sales (excluding cancelled orders) and ratings for one day"""
+    
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    orders = models.IntegerField(default=0)
+    quantity_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'product_daily_stats'
+        verbose_name = 'Product Daily Stats'
+        verbose_name_plural = 'Product Daily Stats'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='product_daily_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} - {self.date}"
@@ -0,0 +1,136 @@
+"""
+QuickBite Connect - Analytics Rollups
+Incremental updates of the dashboard rollup tables
+
+Each event adds its deltas to the affected rows with one UPDATE per row,
+creating the row on first use. Updates run after the triggering
+transaction commits, so checkout never waits on a busy store's rollup row;
+anything lost that way is repaired by ``manage.py backfill_analytics``.
+
+Only the *Stats tables are deferred. Store.total_orders and
+Product.total_sold are core columns and are updated inside the
+triggering transaction (here, in reserve_stock and in
+Order.transition_to).
+"""
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from orders.models import OrderItem
+from products.models import Product
+from stores.models import Store
+from .models import StoreDailyStats, StoreHourlyStats, ProductDailyStats
+
+logger = logging.getLogger(__name__)
+
+# Reviewed model -> (rollup model, key field) fed by rating changes
+RATING_ROLLUPS = {
+    'stores.store': (StoreDailyStats, 'store_id'),
+    'products.product': (ProductDailyStats, 'product_id'),
+}
+
+
+def day_of(value):
+    return timezone.localdate(value)
+
+
+def hour_of(value):
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def bump(model, keys, **deltas):
+    """Add deltas to the row identified by keys, creating it if needed"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**keys).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Another writer created the row in the meantime
+        model.objects.filter(**keys).update(**changes)
+
+
+def _after_commit(func, *args):
+    def run():
+        try:
+            with transaction.atomic():
+                func(*args)
+        except Exception:
+            logger.exception('Could not update analytics rollups')
+    transaction.on_commit(run)
+
+
+def _bump_lines(order_id, created_at, sign):
+    day = day_of(created_at)
+    lines = OrderItem.objects.filter(order_id=order_id, product__isnull=False).values_list(
+        'product_id', 'quantity', 'subtotal'
+    )
+    for product_id, quantity, subtotal in lines:
+        bump(
+            ProductDailyStats, {'product_id': product_id, 'date': day},
+            orders=sign, quantity_sold=sign * quantity, revenue=sign * subtotal
+        )
+
+
+def _order_placed(order_id, store_id, created_at, total):
+    bump(StoreDailyStats, {'store_id': store_id, 'date': day_of(created_at)}, orders_placed=1, gross_revenue=total)
+    bump(StoreHourlyStats, {'store_id': store_id, 'hour': hour_of(created_at)}, orders_placed=1, gross_revenue=total)
+    _bump_lines(order_id, created_at, 1)
+
+
+def record_order_placed(order):
+    """
+    Count a new order on its store now, in the checkout transaction, and
+    in the rollups (with its lines) once that commits.
+    """
+    Store.objects.filter(pk=order.store_id).update(total_orders=F('total_orders') + 1)
+    _after_commit(_order_placed, order.pk, order.store_id, order.created_at, order.total_amount)
+
+
+def _status_changed(order_id, store_id, created_at, total, previous, status):
+    deltas = defaultdict(int)
+    for state, sign in ((previous, -1), (status, 1)):
+        if state == 'delivered':
+            deltas['orders_delivered'] += sign
+            deltas['delivered_revenue'] += sign * total
+        elif state == 'cancelled':
+            deltas['orders_cancelled'] += sign
+    bump(StoreDailyStats, {'store_id': store_id, 'date': day_of(created_at)}, **deltas)
+    if 'cancelled' in (previous, status):
+        # Product sales exclude cancelled orders
+        _bump_lines(order_id, created_at, -1 if status == 'cancelled' else 1)
+
+
+def record_status_change(order, previous, status):
+    """Move an order between outcome counters once the transition commits"""
+    if previous != status:
+        _after_commit(
+            _status_changed, order.pk, order.store_id, order.created_at, order.total_amount, previous, status
+        )
+
+
+def _ratings_changed(model, key, changes):
+    for (target_id, day), (rating_sum, count) in changes.items():
+        bump(model, {key: target_id, 'date': day}, rating_sum=rating_sum, rating_count=count)
+
+
+def record_rating_changes(reviewed_model, changes):
+    """
+    Feed rating trends from (target id, review date, rating delta, count delta)
+    tuples, as produced when reviews are saved, moderated or deleted.
+    """
+    model, key = RATING_ROLLUPS[reviewed_model._meta.label_lower]
+    totals = defaultdict(lambda: [0, 0])
+    for target_id, day, rating_sum, count in changes:
+        if target_id is not None and count:
+            totals[target_id, day][0] += rating_sum
+            totals[target_id, day][1] += count
+    totals = {bucket: values for bucket, values in totals.items() if any(values)}
+    if totals:
+        _after_commit(_ratings_changed, model, key, totals)
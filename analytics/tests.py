@@ -0,0 +1,190 @@
+"""
+QuickBite Connect - Analytics Tests
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from config.profiling import ProfilingMiddleware, buffer, fingerprint
+from config.testing import make_owner, make_store
+from users.models import User
+from stores.models import Store
+from products.inventory import reserve_stock
+from products.models import Product
+from orders.models import Order, OrderItem
+from reviews.models import StoreReview
+from .backfill import backfill
+from .models import StoreDailyStats, StoreHourlyStats, ProductDailyStats
+from .rollups import record_order_placed
+
+
+class StoreAnalyticsTests(TestCase):
+    """Rollups are fed incrementally and agree with a full backfill"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.store = make_store(cls.owner)
+        cls.pizza = Product.objects.create(
+            store=cls.store, name='Pizza', slug='pizza', description='Pizza', price=8, stock_quantity=50
+        )
+        cls.soda = Product.objects.create(
+            store=cls.store, name='Soda', slug='soda', description='Soda', price=2, stock_quantity=50
+        )
+
+    def place_order(self, lines):
+        with self.captureOnCommitCallbacks(execute=True):
+            subtotal = sum(product.price * quantity for product, quantity in lines)
+            order = Order.objects.create(
+                customer=self.customer, store=self.store, payment_method='cash',
+                subtotal=subtotal, delivery_fee=Decimal('2.00'), total_amount=subtotal + 2
+            )
+            for product, quantity in lines:
+                OrderItem.objects.create(
+                    order=order, product=product, product_name=product.name, product_price=product.price,
+                    quantity=quantity, subtotal=product.price * quantity
+                )
+            reserve_stock({product.pk: quantity for product, quantity in lines})
+            record_order_placed(order)
+        return order
+
+    def transition(self, order, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            return order.transition_to(status, changed_by=self.owner)
+
+    def snapshot(self):
+        return (
+            list(StoreDailyStats.objects.values_list(
+                'store_id', 'date', 'orders_placed', 'orders_delivered', 'orders_cancelled',
+                'gross_revenue', 'delivered_revenue', 'rating_sum', 'rating_count'
+            )),
+            list(StoreHourlyStats.objects.values_list('store_id', 'hour', 'orders_placed', 'gross_revenue')),
+            sorted(ProductDailyStats.objects.values_list(
+                'product_id', 'date', 'orders', 'quantity_sold', 'revenue', 'rating_sum', 'rating_count'
+            )),
+            list(Product.objects.order_by('name').values_list('total_sold', flat=True)),
+            Store.objects.get(pk=self.store.pk).total_orders,
+        )
+
+    def build_history(self):
+        delivered = self.place_order([(self.pizza, 2), (self.soda, 1)])
+        cancelled = self.place_order([(self.soda, 3)])
+        self.place_order([(self.pizza, 1)])
+        self.transition(delivered, 'delivered')
+        self.transition(cancelled, 'cancelled')
+        with self.captureOnCommitCallbacks(execute=True):
+            StoreReview.objects.create(store=self.store, user=self.customer, rating=4, title='Good', comment='Good')
+
+    def test_incremental_rollups_match_backfill(self):
+        self.build_history()
+        incremental = self.snapshot()
+
+        backfill()
+
+        self.assertEqual(self.snapshot(), incremental)
+        self.assertEqual(incremental[-1], 3)
+        self.assertEqual(incremental[-2], [3, 1])  # pizza, soda (cancelled soda excluded)
+
+    def test_core_counters_do_not_depend_on_the_rollups(self):
+        with patch('analytics.rollups.bump', side_effect=RuntimeError('rollup failed')):
+            order = self.place_order([(self.pizza, 2)])
+            self.transition(order, 'cancelled')
+            self.transition(order, 'confirmed')
+
+        self.pizza.refresh_from_db()
+        self.store.refresh_from_db()
+        self.assertEqual((self.pizza.total_sold, self.store.total_orders), (2, 1))
+        self.assertFalse(StoreDailyStats.objects.exists())
+
+    def test_repeated_transition_is_counted_once(self):
+        order = self.place_order([(self.pizza, 1)])
+        self.assertTrue(self.transition(order, 'delivered'))
+        self.assertFalse(self.transition(order, 'delivered'))
+
+        stats = StoreDailyStats.objects.get()
+        self.assertEqual((stats.orders_delivered, stats.delivered_revenue), (1, Decimal('10.00')))
+        self.assertEqual(order.status_history.count(), 1)
+
+    def test_dashboard_reads_rollups(self):
+        self.build_history()
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        with self.assertNumQueries(4):  # store, daily, hours, top products
+            response = client.get(f'/api/stores/{self.store.pk}/analytics/')
+
+        self.assertEqual(response.status_code, 200)
+        totals = response.data['totals']
+        self.assertEqual((totals['orders_placed'], totals['orders_delivered'], totals['orders_cancelled']), (3, 1, 1))
+        self.assertEqual(totals['gross_revenue'], '38.00')
+        self.assertEqual(totals['average_basket'], '12.67')
+        self.assertEqual(totals['average_rating'], 4.0)
+        self.assertEqual([row['name'] for row in response.data['top_products']], ['Pizza', 'Soda'])
+
+    def test_dashboard_is_limited_to_the_owner(self):
+        other = User.objects.create_user(email='other@test.com', password='pass', user_type='store_owner')
+        client = APIClient()
+        client.force_authenticate(other)
+
+        response = client.get(f'/api/stores/{self.store.pk}/analytics/')
+
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_DUPLICATE_THRESHOLD=2)
+class ProfilingTests(TestCase):
+    """Sampled requests feed the per-endpoint profile"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(email='staff@test.com', password='pass', is_staff=True)
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+
+    def setUp(self):
+        buffer.clear()
+        self.addCleanup(buffer.clear)
+        self.client = APIClient()
+
+    def test_samples_record_queries_and_repeated_shapes(self):
+        self.client.force_authenticate(self.customer)
+        self.client.get('/api/health/')
+        with override_settings(PROFILING_SAMPLE_RATE=0):
+            self.client.get('/api/health/')
+
+        [sample] = buffer.snapshot()
+        self.assertEqual((sample['endpoint'], sample['status'], sample['queries']), ('GET health-check', 200, 1))
+        self.assertGreater(sample['bytes'], 0)
+        self.assertEqual(
+            fingerprint("SELECT 1 WHERE id IN (%s, %s) AND name = 'x'"), 'SELECT ? WHERE id IN (...) AND name = ?'
+        )
+
+    async def test_async_requests_are_sampled(self):
+        response = await AsyncClient().get('/api/health/')
+
+        [sample] = buffer.snapshot()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((sample['endpoint'], sample['queries']), ('GET health-check', 1))
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_not_loaded_when_sampling_is_off(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_report_is_staff_only_and_summarizes_endpoints(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get('/api/_perf/').status_code, 403)
+        for _ in range(3):
+            self.client.get('/api/health/')
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/_perf/?samples=1')
+
+        self.assertEqual(response.status_code, 200)
+        [row] = response.data['endpoints']
+        self.assertEqual((row['endpoint'], row['count'], row['avg_queries']), ('GET health-check', 3, 1.0))
+        self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        self.assertEqual(len(response.data['recent']), 1)
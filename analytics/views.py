@@ -0,0 +1,47 @@
+"""
+QuickBite Connect - Analytics Views
+"""
+from datetime import timedelta
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from stores.models import Store
+from .dashboard import build_dashboard
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+class StoreAnalyticsView(APIView):
+    """API endpoint for a store's dashboard figures (owners and staff)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get_date(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({'error': f'{name} must be a date (YYYY-MM-DD)'})
+        return parsed
+    
+    def get(self, request, store_id):
+        stores = Store.objects.all() if request.user.is_staff else Store.objects.filter(owner=request.user)
+        store = get_object_or_404(stores.only('id'), pk=store_id)
+        
+        date_to = self.get_date('to', timezone.localdate())
+        date_from = self.get_date('from', date_to - timedelta(days=DEFAULT_DAYS - 1))
+        if date_from > date_to:
+            raise ValidationError({'error': 'from must not be after to'})
+        if (date_to - date_from).days >= MAX_DAYS:
+            raise ValidationError({'error': f'Date range is limited to {MAX_DAYS} days'})
+        
+        return Response(build_dashboard(store, date_from, date_to))
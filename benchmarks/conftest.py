@@ -0,0 +1,165 @@
+"""
+QuickBite Connect - Benchmark Fixtures
+Seeded datasets, latency/query measurement and baseline comparison
+
+Benchmarks only run with RUN_BENCHMARKS=1:
+    RUN_BENCHMARKS=1 pytest benchmarks --no-cov -p no:cacheprovider
+    RUN_BENCHMARKS=1 BENCHMARK_UPDATE_BASELINE=1 pytest benchmarks --no-cov   # accept new numbers
+
+BENCHMARK_SCALES picks the datasets (default: tiny,small) and
+BENCHMARK_ITERATIONS the timed requests per endpoint (default 30).
+"""
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_FILE = Path(__file__).with_name('baseline.json')
+
+SCALES = {
+    'tiny': {
+        'stores': 10, 'products': 300, 'customers': 100,
+        'orders': 1_000, 'reviews': 300, 'notifications': 1_000,
+    },
+    'small': {
+        'stores': 100, 'products': 5_000, 'customers': 2_000,
+        'orders': 20_000, 'reviews': 5_000, 'notifications': 20_000,
+    },
+}
+
+ENABLED = os.environ.get('RUN_BENCHMARKS') == '1'
+UPDATE_BASELINE = os.environ.get('BENCHMARK_UPDATE_BASELINE') == '1'
+ITERATIONS = int(os.environ.get('BENCHMARK_ITERATIONS', 30))
+WARMUP = 3
+SELECTED_SCALES = [
+    scale.strip() for scale in os.environ.get('BENCHMARK_SCALES', 'tiny,small').split(',') if scale.strip()
+]
+
+results = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if ENABLED:
+        return
+    skip = pytest.mark.skip(reason='set RUN_BENCHMARKS=1 to run benchmarks')
+    for item in items:
+        if 'benchmarks' in item.nodeid.split('/')[0]:
+            item.add_marker(skip)
+
+
+def load_baseline():
+    if BASELINE_FILE.exists():
+        return json.loads(BASELINE_FILE.read_text())
+    return {'tolerance': {'latency': 0.5, 'latency_floor_ms': 2.0, 'queries': 0}, 'results': {}}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not (ENABLED and UPDATE_BASELINE and results):
+        return
+    baseline = load_baseline()
+    baseline['results'].update(results)
+    baseline['results'] = dict(sorted(baseline['results'].items()))
+    BASELINE_FILE.write_text(json.dumps(baseline, indent=2) + '\n')
+
+
+class Dataset:
+    """A seeded scale plus the accounts and rows benchmarks act on"""
+
+    def __init__(self, scale, plan):
+        from stores.models import Store
+        from users.models import User
+
+        self.scale = scale
+        self.plan = plan
+        # Customer 0 is the most active one under the Zipf distribution
+        self.customer = User.objects.get(id=plan.uuid('customer', 0))
+        self.store = Store.objects.get(id=plan.uuid('store', 0))
+        # Checkout refuses addresses outside the delivery radius; put the
+        # customer next door to the store they order from
+        self.address = self.customer.addresses.get()
+        self.address.latitude, self.address.longitude = self.store.latitude, self.store.longitude
+        self.address.save(update_fields=['latitude', 'longitude'])
+
+
+@pytest.fixture(scope='session', params=SELECTED_SCALES)
+def dataset(request, django_db_setup, django_db_blocker):
+    """Seed one scale for the session; wiped before the next scale"""
+    from stores.seeding import SeedPlan, generate, rebuild_derived
+
+    if request.param not in SCALES:
+        pytest.fail(f'Unknown benchmark scale {request.param!r}')
+    with django_db_blocker.unblock():
+        plan = SeedPlan(seed=1, until=date(2025, 6, 1), **SCALES[request.param])
+        generate(plan)
+        rebuild_derived()
+        cache.clear()
+        yield Dataset(request.param, plan)
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction + 0.999999) - 1)]
+
+
+def measure(request, setup=None, iterations=ITERATIONS):
+    """Time request() after a warmup; setup(i) runs untimed before each call"""
+    timings, queries = [], []
+    for i in range(WARMUP + iterations):
+        if setup:
+            setup(i)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request()
+            elapsed = time.perf_counter() - started
+        assert response.status_code < 400, (response.status_code, getattr(response, 'data', None))
+        if i >= WARMUP:
+            timings.append(elapsed * 1000)
+            queries.append(len(captured))
+    return {
+        'p50_ms': round(percentile(timings, 0.50), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': max(queries),
+    }
+
+
+def regressions(result, expected, tolerance):
+    """Reasons result is worse than the baseline entry, if any"""
+    problems = []
+    limit = expected['p95_ms'] * (1 + tolerance['latency']) + tolerance['latency_floor_ms']
+    if result['p95_ms'] > limit:
+        problems.append(f"p95 {result['p95_ms']}ms > {limit:.2f}ms (baseline {expected['p95_ms']}ms)")
+    if result['queries'] > expected['queries'] + tolerance['queries']:
+        problems.append(f"{result['queries']} queries > baseline {expected['queries']}")
+    return problems
+
+
+@pytest.fixture
+def benchmark(dataset, db):
+    """
+    benchmark(name, request, setup=None) measures an endpoint and fails
+    if it regressed against baseline.json for this scale.
+    """
+    baseline = load_baseline()
+
+    def run(name, request, setup=None):
+        key = f'{dataset.scale}:{name}'
+        result = measure(request, setup)
+        results[key] = result
+        expected = baseline['results'].get(key)
+        if expected is None or UPDATE_BASELINE:
+            return result
+        problems = regressions(result, expected, baseline['tolerance'])
+        assert not problems, f'{key} regressed: ' + '; '.join(problems)
+        return result
+
+    return run
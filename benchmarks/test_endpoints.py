@@ -0,0 +1,69 @@
+"""
+QuickBite Connect - Endpoint Benchmarks
+Latency and query-count regression checks for the hot API paths
+"""
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def client(dataset):
+    client = APIClient()
+    client.force_authenticate(dataset.customer)
+    return client
+
+
+@pytest.fixture
+def product(dataset):
+    """A store-0 product with plenty of stock for cart and checkout runs"""
+    from products.models import Product
+
+    product = Product.objects.filter(store=dataset.store).order_by('id').first()
+    Product.objects.filter(pk=product.pk).update(is_available=True, stock_quantity=100_000)
+    return product
+
+
+def test_store_listing(benchmark):
+    client = APIClient()
+    benchmark('store-list', lambda: client.get('/api/stores/'))
+
+
+def test_product_search(benchmark):
+    client = APIClient()
+    benchmark('product-search', lambda: client.get('/api/products/', {'search': 'spicy burger'}))
+
+
+def test_cart_add(benchmark, client, product):
+    benchmark('cart-add', lambda: client.post(
+        '/api/orders/cart/add/', {'product_id': str(product.id), 'quantity': 1}, format='json'
+    ))
+
+
+def test_checkout(benchmark, client, dataset, product):
+    from orders.models import Cart, CartItem
+
+    def fill_cart(i):
+        cart, _ = Cart.objects.get_or_create(user=dataset.customer, store=dataset.store)
+        CartItem.objects.get_or_create(cart=cart, product=product, defaults={'quantity': 2})
+
+    benchmark('checkout', lambda: client.post('/api/orders/create/', {
+        'store': str(dataset.store.id), 'delivery_address': str(dataset.address.id), 'payment_method': 'cash',
+    }, format='json'), setup=fill_cart)
+
+
+def test_order_history(benchmark, client):
+    benchmark('order-history', lambda: client.get('/api/orders/'))
+
+
+def test_review_submission(benchmark, client, dataset):
+    benchmark('review-create', lambda: client.post('/api/reviews/stores/create/', {
+        'store': str(dataset.store.id), 'rating': 4, 'title': 'Good', 'comment': 'Quick and warm',
+    }, format='json'))
+
+
+def test_notification_polling(benchmark, client):
+    benchmark('notification-unread-count', lambda: client.get('/api/notifications/unread-count/'))
+
+
+def test_notification_list(benchmark, client):
+    benchmark('notification-list', lambda: client.get('/api/notifications/'))
@@ -0,0 +1,129 @@
+"""
+QuickBite Connect - Caching
+Versioned response caching for public catalog endpoints
+"""
+import hashlib
+import logging
+
+from django.core.cache import caches
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'catalog'
+VERSION_TIMEOUT = None  # namespace versions never expire on their own
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def get_namespace_versions(namespaces):
+    """Return {namespace: version}, initialising missing versions to 1"""
+    cache = _cache()
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    missing = {key: 1 for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, VERSION_TIMEOUT)
+        found.update(missing)
+    return {namespace: found[key] for key, namespace in keys.items()}
+
+
+def invalidate(*namespaces):
+    """
+    Invalidate every cached response that depends on the given namespaces.
+
+    Bumps the namespace version instead of deleting keys, so stale entries
+    simply stop being addressed and age out through their own TTL.
+    """
+    cache = _cache()
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 2, VERSION_TIMEOUT)
+        except Exception:
+            logger.exception('Could not invalidate cache namespace %s', namespace)
+
+
+def get_or_build(name, namespaces, build, timeout=None):
+    """
+    Return a cached value, calling build() to produce it on a miss.
+
+    The value is tied to the current versions of namespaces, so any
+    invalidate() of one of them makes the next call rebuild it.
+    """
+    try:
+        versions = get_namespace_versions(namespaces)
+        key = f'{KEY_PREFIX}:{name}:' + ':'.join(f'{ns}.{versions[ns]}' for ns in sorted(versions))
+        value = _cache().get(key)
+    except Exception:
+        logger.exception('Cache lookup for %s failed', name)
+        return build()
+
+    if value is None:
+        value = build()
+        try:
+            _cache().set(key, value, timeout)
+        except Exception:
+            logger.exception('Cache store for %s failed', name)
+    return value
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses of a read-only API view.
+
+    Views declare the namespaces their payload depends on and a TTL. Keys
+    cover the host, path and every query param (filters, search, ordering,
+    pagination) plus the current namespace versions. Cache backend errors
+    fall through to an uncached response.
+    """
+    cache_namespaces = ()
+    cache_timeout = 60
+
+    def get_cache_key(self, request):
+        versions = get_namespace_versions(self.cache_namespaces)
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        raw = '|'.join([
+            request.get_host(),
+            request.path,
+            repr(params),
+            repr(sorted(versions.items())),
+        ])
+        digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+        return f'{KEY_PREFIX}:{type(self).__name__}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            key = self.get_cache_key(request)
+            data = _cache().get(key)
+        except Exception:
+            logger.exception('Catalog cache lookup failed')
+            return super().get(request, *args, **kwargs)
+
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            try:
+                _cache().set(key, response.data, self.cache_timeout)
+            except Exception:
+                logger.exception('Catalog cache store failed')
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,186 @@
+"""
+QuickBite Connect - Live Events
+Publish/subscribe for pushing order and notification updates to clients
+
+Events are published to named channels (``user:<id>``, ``store:<id>``) and
+delivered to every subscription listening on them. The in-process broker
+only reaches clients connected to the same process; RedisBroker relays
+through Redis pub/sub so every node sees every event.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def store_channel(store_id):
+    return f'store:{store_id}'
+
+
+def make_message(event, data):
+    """Serialize once at publish time; every subscriber gets the same text"""
+    return {'event': event, 'data': json.dumps(data, cls=DjangoJSONEncoder)}
+
+
+class Subscription:
+    """
+    A client's bounded queue of messages from one or more channels.
+
+    Must be created inside the event loop that will consume it. When the
+    client falls behind and the queue fills up, further messages are
+    dropped and ``dropped`` is set so the client can be told to resync.
+    """
+
+    def __init__(self, broker, channels, max_pending):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_pending)
+        self.dropped = False
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fans messages out to subscriptions in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, channels, max_pending=100):
+        subscription = Subscription(self, channels, max_pending)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[channel]
+
+    def dispatch(self, channel, message):
+        """Hand a message to local subscriptions; safe from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+    def publish(self, channel, message):
+        self.dispatch(channel, message)
+
+    def publish_many(self, messages):
+        for channel, message in messages:
+            self.publish(channel, message)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Relays messages through Redis pub/sub for multi-node deployments.
+
+    Publishing goes to Redis only; a single listener thread per process
+    receives every message and dispatches it to local subscriptions.
+    """
+    prefix = 'events:'
+
+    def __init__(self, url=None):
+        super().__init__()
+        import redis
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self._listener = None
+
+    def subscribe(self, channels, max_pending=100):
+        self._ensure_listener()
+        return super().subscribe(channels, max_pending)
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, json.dumps(message))
+
+    def publish_many(self, messages):
+        pipeline = self.client.pipeline(transaction=False)
+        for channel, message in messages:
+            pipeline.publish(self.prefix + channel, json.dumps(message))
+        pipeline.execute()
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='event-broker', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + '*')
+                for item in pubsub.listen():
+                    channel = item['channel'].decode()[len(self.prefix):]
+                    self.dispatch(channel, json.loads(item['data']))
+            except Exception:
+                logger.exception('Event listener lost its Redis connection; reconnecting')
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Process-wide broker built from settings.EVENT_BROKER"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENT_BROKER)()
+    return _broker
+
+
+def publish_many(messages):
+    """Publish (channel, message) pairs; failures are logged, never raised"""
+    if not messages:
+        return
+    try:
+        get_broker().publish_many(messages)
+    except Exception:
+        logger.exception('Could not publish live events')
+
+
+def publish(channel, event, data):
+    publish_many([(channel, make_message(event, data))])
+
+
+def publish_on_commit(messages):
+    """Publish (channel, message) pairs once the current transaction commits"""
+    if messages:
+        transaction.on_commit(lambda: publish_many(messages))
@@ -0,0 +1,227 @@
+"""
+QuickBite Connect - Request Profiling
+Sampled per-request timing, SQL and response-size measurements
+
+ProfilingMiddleware records a sample for a fraction
+(PROFILING_SAMPLE_RATE) of requests: wall time, SQL query count and
+time, repeated query shapes (the N+1 signature) and response size,
+keyed by the resolved view. With a rate of 0 the middleware is not
+loaded at all. Samples live in a per-process ring buffer
+of PROFILING_BUFFER_SIZE entries; summarize() turns them into
+per-endpoint percentiles for /api/_perf/ and the perf_report command.
+"""
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?|\$\d+)\s*,?)+\)', re.IGNORECASE)
+
+
+def fingerprint(sql):
+    """Query shape with literals and IN-list lengths removed"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class RingBuffer:
+    """The last maxlen samples of this process"""
+
+    def __init__(self, maxlen):
+        self._lock = threading.Lock()
+        self.samples = deque(maxlen=maxlen)
+
+    def append(self, sample):
+        with self._lock:
+            self.samples.append(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.samples)
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+
+
+buffer = RingBuffer(settings.PROFILING_BUFFER_SIZE)
+
+# QueryRecorder of the request currently being sampled in this context
+_recorder = ContextVar('profiling_recorder', default=None)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper callback counting and timing queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+
+def endpoint_of(request):
+    """'GET users:profile' style key for the view that handled request"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <unresolved>'
+    return f'{request.method} {match.view_name or match._func_path}'
+
+
+def record_queries(execute, sql, params, many, context):
+    """Execute wrapper feeding the recorder of the request being sampled, if any"""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_wrapper(connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def install_wrappers(**kwargs):
+    """
+    Cover the connections already open in this thread.
+
+    Sent on request_started, which runs in the thread that will run the
+    view, so connections opened before the middleware loaded are covered
+    too; new ones get the wrapper from connection_created.
+    """
+    for connection in connections.all(initialized_only=True):
+        install_wrapper(connection)
+
+
+class ProfilingMiddleware:
+    """
+    Records a sample for a PROFILING_SAMPLE_RATE fraction of requests.
+
+    Runs in both sync and async mode, and drops out of the chain entirely
+    when sampling is off. Queries are attributed through a context
+    variable, which also reaches the threads async views run ORM calls in.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_wrapper, dispatch_uid='config.profiling')
+        request_started.connect(install_wrappers, dispatch_uid='config.profiling')
+        install_wrappers()
+
+    def sampled(self, request):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if not rate or (rate < 1 and random.random() >= rate):
+            return False
+        return not request.path.startswith('/api/_perf/')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, recorder, elapsed):
+        threshold = settings.PROFILING_DUPLICATE_THRESHOLD
+        buffer.append({
+            'endpoint': endpoint_of(request),
+            'path': request.path,
+            'status': response.status_code,
+            'at': time.time(),
+            'wall_ms': round(elapsed * 1000, 2),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.seconds * 1000, 2),
+            'duplicates': {shape: count for shape, count in recorder.shapes.items() if count >= threshold},
+            'bytes': None if response.streaming else len(response.content),
+        })
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summarize(samples, top_duplicates=3):
+    """Per-endpoint count, wall time percentiles, SQL stats and N+1 suspects"""
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[sample['endpoint']].append(sample)
+
+    report = []
+    for endpoint, group in grouped.items():
+        wall = sorted(sample['wall_ms'] for sample in group)
+        sizes = [sample['bytes'] for sample in group if sample['bytes'] is not None]
+        duplicates = Counter()
+        for sample in group:
+            for shape, count in sample['duplicates'].items():
+                duplicates[shape] = max(duplicates[shape], count)
+        report.append({
+            'endpoint': endpoint,
+            'count': len(group),
+            'p50_ms': percentile(wall, 0.50),
+            'p95_ms': percentile(wall, 0.95),
+            'p99_ms': percentile(wall, 0.99),
+            'max_ms': wall[-1],
+            'avg_queries': round(sum(sample['queries'] for sample in group) / len(group), 1),
+            'max_queries': max(sample['queries'] for sample in group),
+            'avg_sql_ms': round(sum(sample['sql_ms'] for sample in group) / len(group), 2),
+            'avg_bytes': round(sum(sizes) / len(sizes)) if sizes else None,
+            'errors': sum(1 for sample in group if sample['status'] >= 500),
+            'duplicate_queries': [
+                {'sql': shape, 'max_per_request': count} for shape, count in duplicates.most_common(top_duplicates)
+            ],
+        })
+    return sorted(report, key=lambda row: row['p95_ms'] * row['count'], reverse=True)
@@ -0,0 +1,261 @@
+"""
+QuickBite Connect - Search
+Ranked full-text search with a trigram fallback for typos
+
+Models opt in with a ``search_document`` attribute listing (field, weight)
+pairs, weights 'A' (most relevant) to 'D'. PostgreSQL keeps a weighted
+tsvector in the model's ``search_vector`` column (GIN indexed, pg_trgm for
+the fallback); SQLite keeps FTS5 side tables so dev and tests behave the
+same way without Postgres. Any other database gets the plain icontains
+matching the list views used before, unranked.
+"""
+import re
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = 'english'
+WEIGHTS = ('A', 'B', 'C', 'D')
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def document_fields(model, weight=None):
+    fields = model.search_document
+    if weight is not None:
+        return [name for name, field_weight in fields if field_weight == weight]
+    return [name for name, _ in fields]
+
+
+def touches_document(model, update_fields):
+    """Whether a save with update_fields can change the indexed text"""
+    return update_fields is None or bool(set(update_fields) & set(document_fields(model)))
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN for ranked matches, pg_trgm word similarity for typos"""
+
+    def vector(self, model):
+        vectors = [SearchVector(name, weight=weight, config=SEARCH_CONFIG) for name, weight in model.search_document]
+        vector = vectors[0]
+        for other in vectors[1:]:
+            vector = vector + other
+        return vector
+
+    def index(self, instance):
+        model = type(instance)
+        model._default_manager.filter(pk=instance.pk).update(search_vector=self.vector(model))
+
+    def remove(self, instance):
+        pass  # the vector lives on the row itself
+
+    def rebuild(self, model):
+        return model._default_manager.update(search_vector=self.vector(model))
+
+    def match(self, queryset, text):
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(search_rank=SearchRank(F('search_vector'), query))
+
+    def fuzzy(self, queryset, text):
+        field = document_fields(queryset.model, 'A')[0]
+        return queryset.filter(TrigramWordSimilar(F(field), text)).annotate(
+            search_rank=TrigramWordSimilarity(text, field)
+        )
+
+
+class SQLiteSearchBackend:
+    """FTS5 tables: porter-stemmed documents for ranking, trigrams for typos"""
+
+    documents_table = 'search_documents'
+    trigrams_table = 'search_trigrams'
+    # bm25 weights for (model, object_id, A, B, C, D)
+    bm25_weights = '0.0, 0.0, 10.0, 4.0, 2.0, 1.0'
+
+    def create_tables(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.documents_table} USING fts5("
+                "model UNINDEXED, object_id UNINDEXED, a, b, c, d, tokenize='porter unicode61')"
+            )
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.trigrams_table} USING fts5("
+                "model UNINDEXED, object_id UNINDEXED, a, tokenize='trigram')"
+            )
+
+    def object_id(self, model, pk, connection):
+        return model._meta.pk.get_db_prep_value(pk, connection)
+
+    def index(self, instance):
+        model = type(instance)
+        connection = connections[instance._state.db or 'default']
+        texts = [
+            ' '.join(str(getattr(instance, name) or '') for name in document_fields(model, weight))
+            for weight in WEIGHTS
+        ]
+        label = model._meta.label_lower
+        object_id = self.object_id(model, instance.pk, connection)
+        self.remove(instance)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.documents_table} (model, object_id, a, b, c, d) VALUES (%s, %s, %s, %s, %s, %s)",
+                [label, object_id, *texts]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.trigrams_table} (model, object_id, a) VALUES (%s, %s, %s)",
+                [label, object_id, texts[0]]
+            )
+
+    def remove(self, instance):
+        model = type(instance)
+        connection = connections[instance._state.db or 'default']
+        params = [model._meta.label_lower, self.object_id(model, instance.pk, connection)]
+        with connection.cursor() as cursor:
+            for table in (self.documents_table, self.trigrams_table):
+                cursor.execute(f"DELETE FROM {table} WHERE model = %s AND object_id = %s", params)
+
+    def rebuild(self, model):
+        connection = connections[model._default_manager.db]
+        with connection.cursor() as cursor:
+            for table in (self.documents_table, self.trigrams_table):
+                cursor.execute(f"DELETE FROM {table} WHERE model = %s", [model._meta.label_lower])
+        count = 0
+        for instance in model._default_manager.only('pk', *document_fields(model)).iterator(chunk_size=1000):
+            self.index(instance)
+            count += 1
+        return count
+
+    def ranked(self, queryset, table, expression, weights):
+        model = queryset.model
+        connection = connections[queryset.db]
+        params = [expression, model._meta.label_lower]
+        outer_pk = '{}.{}'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            connection.ops.quote_name(model._meta.pk.column)
+        )
+        ids = RawSQL(f"SELECT object_id FROM {table} WHERE {table} MATCH %s AND model = %s", params)
+        rank = RawSQL(
+            f"SELECT -bm25({table}, {weights}) FROM {table} "
+            f"WHERE {table} MATCH %s AND model = %s AND object_id = {outer_pk}",
+            params
+        )
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank)
+
+    def match(self, queryset, text):
+        words = WORD_RE.findall(text)
+        if not words:
+            return queryset.none()
+        # Every word must match; the last one may be a prefix (search as you type)
+        expression = ' '.join(f'"{word}"' for word in words[:-1])
+        expression = f'{expression} "{words[-1]}"*'.strip()
+        return self.ranked(queryset, self.documents_table, expression, self.bm25_weights)
+
+    def fuzzy(self, queryset, text):
+        trigrams = {
+            word[i:i + 3]
+            for word in WORD_RE.findall(text.lower()) if len(word) >= 3
+            for i in range(len(word) - 2)
+        }
+        if not trigrams:
+            return queryset.none()
+        expression = ' OR '.join(f'"{trigram}"' for trigram in sorted(trigrams))
+        return self.ranked(queryset, self.trigrams_table, expression, '0.0, 0.0, 1.0')
+
+
+class ContainsSearchBackend:
+    """icontains on the document fields, for databases without a full-text index"""
+
+    def index(self, instance):
+        pass
+
+    def remove(self, instance):
+        pass
+
+    def rebuild(self, model):
+        return 0
+
+    def match(self, queryset, text):
+        # Like SearchFilter: every word must appear in one of the fields
+        fields = document_fields(queryset.model)
+        for word in text.split():
+            condition = Q()
+            for name in fields:
+                condition |= Q(**{f'{name}__icontains': word})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def fuzzy(self, queryset, text):
+        return queryset.none()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+FALLBACK_BACKEND = ContainsSearchBackend()
+
+
+def get_backend(using='default'):
+    return BACKENDS.get(connections[using].vendor, FALLBACK_BACKEND)
+
+
+def search(queryset, text):
+    """
+    Filter queryset to documents matching text, annotated with search_rank.
+
+    Falls back to trigram similarity on the 'A' field(s) when nothing
+    matches exactly, so misspelled queries still find something.
+    """
+    backend = get_backend(queryset.db)
+    matched = backend.match(queryset, text)
+    if matched.exists():
+        return matched
+    return backend.fuzzy(queryset, text)
+
+
+def index_instance(instance, update_fields=None):
+    """Refresh an instance's search document (post_save handler helper)"""
+    if touches_document(type(instance), update_fields):
+        get_backend(instance._state.db or 'default').index(instance)
+
+
+def remove_instance(instance):
+    """Drop an instance's search document (post_delete handler helper)"""
+    get_backend(instance._state.db or 'default').remove(instance)
+
+
+def rebuild_index(model, using='default'):
+    """Recompute search documents for every row of model"""
+    return get_backend(using).rebuild(model)
+
+
+def _create_sqlite_tables(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        BACKENDS['sqlite'].create_tables(connection)
+
+
+connection_created.connect(_create_sqlite_tables)
+
+
+class RankedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter backed by the full-text index instead of icontains scans.
+
+    List it after OrderingFilter: unless the client passes an explicit
+    ordering, matches come back most relevant first.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = ' '.join(self.get_search_terms(request))
+        if not text:
+            return queryset
+
+        queryset = search(queryset, text)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
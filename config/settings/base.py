@@ -2,6 +2,7 @@
 QuickBite Connect - Base Settings
 """
 import os
+from decimal import Decimal
 from pathlib import Path
 from decouple import config
 
@@ -34,11 +35,13 @@ LOCAL_APPS = [
     'payments.apps.PaymentsConfig',
     'reviews.apps.ReviewsConfig',
     'notifications.apps.NotificationsConfig',
+    'analytics.apps.AnalyticsConfig',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'config.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -51,6 +54,13 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Request profiling (see config/profiling.py): fraction of requests
+# sampled, samples kept per process, and how often one query shape must
+# repeat within a request to be reported as a likely N+1
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_BUFFER_SIZE = config('PROFILING_BUFFER_SIZE', default=5000, cast=int)
+PROFILING_DUPLICATE_THRESHOLD = config('PROFILING_DUPLICATE_THRESHOLD', default=3, cast=int)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -85,6 +95,22 @@ SPECTACULAR_SETTINGS = {
 STRIPE_PUBLIC_KEY = config('STRIPE_PUBLIC_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+# Max age (seconds) of a webhook signature timestamp
+STRIPE_WEBHOOK_TOLERANCE = config('STRIPE_WEBHOOK_TOLERANCE', default=300, cast=int)
+# Events failing this many times stay 'failed' in the inbox for inspection
+STRIPE_EVENT_MAX_ATTEMPTS = config('STRIPE_EVENT_MAX_ATTEMPTS', default=5, cast=int)
+
+# Payment gateway (payments.gateway.FakeGateway for offline testing)
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='payments.gateway.StripeGateway')
+# Deadline (seconds) for a single provider call, including retries
+STRIPE_TIMEOUT = config('STRIPE_TIMEOUT', default=10, cast=float)
+# Connection-error retries, made within STRIPE_TIMEOUT
+STRIPE_MAX_NETWORK_RETRIES = config('STRIPE_MAX_NETWORK_RETRIES', default=1, cast=int)
+# Threads (and keep-alive connections) for provider calls per process
+PAYMENT_GATEWAY_WORKERS = config('PAYMENT_GATEWAY_WORKERS', default=8, cast=int)
+# Consecutive outages that open the circuit, and seconds before a retry
+PAYMENT_CIRCUIT_FAILURE_THRESHOLD = config('PAYMENT_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int)
+PAYMENT_CIRCUIT_RESET_TIMEOUT = config('PAYMENT_CIRCUIT_RESET_TIMEOUT', default=30, cast=float)
 
 
 WSGI_APPLICATION = 'config.wsgi.application'
@@ -130,3 +156,91 @@ REST_FRAMEWORK = {
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Worker id (0-1023) for order/transaction number generation. Give each
+# process a distinct id in production; when unset one is derived from host and pid.
+ID_GENERATOR_WORKER_ID = config('ID_GENERATOR_WORKER_ID', default=None, cast=lambda v: int(v) if v else None)
+
+# Upper bound (miles) used to prefilter stores for the "nearby" listing.
+# Stores with a larger delivery radius are only matched within this distance.
+NEARBY_STORES_MAX_RADIUS = config('NEARBY_STORES_MAX_RADIUS', default=25.0, cast=float)
+
+# Timezone new stores' business hours are interpreted in
+STORE_DEFAULT_TIMEZONE = config('STORE_DEFAULT_TIMEZONE', default='America/New_York')
+
+
+def parse_delivery_bands(value):
+    """'max_miles:surcharge:travel_minutes,...' -> sorted (float, Decimal, int) tuples"""
+    bands = [band.split(':') for band in value.split(',') if band.strip()]
+    return sorted((float(miles), Decimal(fee), int(minutes)) for miles, fee, minutes in bands)
+
+
+# Delivery quotes (orders.quotes). Each distance band adds a fee surcharge and
+# travel minutes to the store's own delivery_fee and estimated_delivery_time;
+# distances past the last band are priced at it. Every confirmed/preparing
+# order adds DELIVERY_MINUTES_PER_ACTIVE_ORDER, and from DELIVERY_BUSY_THRESHOLD
+# such orders on DELIVERY_BUSY_FEE is added too.
+DELIVERY_FEE_BANDS = config(
+    'DELIVERY_FEE_BANDS', default='2:0.00:10,5:1.50:18,10:3.50:28,25:6.00:45', cast=parse_delivery_bands
+)
+DELIVERY_MINUTES_PER_ACTIVE_ORDER = config('DELIVERY_MINUTES_PER_ACTIVE_ORDER', default=3, cast=int)
+DELIVERY_BUSY_THRESHOLD = config('DELIVERY_BUSY_THRESHOLD', default=8, cast=int)
+DELIVERY_BUSY_FEE = config('DELIVERY_BUSY_FEE', default='1.00', cast=Decimal)
+
+# Shared cache when REDIS_URL is set, otherwise a per-process in-memory cache
+# (also what tests run against).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'quickbite',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'quickbite',
+        }
+    }
+
+# Live event stream (/api/events/). Events go through Redis pub/sub when
+# REDIS_URL is set so every node sees them; otherwise they stay in-process.
+EVENT_BROKER = config(
+    'EVENT_BROKER',
+    default='config.events.RedisBroker' if REDIS_URL else 'config.events.InProcessBroker'
+)
+EVENT_STREAM_KEEPALIVE = config('EVENT_STREAM_KEEPALIVE', default=15, cast=int)  # seconds
+EVENT_STREAM_MAX_PENDING = config('EVENT_STREAM_MAX_PENDING', default=100, cast=int)  # per client
+EVENT_STREAM_RETRY_MS = config('EVENT_STREAM_RETRY_MS', default=3000, cast=int)  # client reconnect delay
+
+# Email / SMS delivery. Requests only queue messages; the process_outbox
+# worker sends them through the transports below.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@quickbite.com')
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+# Worker SMTP connections idle longer than this (seconds) are reopened before use
+EMAIL_CONNECTION_MAX_IDLE = config('EMAIL_CONNECTION_MAX_IDLE', default=60, cast=int)
+
+TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
+TWILIO_AUTH_TOKEN = config('TWILIO_AUTH_TOKEN', default='')
+TWILIO_PHONE_NUMBER = config('TWILIO_PHONE_NUMBER', default='')
+TWILIO_HTTP_TIMEOUT = config('TWILIO_HTTP_TIMEOUT', default=10, cast=int)
+TWILIO_HTTP_POOL_SIZE = config('TWILIO_HTTP_POOL_SIZE', default=10, cast=int)
+
+NOTIFICATION_TRANSPORTS = {
+    'email': config('NOTIFICATION_EMAIL_TRANSPORT', default='notifications.transports.EmailTransport'),
+    'sms': config('NOTIFICATION_SMS_TRANSPORT', default='notifications.transports.TwilioSMSTransport'),
+}
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=5, cast=int)
+NOTIFICATION_RETRY_BASE_DELAY = config('NOTIFICATION_RETRY_BASE_DELAY', default=30, cast=int)  # seconds
+NOTIFICATION_RETRY_MAX_DELAY = config('NOTIFICATION_RETRY_MAX_DELAY', default=3600, cast=int)  # seconds
+# Cached unread counters are recounted from the database at least this often (seconds)
+NOTIFICATION_UNREAD_COUNT_TTL = config('NOTIFICATION_UNREAD_COUNT_TTL', default=300, cast=int)
@@ -0,0 +1,71 @@
+"""
+QuickBite Connect - Event Stream
+Server-Sent Events endpoint for live order status and notifications
+
+Needs an ASGI server (config.asgi): each open stream is an idle coroutine
+rather than a blocked worker thread.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from stores.models import Store
+from .events import get_broker, store_channel, user_channel
+
+
+def channels_for(user):
+    """A user hears their own channel plus those of the stores they own"""
+    channels = [user_channel(user.pk)]
+    if user.user_type == 'store_owner':
+        store_ids = Store.objects.filter(owner=user).values_list('pk', flat=True)
+        channels.extend(store_channel(store_id) for store_id in store_ids)
+    return channels
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {data}\n\n'
+
+
+async def stream_events(subscription, keepalive):
+    """
+    Yield SSE frames for a subscription until the client goes away.
+
+    A ``ready`` event opens every stream (and every reconnect) so clients
+    know to refresh state once; comments keep idle proxies from closing the
+    connection; ``resync`` tells a client that fell behind that events were
+    dropped.
+    """
+    try:
+        yield f'retry: {settings.EVENT_STREAM_RETRY_MS}\n' + format_event('ready', '{}')
+        while True:
+            try:
+                message = await subscription.get(timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(message['event'], message['data'])
+            if subscription.dropped:
+                subscription.dropped = False
+                yield format_event('resync', '{}')
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def event_stream(request):
+    """Stream the signed-in user's order status and notification events"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    channels = await sync_to_async(channels_for)(user)
+    subscription = get_broker().subscribe(channels, settings.EVENT_STREAM_MAX_PENDING)
+    response = StreamingHttpResponse(
+        stream_events(subscription, settings.EVENT_STREAM_KEEPALIVE),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
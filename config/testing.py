@@ -0,0 +1,20 @@
+"""
+QuickBite Connect - Test Helpers
+Fixtures shared by the app test suites
+"""
+from users.models import User
+from stores.models import Store
+
+
+def make_owner(email='owner@test.com'):
+    return User.objects.create_user(email=email, password='pass', user_type='store_owner')
+
+
+def make_store(owner, slug='test-store', **fields):
+    """An approved New York store; fields override the defaults"""
+    defaults = {
+        'name': slug.replace('-', ' ').title(), 'description': 'Test', 'phone_number': '+15550000000',
+        'email': f'{slug}@test.com', 'address_line1': '1 Main St', 'city': 'New York', 'state': 'NY',
+        'postal_code': '10001', 'status': 'approved',
+    }
+    return Store.objects.create(owner=owner, slug=slug, **{**defaults, **fields})
@@ -22,7 +22,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
-from .views import health_check, api_info
+from .views import health_check, api_info, perf_report
+from .streams import event_stream
 from django.views.generic import TemplateView
 
 
@@ -41,7 +42,9 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/events/', event_stream, name='event-stream'),
     path('api/health/', health_check, name='health-check'),
+    path('api/_perf/', perf_report, name='perf-report'),
     path('api/', api_info, name='api-info'),
     path('', TemplateView.as_view(template_name='index.html'), name='home'),
 ]
@@ -2,10 +2,11 @@
 QuickBite Connect - System Views
 """
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from django.db import connection
 from django.conf import settings
+from .profiling import buffer, summarize
 import sys
 
 
@@ -55,4 +56,28 @@ def api_info(request):
             'reviews': '/api/reviews/',
             'notifications': '/api/notifications/',
         }
-    })
\ No newline at end of file
+    })
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def perf_report(request):
+    """
+    Per-endpoint profile of this process's sampled requests, hottest
+    (p95 x count) first. ?samples=N adds the N most recent raw samples;
+    DELETE clears the buffer.
+    """
+    if request.method == 'DELETE':
+        buffer.clear()
+        return Response(status=204)
+
+    samples = buffer.snapshot()
+    data = {
+        'sample_rate': settings.PROFILING_SAMPLE_RATE,
+        'samples': len(samples),
+        'endpoints': summarize(samples),
+    }
+    recent = request.query_params.get('samples')
+    if recent and recent.isdigit():
+        data['recent'] = samples[-int(recent):] if int(recent) else []
+    return Response(data)
@@ -3,7 +3,9 @@ from django.contrib import admin
 QuickBite Connect - Notification Admin
 """
 from django.contrib import admin
-from .models import Notification, EmailLog, SMSLog, NotificationPreference, PushToken
+from django.db import transaction
+from . import counters
+from .models import Notification, EmailLog, SMSLog, OutboundMessage, NotificationPreference, PushToken
 
 
 @admin.register(Notification)
@@ -17,12 +19,19 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         from django.utils import timezone
-        queryset.update(is_read=True, read_at=timezone.now())
+        self.update_read_state(queryset, is_read=True, read_at=timezone.now())
     mark_as_read.short_description = "Mark as read"
     
     def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False, read_at=None)
+        self.update_read_state(queryset, is_read=False, read_at=None)
     mark_as_unread.short_description = "Mark as unread"
+    
+    def update_read_state(self, queryset, **fields):
+        """Update the rows, then forget their users' counters once that commits"""
+        with transaction.atomic():
+            user_ids = set(queryset.values_list('user_id', flat=True).distinct())
+            queryset.update(**fields)
+            counters.invalidate(user_ids)
 
 
 @admin.register(EmailLog)
@@ -51,6 +60,21 @@ class EmailLogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('channel', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('channel', 'status')
+    readonly_fields = ('claim_token', 'locked_until', 'created_at', 'updated_at')
+    raw_id_fields = ('email_log', 'sms_log')
+    
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now())
+    retry_now.short_description = "Retry now"
+
+
 @admin.register(SMSLog)
 class SMSLogAdmin(admin.ModelAdmin):
     list_display = ('recipient_phone', 'sms_type', 'status', 'created_at', 'sent_at')
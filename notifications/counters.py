@@ -0,0 +1,83 @@
+"""
+QuickBite Connect - Unread Counters
+Cached per-user unread notification counts
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def recount(user_id):
+    """Count unread notifications in the database and store the result"""
+    from .models import Notification
+    count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    try:
+        cache.set(_key(user_id), count, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+    except Exception:
+        logger.exception('Could not cache unread count')
+    return count
+
+
+def get_unread_count(user_id):
+    """
+    Return the user's unread count, from cache when possible.
+    
+    Counters expire after NOTIFICATION_UNREAD_COUNT_TTL seconds, so any
+    drift (e.g. an increment racing a recount) heals on the next recount.
+    """
+    try:
+        count = cache.get(_key(user_id))
+    except Exception:
+        logger.exception('Could not read unread count')
+        count = None
+    if count is None or count < 0:
+        return recount(user_id)
+    return count
+
+
+def _apply(deltas):
+    for user_id, delta in deltas.items():
+        key = _key(user_id)
+        try:
+            # A missing key is left alone: the next read recounts
+            value = cache.incr(key, delta) if delta >= 0 else cache.decr(key, -delta)
+        except ValueError:
+            continue
+        except Exception:
+            logger.exception('Could not update unread count')
+            continue
+        if value < 0:
+            # Drifted below zero: drop it so the next read recounts
+            cache.delete(key)
+
+
+def adjust(deltas):
+    """Apply {user_id: delta} to cached counters once the transaction commits"""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: _apply(deltas))
+
+
+def reset(user_id, count=0):
+    """Set a user's counter to a known value once the transaction commits"""
+    def _set():
+        try:
+            cache.set(_key(user_id), count, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+        except Exception:
+            logger.exception('Could not reset unread count')
+    transaction.on_commit(_set)
+
+
+def invalidate(user_ids):
+    """Forget counters so they are recounted on next read"""
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,168 @@
+"""
+QuickBite Connect - Notification Fan-out
+Bulk delivery of one notice to a large audience
+"""
+import time
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Value
+from django.db.models.functions import Coalesce
+from config.events import publish_on_commit
+from users.models import User
+from .models import Notification, EmailLog, SMSLog, NotificationPreference
+from . import counters
+from .outbox import enqueue_many
+
+CHANNELS = ('in_app', 'email', 'sms')
+
+# Preference flag gating each channel per notification type. Types not
+# listed here are delivered on every requested channel.
+PREFERENCE_FLAGS = {
+    'promotion': {'in_app': 'push_promotions', 'email': 'email_promotions', 'sms': 'sms_promotions'},
+    'new_product': {'in_app': 'push_new_products', 'email': 'email_promotions', 'sms': 'sms_promotions'},
+}
+
+
+def store_followers(store):
+    """Users who saved the store as a favourite"""
+    store_id = str(store.id)
+    if connection.features.supports_json_field_contains:
+        return User.objects.filter(is_active=True, customer_profile__favorite_stores__contains=[store_id])
+    return User.objects.filter(is_active=True, customer_profile__favorite_stores__icontains=store_id)
+
+
+def all_customers():
+    return User.objects.filter(is_active=True, user_type='customer')
+
+
+class FanOutStats:
+    """Running counters for a fan-out, with throughput"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.users = 0
+        self.notifications = 0
+        self.emails = 0
+        self.sms = 0
+        self.opted_out = 0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def users_per_second(self):
+        return self.users / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'users': self.users,
+            'notifications': self.notifications,
+            'emails': self.emails,
+            'sms': self.sms,
+            'opted_out': self.opted_out,
+            'elapsed': round(self.elapsed, 2),
+            'users_per_second': round(self.users_per_second, 1),
+        }
+
+
+def _preference_default(flag):
+    return NotificationPreference._meta.get_field(flag).default
+
+
+def stream_recipients(audience, flags, chunk_size):
+    """
+    Yield lists of recipient rows from an audience queryset.
+
+    Walks the audience in primary-key order with keyset pagination, so each
+    chunk is a single indexed query, and LEFT JOINs the preference flags
+    (falling back to the model defaults for users without a row).
+    """
+    annotations = {
+        f'pref_{channel}': Coalesce(
+            f'notification_preferences__{flag}', Value(_preference_default(flag)), output_field=BooleanField()
+        )
+        for channel, flag in flags.items()
+    }
+    queryset = audience.annotate(**annotations).order_by('pk').values('pk', 'email', 'phone_number', *annotations)
+
+    last_pk = None
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]['pk']
+
+
+def fan_out(audience, notification_type, title, message, channels=('in_app',), related_object_id=None,
+            related_object_type='', action_url='', chunk_size=1000, progress=None):
+    """
+    Deliver one notice to every user in audience.
+
+    Each chunk of recipients becomes one bulk INSERT per table
+    (notifications, email/SMS logs and their outbox rows) inside its own
+    transaction; emails and SMS are then sent by the outbox worker.
+    progress, if given, is called with a FanOutStats after every chunk.
+    """
+    unknown = set(channels) - set(CHANNELS)
+    if unknown:
+        raise ValueError(f"Unknown channels: {', '.join(sorted(unknown))}")
+
+    type_flags = PREFERENCE_FLAGS.get(notification_type, {})
+    flags = {channel: type_flags[channel] for channel in channels if channel in type_flags}
+    stats = FanOutStats()
+
+    for chunk in stream_recipients(audience, flags, chunk_size):
+        notifications, email_logs, sms_logs = [], [], []
+        for row in chunk:
+            wanted = [channel for channel in channels if row.get(f'pref_{channel}', True)]
+            if not wanted:
+                stats.opted_out += 1
+                continue
+            if 'in_app' in wanted:
+                notifications.append(Notification(
+                    user_id=row['pk'],
+                    notification_type=notification_type,
+                    title=title,
+                    message=message,
+                    related_object_id=related_object_id,
+                    related_object_type=related_object_type,
+                    action_url=action_url
+                ))
+            if 'email' in wanted and row['email']:
+                email_logs.append(EmailLog(
+                    user_id=row['pk'],
+                    recipient_email=row['email'],
+                    subject=title,
+                    body=message,
+                    email_type=notification_type,
+                    related_object_id=related_object_id
+                ))
+            if 'sms' in wanted and row['phone_number']:
+                sms_logs.append(SMSLog(
+                    user_id=row['pk'],
+                    recipient_phone=row['phone_number'],
+                    message=message,
+                    sms_type=notification_type,
+                    related_object_id=related_object_id
+                ))
+
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=chunk_size)
+            EmailLog.objects.bulk_create(email_logs, batch_size=chunk_size)
+            enqueue_many('email', email_logs, batch_size=chunk_size)
+            SMSLog.objects.bulk_create(sms_logs, batch_size=chunk_size)
+            enqueue_many('sms', sms_logs, batch_size=chunk_size)
+            counters.adjust({notification.user_id: 1 for notification in notifications})
+            publish_on_commit([notification.live_event() for notification in notifications])
+
+        stats.users += len(chunk)
+        stats.notifications += len(notifications)
+        stats.emails += len(email_logs)
+        stats.sms += len(sms_logs)
+        if progress:
+            progress(stats)
+
+    return stats
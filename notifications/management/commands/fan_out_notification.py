@@ -0,0 +1,60 @@
+"""
+QuickBite Connect - Fan-out Notification Command
+Sends one notice to a store's followers or to all customers
+"""
+from django.core.management.base import BaseCommand, CommandError
+from stores.models import Store
+from notifications.fanout import CHANNELS, all_customers, fan_out, store_followers
+from notifications.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Sends a notification to every follower of a store (or every customer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', dest='notification_type', default='promotion',
+                            choices=[choice for choice, _ in Notification.TYPE_CHOICES])
+        parser.add_argument('--title', required=True)
+        parser.add_argument('--message', required=True)
+        parser.add_argument('--store', help='Store slug; defaults to all customers')
+        parser.add_argument('--channels', default='in_app', help=f"Comma-separated: {', '.join(CHANNELS)}")
+        parser.add_argument('--action-url', default='')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        channels = tuple(channel.strip() for channel in options['channels'].split(',') if channel.strip())
+        if not set(channels) <= set(CHANNELS):
+            raise CommandError(f"Channels must be among: {', '.join(CHANNELS)}")
+
+        related_object_id, related_object_type = None, ''
+        if options['store']:
+            store = Store.objects.filter(slug=options['store']).first()
+            if store is None:
+                raise CommandError(f"Store '{options['store']}' not found")
+            audience = store_followers(store)
+            related_object_id, related_object_type = store.id, 'store'
+        else:
+            audience = all_customers()
+
+        stats = fan_out(
+            audience,
+            options['notification_type'],
+            options['title'],
+            options['message'],
+            channels=channels,
+            related_object_id=related_object_id,
+            related_object_type=related_object_type,
+            action_url=options['action_url'],
+            chunk_size=options['chunk_size'],
+            progress=self.report
+        )
+        self.stdout.write(self.style.SUCCESS(self.format(stats.as_dict())))
+
+    def report(self, stats):
+        self.stdout.write(self.format(stats.as_dict()))
+
+    def format(self, data):
+        return (
+            "{users} users, {notifications} notifications, {emails} emails, {sms} SMS, "
+            "{opted_out} opted out ({users_per_second} users/s, {elapsed}s)"
+        ).format(**data)
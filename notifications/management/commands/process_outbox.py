@@ -0,0 +1,69 @@
+"""
+QuickBite Connect - Process Outbox Command
+Worker that delivers queued emails and SMS
+"""
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from notifications.outbox import OutboxWorker
+from notifications.transports import close_email_connection
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued emails and SMS using a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of worker threads')
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed per batch')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.totals = {'sent': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+
+        threads = [
+            threading.Thread(target=self.work, args=(options,), name=f'outbox-{i}', daemon=True)
+            for i in range(options['workers'])
+        ]
+        self.stdout.write(f"Processing outbox with {len(threads)} workers...")
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping after current batches...'))
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Sent {sent}, skipped {skipped}, retried {retried}, failed {failed}'.format(**self.totals)
+        ))
+
+    def work(self, options):
+        """Claim and process batches in this thread until stopped"""
+        worker = OutboxWorker(batch_size=options['batch_size'])
+        try:
+            while not self.stop.is_set():
+                try:
+                    stats = worker.run_once()
+                except Exception as e:
+                    self.stderr.write(f"Outbox batch failed: {e}")
+                    stats = None
+                if stats is None:
+                    if options['once']:
+                        return
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                with self.lock:
+                    for key, value in stats.items():
+                        self.totals[key] += value
+        finally:
+            close_email_connection()
+            connections.close_all()
@@ -3,6 +3,7 @@ QuickBite Connect - Notification Models
 """
 import uuid
 from django.db import models
+from django.utils import timezone
 from users.models import User
 
 
@@ -56,18 +57,41 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', '-created_at', '-id']),
         ]
     
     def __str__(self):
         return f"{self.user.email} - {self.title}"
     
     def mark_as_read(self):
-        """Mark notification as read"""
-        if not self.is_read:
-            from django.utils import timezone
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+        """
+        Mark notification as read.
+        
+        A conditional UPDATE decides whether this call did the marking, so
+        concurrent requests (or stale instances) decrement the unread
+        counter only once.
+        """
+        from .counters import adjust
+        now = timezone.now()
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True, read_at=now)
+        if updated:
+            self.read_at = now
+            adjust({self.user_id: -1})
+        self.is_read = True
+    
+    def live_event(self):
+        """(channel, message) pushing this notification to the user's event stream"""
+        from config.events import make_message, user_channel
+        return user_channel(self.user_id), make_message('notification', {
+            'id': self.pk,
+            'notification_type': self.notification_type,
+            'title': self.title,
+            'message': self.message,
+            'related_object_id': self.related_object_id,
+            'related_object_type': self.related_object_type,
+            'action_url': self.action_url,
+            'created_at': self.created_at,
+        })
 
 
 class EmailLog(models.Model):
@@ -78,6 +102,7 @@ class EmailLog(models.Model):
         ('sent', 'Sent'),
         ('failed', 'Failed'),
         ('bounced', 'Bounced'),
+        ('skipped', 'Skipped'),
     )
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -119,6 +144,7 @@ class SMSLog(models.Model):
         ('sent', 'Sent'),
         ('failed', 'Failed'),
         ('delivered', 'Delivered'),
+        ('skipped', 'Skipped'),
     )
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -155,6 +181,59 @@ class SMSLog(models.Model):
         return f"{self.recipient_phone} - {self.sms_type}"
 
 
+class OutboundMessage(models.Model):
+    """Outbox entry for an email or SMS waiting to be delivered by the worker"""
+    
+    CHANNEL_CHOICES = (
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    )
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('sent', 'Sent'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    email_log = models.ForeignKey(EmailLog, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_entries')
+    sms_log = models.ForeignKey(SMSLog, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_entries')
+    
+    # Delivery State
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    # Worker Lease
+    claim_token = models.UUIDField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'notification_outbox'
+        verbose_name = 'Outbound Message'
+        verbose_name_plural = 'Outbound Messages'
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['claim_token']),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel} - {self.status}"
+    
+    @property
+    def log(self):
+        return self.email_log if self.channel == 'email' else self.sms_log
+
+
 class NotificationPreference(models.Model):
     """User notification preferences"""
     
@@ -0,0 +1,191 @@
+"""
+QuickBite Connect - Notification Outbox
+Claiming, delivering and recording queued emails and SMS
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from .models import OutboundMessage, EmailLog, SMSLog, NotificationPreference
+from .transports import DeliveryResult, get_transport
+
+LEASE_SECONDS = 300
+
+# (channel, message type) -> preference flag that must be on to deliver
+PREFERENCE_FLAGS = {
+    ('email', 'promotion'): 'email_promotions',
+    ('sms', 'promotion'): 'sms_promotions',
+}
+
+OPT_OUT_MESSAGES = {
+    'email': 'User opted out of promotional emails',
+    'sms': 'User opted out of promotional SMS',
+}
+
+
+def enqueue(channel, log):
+    """Queue a logged email/SMS for the worker"""
+    return OutboundMessage.objects.create(
+        channel=channel,
+        email_log=log if channel == 'email' else None,
+        sms_log=log if channel == 'sms' else None
+    )
+
+
+def enqueue_many(channel, logs, batch_size=1000):
+    """Queue many logged emails/SMS with batched INSERTs"""
+    return OutboundMessage.objects.bulk_create(
+        [
+            OutboundMessage(
+                channel=channel,
+                email_log=log if channel == 'email' else None,
+                sms_log=log if channel == 'sms' else None
+            )
+            for log in logs
+        ],
+        batch_size=batch_size
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the given attempt number"""
+    base = settings.NOTIFICATION_RETRY_BASE_DELAY
+    delay = min(base * (2 ** (attempts - 1)), settings.NOTIFICATION_RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(batch_size, lease_seconds=LEASE_SECONDS):
+    """
+    Lease up to batch_size due entries to the calling worker.
+
+    Candidates are picked first and then claimed with a conditional UPDATE
+    stamping a fresh token, so concurrent workers never receive the same
+    row. Entries whose lease expired (crashed worker) are picked up again.
+    """
+    now = timezone.now()
+    due = Q(status='pending', next_attempt_at__lte=now) | Q(status='processing', locked_until__lt=now)
+    ids = list(
+        OutboundMessage.objects.filter(due).order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4()
+    OutboundMessage.objects.filter(due, id__in=ids).update(
+        status='processing',
+        claim_token=token,
+        locked_until=now + timedelta(seconds=lease_seconds)
+    )
+    return list(OutboundMessage.objects.filter(claim_token=token).select_related('email_log', 'sms_log'))
+
+
+def _message_type(entry):
+    log = entry.log
+    return log.email_type if entry.channel == 'email' else log.sms_type
+
+
+def _opted_out(entry, preferences):
+    flag = PREFERENCE_FLAGS.get((entry.channel, _message_type(entry)))
+    prefs = preferences.get(entry.log.user_id)
+    return bool(flag and prefs and not getattr(prefs, flag))
+
+
+def process_batch(entries, transports):
+    """
+    Deliver claimed entries and record the outcome.
+
+    Preferences for the whole batch are loaded in one query, each channel
+    is sent with a single send_many call, and logs and outbox rows are
+    written back with one bulk UPDATE per table. Returns a dict of
+    outcome counts.
+    """
+    now = timezone.now()
+    max_attempts = settings.NOTIFICATION_MAX_ATTEMPTS
+    user_ids = {entry.log.user_id for entry in entries if entry.log.user_id}
+    preferences = {
+        prefs.user_id: prefs
+        for prefs in NotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+    stats = {'sent': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+
+    deliverable = {'email': [], 'sms': []}
+    for entry in entries:
+        if _opted_out(entry, preferences):
+            entry.status = entry.log.status = 'skipped'
+            entry.log.error_message = OPT_OUT_MESSAGES[entry.channel]
+            stats['skipped'] += 1
+        else:
+            deliverable[entry.channel].append(entry)
+
+    for channel, channel_entries in deliverable.items():
+        if not channel_entries:
+            continue
+        try:
+            results = transports[channel].send_many([entry.log for entry in channel_entries])
+        except Exception as e:
+            results = [DeliveryResult(False, str(e))] * len(channel_entries)
+        for entry, result in zip(channel_entries, results):
+            log = entry.log
+            entry.attempts += 1
+            if result.success:
+                entry.status = log.status = 'sent'
+                entry.last_error = log.error_message = ''
+                log.sent_at = now
+                if channel == 'sms':
+                    log.twilio_sid = result.reference
+                    log.twilio_status = result.status
+                stats['sent'] += 1
+            elif entry.attempts >= max_attempts:
+                entry.status = log.status = 'failed'
+                entry.last_error = log.error_message = result.error
+                stats['failed'] += 1
+            else:
+                entry.status = 'pending'
+                entry.next_attempt_at = now + retry_delay(entry.attempts)
+                entry.last_error = log.error_message = result.error
+                stats['retried'] += 1
+
+    for entry in entries:
+        entry.claim_token = None
+        entry.locked_until = None
+        entry.updated_at = now
+
+    OutboundMessage.objects.bulk_update(
+        entries,
+        ['status', 'attempts', 'next_attempt_at', 'last_error', 'claim_token', 'locked_until', 'updated_at']
+    )
+    email_logs = [entry.email_log for entry in entries if entry.channel == 'email']
+    if email_logs:
+        EmailLog.objects.bulk_update(email_logs, ['status', 'error_message', 'sent_at'])
+    sms_logs = [entry.sms_log for entry in entries if entry.channel == 'sms']
+    if sms_logs:
+        SMSLog.objects.bulk_update(sms_logs, ['status', 'error_message', 'sent_at', 'twilio_sid', 'twilio_status'])
+    return stats
+
+
+class OutboxWorker:
+    """Claims and processes batches until the queue is drained or stopped"""
+
+    def __init__(self, batch_size=100, transports=None):
+        self.batch_size = batch_size
+        self.transports = transports or {channel: get_transport(channel) for channel in ('email', 'sms')}
+
+    def run_once(self):
+        """Process a single batch; returns its stats or None when idle"""
+        entries = claim_batch(self.batch_size)
+        if not entries:
+            return None
+        return process_batch(entries, self.transports)
+
+    def drain(self):
+        """Process batches until nothing is due, returning combined stats"""
+        totals = {'sent': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+        while True:
+            stats = self.run_once()
+            if stats is None:
+                return totals
+            for key, value in stats.items():
+                totals[key] += value
@@ -2,12 +2,12 @@
 QuickBite Connect - Notification Services
 Email and SMS sending logic
 """
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.db import transaction
 from django.template.loader import render_to_string
-from django.conf import settings
 from django.utils import timezone
-from twilio.rest import Client
-from .models import Notification, EmailLog, SMSLog, NotificationPreference
+from . import counters
+from .models import Notification, EmailLog, SMSLog
+from .outbox import enqueue, enqueue_many
 
 
 class NotificationService:
@@ -32,8 +32,8 @@ class NotificationService:
     
     @staticmethod
     def get_unread_count(user):
-        """Get unread notification count for user"""
-        return Notification.objects.filter(user=user, is_read=False).count()
+        """Get unread notification count for user (cached)"""
+        return counters.get_unread_count(user.pk)
     
     @staticmethod
     def mark_all_as_read(user):
@@ -42,67 +42,58 @@ class NotificationService:
             is_read=True,
             read_at=timezone.now()
         )
+        counters.reset(user.pk, 0)
 
 
 class EmailService:
-    """Service for sending emails"""
+    """Service for sending emails (delivered by the process_outbox worker)"""
     
     @staticmethod
     def send_email(recipient_email, subject, message, html_message=None, email_type='', user=None, related_object_id=None):
-        """Send email and log it"""
-        
-        # Create email log
-        email_log = EmailLog.objects.create(
-            user=user,
-            recipient_email=recipient_email,
-            subject=subject,
-            body=message,
-            html_body=html_message or '',
-            email_type=email_type,
-            related_object_id=related_object_id,
-            status='pending'
-        )
-        
+        """Log an email and queue it for the outbox worker"""
         try:
-            # Check user preferences
-            if user:
-                prefs = NotificationPreference.objects.filter(user=user).first()
-                if prefs and email_type == 'promotion' and not prefs.email_promotions:
-                    email_log.status = 'skipped'
-                    email_log.error_message = 'User opted out of promotional emails'
-                    email_log.save()
-                    return {'success': False, 'error': 'User opted out'}
-            
-            # Send email
-            if html_message:
-                email = EmailMultiAlternatives(
+            with transaction.atomic():
+                email_log = EmailLog.objects.create(
+                    user=user,
+                    recipient_email=recipient_email,
                     subject=subject,
                     body=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[recipient_email]
+                    html_body=html_message or '',
+                    email_type=email_type,
+                    related_object_id=related_object_id,
+                    status='pending'
                 )
-                email.attach_alternative(html_message, "text/html")
-                email.send()
-            else:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[recipient_email],
-                    fail_silently=False
-                )
-            
-            # Update log
-            email_log.status = 'sent'
-            email_log.sent_at = timezone.now()
-            email_log.save()
-            
+                enqueue('email', email_log)
             return {'success': True, 'email_log': email_log}
-            
         except Exception as e:
-            email_log.status = 'failed'
-            email_log.error_message = str(e)
-            email_log.save()
+            return {'success': False, 'error': str(e)}
+    
+    @staticmethod
+    def send_many(messages):
+        """
+        Log and queue many emails with batched INSERTs.
+        
+        messages is an iterable of dicts of send_email keyword arguments;
+        the worker delivers them over its persistent connection.
+        """
+        try:
+            with transaction.atomic():
+                email_logs = EmailLog.objects.bulk_create([
+                    EmailLog(
+                        user=message.get('user'),
+                        recipient_email=message['recipient_email'],
+                        subject=message['subject'],
+                        body=message['message'],
+                        html_body=message.get('html_message') or '',
+                        email_type=message.get('email_type', ''),
+                        related_object_id=message.get('related_object_id'),
+                        status='pending'
+                    )
+                    for message in messages
+                ], batch_size=1000)
+                enqueue_many('email', email_logs)
+            return {'success': True, 'count': len(email_logs)}
+        except Exception as e:
             return {'success': False, 'error': str(e)}
     
     @staticmethod
@@ -192,58 +183,50 @@ class EmailService:
 
 
 class SMSService:
-    """Service for sending SMS via Twilio"""
+    """Service for sending SMS via Twilio (delivered by the process_outbox worker)"""
     
     @staticmethod
     def send_sms(recipient_phone, message, sms_type='', user=None, related_object_id=None):
-        """Send SMS and log it"""
-        
-        # Create SMS log
-        sms_log = SMSLog.objects.create(
-            user=user,
-            recipient_phone=recipient_phone,
-            message=message,
-            sms_type=sms_type,
-            related_object_id=related_object_id,
-            status='pending'
-        )
-        
+        """Log an SMS and queue it for the outbox worker"""
         try:
-            # Check user preferences
-            if user:
-                prefs = NotificationPreference.objects.filter(user=user).first()
-                if prefs and sms_type == 'promotion' and not prefs.sms_promotions:
-                    sms_log.status = 'skipped'
-                    sms_log.error_message = 'User opted out of promotional SMS'
-                    sms_log.save()
-                    return {'success': False, 'error': 'User opted out'}
-            
-            # Initialize Twilio client
-            if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
-                raise Exception("Twilio credentials not configured")
-            
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            
-            # Send SMS
-            sms_message = client.messages.create(
-                body=message,
-                from_=settings.TWILIO_PHONE_NUMBER,
-                to=recipient_phone
-            )
-            
-            # Update log
-            sms_log.status = 'sent'
-            sms_log.twilio_sid = sms_message.sid
-            sms_log.twilio_status = sms_message.status
-            sms_log.sent_at = timezone.now()
-            sms_log.save()
-            
+            with transaction.atomic():
+                sms_log = SMSLog.objects.create(
+                    user=user,
+                    recipient_phone=recipient_phone,
+                    message=message,
+                    sms_type=sms_type,
+                    related_object_id=related_object_id,
+                    status='pending'
+                )
+                enqueue('sms', sms_log)
             return {'success': True, 'sms_log': sms_log}
-            
         except Exception as e:
-            sms_log.status = 'failed'
-            sms_log.error_message = str(e)
-            sms_log.save()
+            return {'success': False, 'error': str(e)}
+    
+    @staticmethod
+    def send_many(messages):
+        """
+        Log and queue many SMS with batched INSERTs.
+        
+        messages is an iterable of dicts of send_sms keyword arguments;
+        the worker delivers them through the shared Twilio client.
+        """
+        try:
+            with transaction.atomic():
+                sms_logs = SMSLog.objects.bulk_create([
+                    SMSLog(
+                        user=message.get('user'),
+                        recipient_phone=message['recipient_phone'],
+                        message=message['message'],
+                        sms_type=message.get('sms_type', ''),
+                        related_object_id=message.get('related_object_id'),
+                        status='pending'
+                    )
+                    for message in messages
+                ], batch_size=1000)
+                enqueue_many('sms', sms_logs)
+            return {'success': True, 'count': len(sms_logs)}
+        except Exception as e:
             return {'success': False, 'error': str(e)}
     
     @staticmethod
@@ -0,0 +1,28 @@
+"""
+QuickBite Connect - Notification Signals
+"""
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from config.events import publish_on_commit
+from . import counters
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        counters.adjust({instance.user_id: 1})
+    if created:
+        publish_on_commit([instance.live_event()])
+
+
+@receiver(pre_delete, sender=Notification)
+def lock_deleted_notification(sender, instance, **kwargs):
+    """Note whether the stored row is unread; the instance may be stale"""
+    instance._was_unread = Notification.objects.select_for_update().filter(pk=instance.pk, is_read=False).exists()
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if instance._was_unread:
+        counters.adjust({instance.user_id: -1})
@@ -1,3 +1,302 @@
-from django.test import TestCase
+"""
+QuickBite Connect - Notification Tests
+"""
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.admin.sites import AdminSite
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.testing import make_owner, make_store
+from users.models import User, CustomerProfile
+from . import counters
+from .admin import NotificationAdmin
+from .fanout import fan_out, store_followers
+from .models import Notification, EmailLog, SMSLog, OutboundMessage, NotificationPreference
+from .outbox import OutboxWorker
+from .services import EmailService, NotificationService, SMSService
+from .transports import EmailTransport, LocmemTransport, close_email_connection, get_email_connection
+
+FAKE_TRANSPORTS = {
+    'email': 'notifications.transports.LocmemTransport',
+    'sms': 'notifications.transports.LocmemTransport',
+}
+
+
+@override_settings(NOTIFICATION_TRANSPORTS=FAKE_TRANSPORTS, NOTIFICATION_MAX_ATTEMPTS=2)
+class OutboxTests(TestCase):
+    """Requests only queue messages; the worker delivers them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='customer@test.com', password='pass')
+
+    def setUp(self):
+        LocmemTransport.reset()
+
+    def test_send_email_only_enqueues(self):
+        result = EmailService.send_email('customer@test.com', 'Hello', 'Body', user=self.user)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(LocmemTransport.sent, [])
+        entry = OutboundMessage.objects.get()
+        self.assertEqual((entry.channel, entry.status, entry.email_log), ('email', 'pending', result['email_log']))
+
+    def test_worker_delivers_and_marks_logs_sent(self):
+        EmailService.send_email('customer@test.com', 'Hello', 'Body', user=self.user)
+        SMSService.send_sms('+15550000001', 'Hi', user=self.user)
+
+        stats = OutboxWorker().drain()
+
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(len(LocmemTransport.sent), 2)
+        self.assertEqual(EmailLog.objects.get().status, 'sent')
+        sms_log = SMSLog.objects.get()
+        self.assertEqual(sms_log.status, 'sent')
+        self.assertTrue(sms_log.twilio_sid)
+        self.assertFalse(OutboundMessage.objects.exclude(status='sent').exists())
+
+    def test_promotions_respect_preferences(self):
+        NotificationPreference.objects.create(user=self.user, email_promotions=False)
+        EmailService.send_email('customer@test.com', 'Sale', 'Body', email_type='promotion', user=self.user)
+
+        stats = OutboxWorker().drain()
+
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(LocmemTransport.sent, [])
+        self.assertEqual(EmailLog.objects.get().status, 'skipped')
+
+    def test_failures_are_retried_with_backoff_then_failed(self):
+        LocmemTransport.failing_recipients = {'customer@test.com'}
+        EmailService.send_email('customer@test.com', 'Hello', 'Body', user=self.user)
+
+        stats = OutboxWorker().drain()
+        entry = OutboundMessage.objects.get()
+        self.assertEqual(stats['retried'], 1)
+        self.assertEqual((entry.status, entry.attempts), ('pending', 1))
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+        OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        stats = OutboxWorker().drain()
+        entry.refresh_from_db()
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual((entry.status, entry.attempts), ('failed', 2))
+        self.assertEqual(EmailLog.objects.get().status, 'failed')
+
+
+class EmailConnectionReuseTests(TestCase):
+    """Bulk sends share one connection per worker thread"""
+
+    def tearDown(self):
+        close_email_connection()
+
+    def test_send_many_queues_with_constant_queries(self):
+        messages = [
+            {'recipient_email': f'user{i}@test.com', 'subject': 'Sale', 'message': 'Body', 'email_type': 'promotion'}
+            for i in range(25)
+        ]
+        with self.assertNumQueries(4):  # savepoint, two bulk INSERTs, release
+            result = EmailService.send_many(messages)
+
+        self.assertEqual(result['count'], 25)
+        self.assertEqual(OutboundMessage.objects.filter(channel='email').count(), 25)
+
+    def test_batches_reuse_the_thread_connection(self):
+        EmailService.send_many([
+            {'recipient_email': f'user{i}@test.com', 'subject': 'Hi', 'message': 'Body'} for i in range(3)
+        ])
+        logs = list(EmailLog.objects.all())
+        transport = EmailTransport()
+
+        first = get_email_connection()
+        transport.send_many(logs[:2])
+        transport.send_many(logs[2:])
+
+        self.assertIs(get_email_connection(), first)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_connection_is_reopened_on_request(self):
+        first = get_email_connection()
+        self.assertIsNot(get_email_connection(reopen=True), first)
+
+
+class FanOutTests(TestCase):
+    """Fan-out writes notifications and outbox rows in per-chunk batches"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.store = make_store(make_owner())
+        for i in range(12):
+            user = User.objects.create_user(email=f'user{i}@test.com', password='pass')
+            CustomerProfile.objects.create(user=user, favorite_stores=[str(cls.store.id)] if i < 10 else [])
+            if i < 2:
+                NotificationPreference.objects.create(user=user, push_promotions=False, email_promotions=False)
+
+    def test_followers_receive_notice_unless_opted_out(self):
+        stats = fan_out(
+            store_followers(self.store), 'promotion', 'Sale', 'Half off',
+            channels=('in_app', 'email'), chunk_size=4
+        )
+
+        self.assertEqual((stats.users, stats.opted_out), (10, 2))
+        self.assertEqual(Notification.objects.count(), 8)
+        self.assertEqual(OutboundMessage.objects.filter(channel='email').count(), 8)
+        self.assertFalse(Notification.objects.filter(user__email__in=['user0@test.com', 'user1@test.com']).exists())
+
+    def test_query_count_grows_per_chunk_not_per_user(self):
+        # 3 chunks x (select, savepoint, insert, release) + the final empty select
+        with self.assertNumQueries(3 * 4 + 1):
+            fan_out(store_followers(self.store), 'promotion', 'Sale', 'Half off', chunk_size=4)
+
+
+class UnreadCounterTests(TestCase):
+    """Unread counts are served from cache and kept in step with writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@test.com', password='pass')
+
+    def setUp(self):
+        cache.clear()
+
+    def notify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(user=self.user, notification_type='system', title='Hi', message='Body')
+
+    def test_count_is_cached_after_first_read(self):
+        self.notify()
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+
+    def test_writes_adjust_the_cached_count(self):
+        first = self.notify()
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        second = self.notify()
+        self.notify()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.mark_as_read()
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationService.mark_all_as_read(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+
+    def test_stale_instances_are_counted_once(self):
+        notification = self.notify()
+        self.notify()
+        self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+        first, second = (Notification.objects.get(pk=notification.pk) for _ in range(2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.mark_as_read()
+        with self.captureOnCommitCallbacks(execute=True):
+            second.mark_as_read()
+        with self.captureOnCommitCallbacks(execute=True):
+            second.is_read = False  # stale copy from before the read
+            second.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+
+    def test_negative_drift_triggers_a_recount(self):
+        self.notify()
+        NotificationService.get_unread_count(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.adjust({self.user.pk: -5})
+
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+
+    def test_admin_actions_forget_counters_after_the_update_commits(self):
+        self.notify()
+        self.notify()
+        self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+        admin = NotificationAdmin(Notification, AdminSite())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            admin.mark_as_read(None, Notification.objects.filter(user=self.user, is_read=False))
+            # Nothing is forgotten before the UPDATE is committed
+            self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(NotificationService.get_unread_count(self.user), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.mark_as_unread(None, Notification.objects.filter(user=self.user))
+        self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+
+
+class FeedPaginationTests(TestCase):
+    """Keyset pagination on request, page numbers by default"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@test.com', password='pass')
+        cls.notifications = [
+            Notification.objects.create(user=cls.user, notification_type='system', title=f'N{i}', message='Body')
+            for i in range(7)
+        ]
+        start = timezone.now() - timedelta(hours=1)
+        for i, notification in enumerate(cls.notifications):
+            Notification.objects.filter(pk=notification.pk).update(created_at=start + timedelta(seconds=i))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, page_size=3):
+        """Titles of every page, following next links"""
+        pages = []
+        data = self.get('/api/notifications/', pagination='cursor', page_size=page_size)
+        while True:
+            pages.append([row['title'] for row in data['results']])
+            if not data['next']:
+                return pages
+            data = self.get(data['next'])
+
+    def test_default_is_page_number_pagination(self):
+        data = self.get('/api/notifications/')
+        self.assertEqual(data['count'], 7)
+        self.assertEqual([row['title'] for row in data['results']][:2], ['N6', 'N5'])
+
+    def test_equal_timestamps_are_ordered_by_pk(self):
+        moment = timezone.now()
+        Notification.objects.filter(user=self.user).update(created_at=moment)
+        expected = [
+            n.title for n in sorted(self.notifications, key=lambda n: n.pk.hex, reverse=True)
+        ]
+
+        pages = self.walk()
+        self.assertEqual([title for page in pages for title in page], expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+    def test_cursor_is_stable_under_inserts(self):
+        first = self.get('/api/notifications/', pagination='cursor', page_size=3)
+        Notification.objects.create(user=self.user, notification_type='system', title='New', message='Body')
+
+        second = self.get(first['next'])
+        self.assertEqual([row['title'] for row in second['results']], ['N3', 'N2', 'N1'])
+        previous = self.get(second['previous'])
+        self.assertEqual(
+            [row['title'] for row in previous['results']], [row['title'] for row in first['results']]
+        )
+
+    def test_bad_cursor_is_rejected(self):
+        for cursor in ('garbage', 'eyJjIjogIm5vcGUifQ=='):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/notifications/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
@@ -0,0 +1,176 @@
+"""
+QuickBite Connect - Notification Transports
+Delivery backends used by the outbox worker
+"""
+import os
+import smtplib
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils.module_loading import import_string
+
+DeliveryResult = namedtuple('DeliveryResult', ['success', 'error', 'reference', 'status'], defaults=('', '', ''))
+
+# Errors meaning the SMTP connection itself is gone rather than the message
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+_email_local = threading.local()
+_twilio_lock = threading.Lock()
+_twilio = {'pid': None, 'client': None}
+
+
+def get_email_connection(reopen=False):
+    """
+    Return this thread's open email connection, (re)opening it as needed.
+    
+    SMTP sessions are not thread-safe, so each thread keeps its own. A
+    connection idle for longer than EMAIL_CONNECTION_MAX_IDLE seconds is
+    replaced before use, since servers drop idle clients.
+    """
+    connection = getattr(_email_local, 'connection', None)
+    now = time.monotonic()
+    idle = now - getattr(_email_local, 'last_used', now)
+    if connection is not None and (reopen or idle > settings.EMAIL_CONNECTION_MAX_IDLE):
+        close_email_connection()
+        connection = None
+    
+    if connection is None:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        _email_local.connection = connection
+    _email_local.last_used = now
+    return connection
+
+
+def close_email_connection():
+    """Close this thread's email connection, if any"""
+    connection = getattr(_email_local, 'connection', None)
+    _email_local.connection = None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_twilio_client():
+    """
+    Return the process-wide Twilio client.
+    
+    The client shares one requests session whose connection pool is sized
+    by TWILIO_HTTP_POOL_SIZE, so concurrent workers reuse TLS connections
+    instead of handshaking per message. Rebuilt after a fork.
+    """
+    with _twilio_lock:
+        if _twilio['client'] is None or _twilio['pid'] != os.getpid():
+            if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
+                raise Exception("Twilio credentials not configured")
+            from requests.adapters import HTTPAdapter
+            from twilio.http.http_client import TwilioHttpClient
+            from twilio.rest import Client
+            
+            http_client = TwilioHttpClient(pool_connections=True, timeout=settings.TWILIO_HTTP_TIMEOUT)
+            http_client.session.mount('https://', HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.TWILIO_HTTP_POOL_SIZE,
+                max_retries=2
+            ))
+            _twilio['client'] = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client)
+            _twilio['pid'] = os.getpid()
+        return _twilio['client']
+
+
+def get_transport(channel):
+    """Instantiate the transport configured for a channel ('email' or 'sms')"""
+    return import_string(settings.NOTIFICATION_TRANSPORTS[channel])()
+
+
+class EmailTransport:
+    """Sends EmailLog rows through Django's configured email backend"""
+    
+    def build_message(self, email_log, connection):
+        message = EmailMultiAlternatives(
+            subject=email_log.subject,
+            body=email_log.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email_log.recipient_email],
+            connection=connection
+        )
+        if email_log.html_body:
+            message.attach_alternative(email_log.html_body, "text/html")
+        return message
+    
+    def send_many(self, email_logs):
+        """Send a batch over the thread's persistent connection, returning a result per log"""
+        try:
+            connection = get_email_connection()
+        except Exception as e:
+            return [DeliveryResult(False, str(e)) for _ in email_logs]
+        
+        results = []
+        for email_log in email_logs:
+            try:
+                try:
+                    connection.send_messages([self.build_message(email_log, connection)])
+                except CONNECTION_ERRORS:
+                    # Server dropped us (idle timeout, restart): reconnect once
+                    connection = get_email_connection(reopen=True)
+                    connection.send_messages([self.build_message(email_log, connection)])
+                results.append(DeliveryResult(True))
+            except Exception as e:
+                results.append(DeliveryResult(False, str(e)))
+        return results
+
+
+class TwilioSMSTransport:
+    """Sends SMSLog rows through the process-wide Twilio client"""
+    
+    def send_many(self, sms_logs):
+        """Send a batch over the pooled HTTP session, returning a result per log"""
+        try:
+            client = get_twilio_client()
+        except Exception as e:
+            return [DeliveryResult(False, str(e)) for _ in sms_logs]
+        
+        results = []
+        for sms_log in sms_logs:
+            try:
+                sms_message = client.messages.create(
+                    body=sms_log.message,
+                    from_=settings.TWILIO_PHONE_NUMBER,
+                    to=sms_log.recipient_phone
+                )
+                results.append(DeliveryResult(True, reference=sms_message.sid, status=sms_message.status))
+            except Exception as e:
+                results.append(DeliveryResult(False, str(e)))
+        return results
+
+
+class LocmemTransport:
+    """
+    In-process fake for tests and local development.
+    
+    Records every delivered log in ``LocmemTransport.sent`` and fails any
+    recipient listed in ``LocmemTransport.failing_recipients``.
+    """
+    sent = []
+    failing_recipients = set()
+    
+    @classmethod
+    def reset(cls):
+        cls.sent = []
+        cls.failing_recipients = set()
+    
+    def send_many(self, logs):
+        results = []
+        for log in logs:
+            recipient = getattr(log, 'recipient_email', None) or getattr(log, 'recipient_phone', '')
+            if recipient in self.failing_recipients:
+                results.append(DeliveryResult(False, f'Simulated failure for {recipient}'))
+            else:
+                self.sent.append(log)
+                results.append(DeliveryResult(True, reference=f'locmem-{len(self.sent)}', status='sent'))
+        return results
@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from config.pagination import FeedPagination
 from .models import Notification, NotificationPreference, PushToken
 from .serializers import (
     NotificationSerializer,
@@ -20,6 +21,7 @@ class NotificationListView(generics.ListAPIView):
     """API endpoint to list user's notifications"""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
@@ -14,6 +14,7 @@ class CartItemInline(admin.TabularInline):
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'store', 'total_items', 'subtotal', 'created_at')
+    list_select_related = ('user', 'store')
     list_filter = ('store', 'created_at')
     search_fields = ('user__email', 'session_key')
     readonly_fields = ('total_items', 'subtotal', 'total', 'created_at', 'updated_at')
@@ -70,16 +71,20 @@ class OrderAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_confirmed', 'mark_as_preparing', 'mark_as_delivered']
     
+    def transition(self, request, queryset, status):
+        for order in queryset:
+            order.transition_to(status, changed_by=request.user, notes='Updated from admin')
+    
     def mark_as_confirmed(self, request, queryset):
-        queryset.update(status='confirmed')
+        self.transition(request, queryset, 'confirmed')
     mark_as_confirmed.short_description = "Mark as confirmed"
     
     def mark_as_preparing(self, request, queryset):
-        queryset.update(status='preparing')
+        self.transition(request, queryset, 'preparing')
     mark_as_preparing.short_description = "Mark as preparing"
     
     def mark_as_delivered(self, request, queryset):
-        queryset.update(status='delivered')
+        self.transition(request, queryset, 'delivered')
     mark_as_delivered.short_description = "Mark as delivered"
 
 
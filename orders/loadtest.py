@@ -0,0 +1,256 @@
+"""
+QuickBite Connect - Checkout Load Test
+Concurrent add-to-cart and checkout against the same low-stock products
+
+run() creates a throwaway store with a few low-stock products and one
+customer per worker thread, then lets the workers race through
+POST /api/orders/cart/add/ and POST /api/orders/create/ at the same
+time. Afterwards every product is checked against the orders that
+actually committed: stock must equal the initial stock less the
+quantity sold and never go negative, and total_sold and the 'sale'
+InventoryLog rows must account for exactly that quantity.
+
+Each worker uses its own database connection, so the same code
+exercises SQLite's database lock and PostgreSQL's row locks.
+"""
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal
+
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory, force_authenticate
+from config.profiling import percentile
+from orders.models import Order, OrderItem
+from orders.views import AddToCartView, ClearCartView, OrderCreateView
+from products.models import InventoryLog, Product
+from stores.models import Store
+from users.models import Address, User
+
+EMAIL_DOMAIN = 'loadtest.quickbite.test'
+
+factory = APIRequestFactory()
+add_to_cart = AddToCartView.as_view()
+clear_cart = ClearCartView.as_view()
+create_order = OrderCreateView.as_view()
+
+
+def classify_error(error):
+    """Outcome name for an exception raised by a checkout"""
+    message = str(error).lower()
+    if 'deadlock' in message:
+        return 'deadlock'
+    if 'could not serialize' in message or 'serialization' in message:
+        return 'serialization_failure'
+    if 'locked' in message or 'busy' in message or 'lock timeout' in message:
+        return 'lock_timeout'
+    return 'error'
+
+
+def create_fixture(run_id, workers, products, stock):
+    """Store, products and one customer with an address per worker"""
+    owner = User.objects.create_user(
+        email=f'owner-{run_id}@{EMAIL_DOMAIN}', password=None, user_type='store_owner'
+    )
+    store = Store.objects.create(
+        owner=owner, name=f'Load Test {run_id}', slug=f'load-test-{run_id}', description='Checkout load test',
+        phone_number='+15550000000', email=f'store-{run_id}@{EMAIL_DOMAIN}', address_line1='1 Main St',
+        city='New York', state='NY', postal_code='10001', status='approved'
+    )
+    items = [
+        Product.objects.create(
+            store=store, name=f'Item {i}', slug=f'item-{i}', description='Load test item',
+            price=Decimal('5.00'), stock_quantity=stock
+        )
+        for i in range(products)
+    ]
+    customers = []
+    for i in range(workers):
+        customer = User.objects.create_user(email=f'customer{i}-{run_id}@{EMAIL_DOMAIN}', password=None)
+        address = Address.objects.create(
+            user=customer, address_line1=f'{i} Load St', city='New York', state='NY',
+            postal_code='10001', is_default=True
+        )
+        customers.append((customer, address))
+    return store, items, customers
+
+
+def remove_fixture(run_id):
+    """Delete everything a run created; stores and orders cascade from the users"""
+    User.objects.filter(email__endswith=f'-{run_id}@{EMAIL_DOMAIN}').delete()
+
+
+class Worker(threading.Thread):
+    """One customer repeatedly filling a cart and checking out"""
+
+    def __init__(self, store, products, customer, address, attempts, quantity, barrier, seed):
+        super().__init__(daemon=True)
+        self.store = store
+        self.products = products
+        self.customer = customer
+        self.address = address
+        self.attempts = attempts
+        self.quantity = quantity
+        self.barrier = barrier
+        self.random = random.Random(seed)
+        self.outcomes = Counter()
+        self.latencies = {'add_to_cart': [], 'checkout': []}
+        self.errors = []
+
+    def call(self, view, method, path, data=None):
+        """
+        Call a view directly as the worker's customer.
+
+        The test Client is avoided on purpose: it collects request
+        exceptions through a global signal, so under concurrency one
+        thread's failure would be raised in another thread's request.
+        """
+        request = getattr(factory, method)(path, data, format='json')
+        force_authenticate(request, user=self.customer)
+        return view(request)
+
+    def timed(self, step, view, path, data):
+        started = time.perf_counter()
+        try:
+            return self.call(view, 'post', path, data)
+        finally:
+            self.latencies[step].append((time.perf_counter() - started) * 1000)
+
+    def attempt(self):
+        """Add every product (in random order) to the cart, then check out"""
+        self.call(clear_cart, 'delete', '/api/orders/cart/clear/')
+        for product in self.random.sample(self.products, len(self.products)):
+            response = self.timed(
+                'add_to_cart', add_to_cart, '/api/orders/cart/add/',
+                {'product_id': str(product.pk), 'quantity': self.quantity}
+            )
+            if response.status_code == 400:
+                return 'sold_out'
+            if response.status_code >= 300:
+                return 'error'
+
+        response = self.timed('checkout', create_order, '/api/orders/create/', {
+            'store': str(self.store.pk),
+            'delivery_address': str(self.address.pk),
+            'payment_method': 'cash',
+        })
+        if response.status_code == 201:
+            return 'success'
+        if response.status_code == 400 and 'stock' in response.data:
+            return 'out_of_stock'
+        return 'rejected' if response.status_code < 500 else 'error'
+
+    def run(self):
+        try:
+            self.barrier.wait()
+            for _ in range(self.attempts):
+                try:
+                    outcome = self.attempt()
+                except DatabaseError as e:
+                    outcome = classify_error(e)
+                    self.errors.append(f'{type(e).__name__}: {e}')
+                    close_old_connections()
+                except Exception as e:
+                    outcome = 'error'
+                    self.errors.append(f'{type(e).__name__}: {e}')
+                self.outcomes[outcome] += 1
+        finally:
+            connection.close()
+
+
+def latency_summary(values):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 0.50),
+        'p95_ms': percentile(values, 0.95),
+        'p99_ms': percentile(values, 0.99),
+        'max_ms': values[-1] if values else None,
+    }
+
+
+def check_inventory(store, initial_stock):
+    """Compare each product with the orders that committed"""
+    sold = dict(
+        OrderItem.objects.filter(order__store=store).values('product_id')
+        .annotate(quantity=Sum('quantity')).values_list('product_id', 'quantity')
+    )
+    logged = dict(
+        InventoryLog.objects.filter(product__store=store, action='sale').values('product_id')
+        .annotate(quantity=Sum('quantity_change')).values_list('product_id', 'quantity')
+    )
+    rows = []
+    for product in Product.objects.filter(store=store).order_by('name'):
+        quantity = sold.get(product.pk, 0)
+        row = {
+            'product': product.name,
+            'initial_stock': initial_stock,
+            'sold': quantity,
+            'stock_quantity': product.stock_quantity,
+            'total_sold': product.total_sold,
+            'inventory_log': -(logged.get(product.pk) or 0),
+        }
+        row['consistent'] = (
+            product.stock_quantity >= 0
+            and product.stock_quantity == initial_stock - quantity
+            and product.total_sold == quantity
+            and row['inventory_log'] == quantity
+        )
+        rows.append(row)
+    return rows
+
+
+def run(workers=8, attempts=10, products=3, stock=10, quantity=1, seed=0, keep=False):
+    """
+    Race workers through add-to-cart and checkout and check the inventory.
+
+    Returns a report with throughput, latency percentiles per step, the
+    outcome of every attempt (success, sold_out, out_of_stock, deadlock,
+    serialization_failure, lock_timeout, rejected, error) and the
+    per-product inventory check.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    store, items, customers = create_fixture(run_id, workers, products, stock)
+    barrier = threading.Barrier(workers + 1)
+    threads = [
+        Worker(store, items, customer, address, attempts, quantity, barrier, seed + i)
+        for i, (customer, address) in enumerate(customers)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        outcomes = Counter()
+        for thread in threads:
+            outcomes.update(thread.outcomes)
+        inventory = check_inventory(store, stock)
+        orders = Order.objects.filter(store=store).count()
+        return {
+            'run_id': run_id,
+            'database': connection.vendor,
+            'workers': workers,
+            'attempts': sum(outcomes.values()),
+            'elapsed_s': round(elapsed, 3),
+            'checkouts_per_s': round(outcomes['success'] / elapsed, 1) if elapsed else None,
+            'attempts_per_s': round(sum(outcomes.values()) / elapsed, 1) if elapsed else None,
+            'outcomes': dict(outcomes),
+            'latency': {
+                step: latency_summary([value for thread in threads for value in thread.latencies[step]])
+                for step in ('add_to_cart', 'checkout')
+            },
+            'orders': orders,
+            'inventory': inventory,
+            'errors': [error for thread in threads for error in thread.errors][:10],
+            'consistent': orders == outcomes['success'] and all(row['consistent'] for row in inventory),
+        }
+    finally:
+        if not keep:
+            remove_fixture(run_id)
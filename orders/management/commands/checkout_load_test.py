@@ -0,0 +1,69 @@
+"""
+QuickBite Connect - Checkout Load Test Command
+Races concurrent checkouts for the same low-stock products and checks the inventory
+"""
+from django.core.management.base import BaseCommand, CommandError
+from orders.loadtest import run
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs add-to-cart and checkout from many threads against the same low-stock products, '
+        'reports throughput, latency and lock failures, and verifies stock, total_sold and InventoryLog'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent customers (threads)')
+        parser.add_argument('--attempts', type=int, default=10, help='Checkouts attempted per worker')
+        parser.add_argument('--products', type=int, default=3, help='Products in every cart')
+        parser.add_argument('--stock', type=int, default=10, help='Initial stock of each product')
+        parser.add_argument('--quantity', type=int, default=1, help='Quantity of each product per cart')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the order products are added in')
+        parser.add_argument('--keep', action='store_true', help="Don't delete the test store, customers and orders")
+
+    def handle(self, *args, **options):
+        if min(options['workers'], options['attempts'], options['products'], options['quantity']) < 1:
+            raise CommandError('--workers, --attempts, --products and --quantity must be at least 1')
+
+        report = run(
+            workers=options['workers'], attempts=options['attempts'], products=options['products'],
+            stock=options['stock'], quantity=options['quantity'], seed=options['seed'], keep=options['keep'],
+        )
+        self.print_report(report)
+        if not report['consistent']:
+            raise CommandError('Inventory does not match the committed orders')
+        self.stdout.write(self.style.SUCCESS('✅ Inventory matches the committed orders'))
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"Run {report['run_id']} on {report['database']}: {report['workers']} workers, "
+            f"{report['attempts']} attempts in {report['elapsed_s']}s "
+            f"({report['attempts_per_s']} attempts/s, {report['checkouts_per_s']} checkouts/s)"
+        )
+        self.stdout.write('Outcomes: ' + ', '.join(
+            f'{outcome}={count}' for outcome, count in sorted(report['outcomes'].items())
+        ))
+
+        header = f"{'step':<14} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for step, row in report['latency'].items():
+            if not row['count']:
+                continue
+            self.stdout.write(
+                f"{step:<14} {row['count']:>6} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+                f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+            )
+
+        header = f"{'product':<10} {'initial':>8} {'sold':>6} {'stock':>6} {'total_sold':>11} {'logged':>7}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in report['inventory']:
+            line = (
+                f"{row['product']:<10} {row['initial_stock']:>8} {row['sold']:>6} {row['stock_quantity']:>6} "
+                f"{row['total_sold']:>11} {row['inventory_log']:>7}"
+            )
+            self.stdout.write(line if row['consistent'] else self.style.ERROR(line + '  MISMATCH'))
+        self.stdout.write(f"Orders committed: {report['orders']}")
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f'  {error[:150]}'))
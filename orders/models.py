@@ -3,11 +3,14 @@
 QuickBite Connect - Order Models
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
+from django.utils.functional import cached_property
 from users.models import User, Address
 from stores.models import Store
 from products.models import Product
+from orders.pricing import CartPricing
+from orders.numbering import generate_order_number, save_with_generated_number
 
 
 class Cart(models.Model):
@@ -30,20 +33,30 @@ class Cart(models.Model):
             return f"Cart - {self.user.email}"
         return f"Cart - {self.session_key}"
     
+    @cached_property
+    def pricing(self):
+        """Items and totals computed from a single query"""
+        return CartPricing(self)
+    
+    def price_for(self, address):
+        """Price the cart for delivery to address, the way checkout will"""
+        self.pricing = CartPricing(self, address)
+        return self.pricing
+    
     @property
     def total_items(self):
         """Total number of items in cart"""
-        return sum(item.quantity for item in self.items.all())
+        return self.pricing.total_items
     
     @property
     def subtotal(self):
         """Calculate cart subtotal"""
-        return sum(item.total_price for item in self.items.all())
+        return self.pricing.subtotal
     
     @property
     def total(self):
         """Calculate cart total with delivery fee"""
-        return self.subtotal + self.store.delivery_fee
+        return self.pricing.total
 
 
 class CartItem(models.Model):
@@ -77,6 +90,28 @@ class CartItem(models.Model):
         return self.unit_price * self.quantity
 
 
+class OrderQuerySet(models.QuerySet):
+    """Querysets shaped for the order serializers"""
+    
+    def for_list(self):
+        """Load only what OrderListSerializer renders"""
+        return self.select_related('store', 'customer').only(
+            'id', 'order_number', 'status', 'payment_status', 'total_amount', 'created_at',
+            'store__id', 'store__name',
+            'customer__id', 'customer__email', 'customer__first_name', 'customer__last_name',
+        )
+    
+    def for_detail(self):
+        """Load relations used by OrderDetailSerializer in a fixed number of queries"""
+        return self.select_related('store', 'customer').prefetch_related(
+            'items',
+            models.Prefetch(
+                'status_history',
+                queryset=OrderStatusHistory.objects.select_related('changed_by')
+            ),
+        )
+
+
 class Order(models.Model):
     """Order model"""
     
@@ -130,6 +165,8 @@ class Order(models.Model):
     confirmed_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         db_table = 'orders'
         verbose_name = 'Order'
@@ -139,6 +176,9 @@ class Order(models.Model):
             models.Index(fields=['customer', 'status']),
             models.Index(fields=['store', 'status']),
             models.Index(fields=['order_number']),
+            models.Index(fields=['customer', '-created_at', '-id']),
+            models.Index(fields=['store', '-created_at', '-id']),
+            models.Index(fields=['status', 'completed_at']),
         ]
     
     def __str__(self):
@@ -146,10 +186,44 @@ class Order(models.Model):
     
     def save(self, *args, **kwargs):
         """Generate order number if not exists"""
-        if not self.order_number:
-            import random
-            self.order_number = f"ORD-{random.randint(100000, 999999)}"
-        super().save(*args, **kwargs)
+        save_with_generated_number(self, 'order_number', generate_order_number, super().save, *args, **kwargs)
+    
+    def transition_to(self, status, changed_by=None, notes=''):
+        """
+        Move the order to status, record it in the history and feed analytics.
+        
+        The current status is read under a row lock, so concurrent updates
+        are counted once. Cancelling takes the order's lines out of
+        Product.total_sold (and un-cancelling puts them back) in the same
+        transaction. Returns False if the order already had that status.
+        """
+        from django.utils import timezone
+        from analytics.rollups import record_status_change
+        from products.inventory import adjust_total_sold
+        
+        with transaction.atomic():
+            previous = Order.objects.select_for_update().values_list('status', flat=True).get(pk=self.pk)
+            if previous == status:
+                return False
+            now = timezone.now()
+            changes = {'status': status, 'updated_at': now}
+            if status == 'confirmed':
+                changes['confirmed_at'] = now
+            elif status == 'delivered':
+                changes['completed_at'] = changes['actual_delivery_time'] = now
+            Order.objects.filter(pk=self.pk).update(**changes)
+            for field, value in changes.items():
+                setattr(self, field, value)
+            OrderStatusHistory.objects.create(order=self, status=status, notes=notes, changed_by=changed_by)
+            if 'cancelled' in (previous, status):
+                sign = -1 if status == 'cancelled' else 1
+                quantities = {}
+                lines = self.items.filter(product__isnull=False).values_list('product_id', 'quantity')
+                for product_id, quantity in lines:
+                    quantities[product_id] = quantities.get(product_id, 0) + sign * quantity
+                adjust_total_sold(quantities)
+            record_status_change(self, previous, status)
+        return True
 
 
 class OrderItem(models.Model):
@@ -0,0 +1,134 @@
+"""
+QuickBite Connect - Order Numbering
+Time-sortable, collision-free identifiers for orders and payments
+"""
+import os
+import random
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+# Crockford base32 keeps codes unambiguous and sorts in code order
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+CODE_LENGTH = 13  # 65 bits, enough for a 64-bit identifier
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+SAVE_ATTEMPTS = 3
+
+
+class IdentifierGenerator:
+    """
+    Snowflake-style generator: 42 bits of milliseconds, 10 bits of worker id
+    and 12 bits of sequence. Identifiers are minted in-process without a
+    database round-trip and increase monotonically within a worker.
+    """
+
+    def __init__(self, worker_id=None):
+        self._configured_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _reset_for_process(self):
+        """(Re)derive worker state, e.g. after a fork"""
+        self._pid = os.getpid()
+        self._last_ms = -1
+        self._sequence = 0
+        if self._configured_worker_id is not None:
+            self.worker_id = int(self._configured_worker_id) & MAX_WORKER_ID
+        else:
+            seed = f"{socket.gethostname()}:{self._pid}".encode()
+            self.worker_id = zlib.crc32(seed) & MAX_WORKER_ID
+
+    def next_id(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_for_process()
+
+            now_ms = int(time.time() * 1000) - EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Random start keeps workers sharing an id from colliding in lockstep
+                self._sequence = random.randint(0, MAX_SEQUENCE // 2)
+            else:
+                # Same millisecond, or the clock moved backwards: never go back
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_code(self):
+        return encode(self.next_id())
+
+
+def encode(value):
+    """Encode an integer as a fixed-width base32 code"""
+    chars = []
+    for _ in range(CODE_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def decode(code):
+    """Decode a fixed-width base32 code back to an integer"""
+    value = 0
+    for char in code.upper():
+        value = (value << 5) | ALPHABET.index(char)
+    return value
+
+
+def identifier_timestamp(code):
+    """Return the UTC datetime a generated code was minted at"""
+    value = decode(code.split('-')[-1])
+    ms = (value >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc)
+
+
+_generator = IdentifierGenerator(getattr(settings, 'ID_GENERATOR_WORKER_ID', None))
+
+
+def generate_order_number():
+    """e.g. ORD-01HF3K2Q7M8ZT"""
+    return f"ORD-{_generator.next_code()}"
+
+
+def generate_transaction_id():
+    """e.g. TXN-01HF3K2Q7M8ZT"""
+    return f"TXN-{_generator.next_code()}"
+
+
+def save_with_generated_number(instance, field, generate, save, *args, **kwargs):
+    """
+    Save instance, filling field from generate() when empty.
+
+    Each attempt runs in a savepoint so a unique-index collision (only
+    possible if two workers share a worker id) is retried with a fresh
+    number instead of surfacing as a 500.
+    """
+    if getattr(instance, field):
+        return save(*args, **kwargs)
+
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        setattr(instance, field, generate())
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            taken = type(instance)._default_manager.filter(**{field: getattr(instance, field)}).exists()
+            if attempt == SAVE_ATTEMPTS or not taken:
+                setattr(instance, field, '')
+                raise
@@ -0,0 +1,44 @@
+"""
+QuickBite Connect - Cart Pricing
+Computes cart lines and totals once per request
+"""
+from decimal import Decimal
+from django.utils.functional import cached_property
+
+
+class CartPricing:
+    """
+    Loads a cart's items with their products in a single query and
+    derives every total from that one result set.
+    
+    With a delivery address the delivery fee is the distance- and
+    load-based quote checkout charges; without one it is the store's
+    base fee.
+    """
+    
+    def __init__(self, cart, address=None):
+        self.cart = cart
+        self.address = address
+        self.items = list(
+            cart.items.select_related('product__store', 'product__category').order_by('created_at')
+        )
+        self.total_items = sum(item.quantity for item in self.items)
+        self.subtotal = sum((item.total_price for item in self.items), Decimal('0.00'))
+    
+    @cached_property
+    def quote(self):
+        """Delivery quote to the address, or None when there is none"""
+        if self.address is None:
+            return None
+        from orders.quotes import quote_delivery
+        return quote_delivery(self.cart.store, self.address)
+    
+    @property
+    def delivery_fee(self):
+        if self.quote is not None:
+            return self.quote.delivery_fee
+        return self.cart.store.delivery_fee
+    
+    @property
+    def total(self):
+        return self.subtotal + self.delivery_fee
@@ -0,0 +1,89 @@
+"""
+QuickBite Connect - Delivery Quotes
+Delivery fee and ETA from distance and the store's current load
+
+A quote starts from the store's own delivery_fee and
+estimated_delivery_time (its preparation baseline) and adds
+- the surcharge and travel minutes of the DELIVERY_FEE_BANDS band the
+  haversine distance falls in,
+- DELIVERY_MINUTES_PER_ACTIVE_ORDER for every order the store is
+  currently working on (confirmed or preparing),
+- DELIVERY_BUSY_FEE once that count reaches DELIVERY_BUSY_THRESHOLD.
+
+quote_stores() prices any number of stores for one destination with a
+single query for the in-flight counts, so listings can show a quote per
+store without per-store queries.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count
+from stores.geo import haversine_miles
+from .models import Order
+
+IN_FLIGHT_STATUSES = ('confirmed', 'preparing')
+
+Quote = namedtuple('Quote', ['delivery_fee', 'eta_minutes', 'distance', 'in_flight', 'deliverable'])
+
+
+def in_flight_counts(store_ids):
+    """{store_id: orders confirmed or preparing} in one query"""
+    return dict(
+        Order.objects.filter(store_id__in=store_ids, status__in=IN_FLIGHT_STATUSES)
+        .values('store_id').annotate(count=Count('id')).order_by().values_list('store_id', 'count')
+    )
+
+
+def band_for(distance):
+    """The first band covering distance, or the last one beyond them all"""
+    bands = settings.DELIVERY_FEE_BANDS
+    for band in bands:
+        if distance <= band[0]:
+            return band
+    return bands[-1]
+
+
+def quote(store, distance, in_flight):
+    """Quote for one store at a known distance (None if unknown) and load"""
+    fee = store.delivery_fee
+    minutes = store.estimated_delivery_time + in_flight * settings.DELIVERY_MINUTES_PER_ACTIVE_ORDER
+    deliverable = True
+    if distance is not None:
+        _, surcharge, travel_minutes = band_for(distance)
+        fee += surcharge
+        minutes += travel_minutes
+        deliverable = distance <= float(store.delivery_radius)
+        distance = round(distance, 2)
+    if in_flight >= settings.DELIVERY_BUSY_THRESHOLD:
+        fee += settings.DELIVERY_BUSY_FEE
+    return Quote(fee.quantize(Decimal('0.01')), minutes, distance, in_flight, deliverable)
+
+
+def distance_to(store, latitude, longitude):
+    if None in (store.latitude, store.longitude, latitude, longitude):
+        return None
+    return haversine_miles(store.latitude, store.longitude, latitude, longitude)
+
+
+def quote_stores(stores, latitude, longitude):
+    """
+    {store_id: Quote} for delivering from each store to a point.
+
+    Uses a 'distance' annotation when the stores carry one (as
+    StoreQuerySet.nearby does), otherwise computes it.
+    """
+    stores = list(stores)
+    counts = in_flight_counts([store.pk for store in stores])
+    quotes = {}
+    for store in stores:
+        distance = getattr(store, 'distance', None)
+        if distance is None:
+            distance = distance_to(store, latitude, longitude)
+        quotes[store.pk] = quote(store, distance, counts.get(store.pk, 0))
+    return quotes
+
+
+def quote_delivery(store, address):
+    """Quote for a single order from store to a saved address"""
+    return quote_stores([store], address.latitude, address.longitude)[store.pk]
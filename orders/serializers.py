@@ -1,9 +1,17 @@
 """
 QuickBite Connect - Order Serializers
 """
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Cart, CartItem, Order, OrderItem, OrderStatusHistory, Coupon
 from products.serializers import ProductListSerializer
+from products.inventory import InsufficientStock, reserve_stock
+from analytics.rollups import record_order_placed
+
+TAX_RATE = Decimal('0.05')
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -28,16 +36,31 @@ class CartItemCreateSerializer(serializers.ModelSerializer):
 
 class CartSerializer(serializers.ModelSerializer):
     """Serializer for Cart"""
-    items = CartItemSerializer(many=True, read_only=True)
+    items = CartItemSerializer(source='pricing.items', many=True, read_only=True)
     store_name = serializers.CharField(source='store.name', read_only=True)
     total_items = serializers.IntegerField(read_only=True)
     subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    delivery_fee = serializers.DecimalField(
+        source='pricing.delivery_fee', max_digits=10, decimal_places=2, read_only=True
+    )
+    delivery_quote = serializers.SerializerMethodField()
     total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
     class Meta:
         model = Cart
         fields = '__all__'
         read_only_fields = ('id', 'user', 'session_key', 'created_at', 'updated_at')
+    
+    def get_delivery_quote(self, obj):
+        quote = obj.pricing.quote
+        if quote is None:
+            return None
+        return {
+            'delivery_address': str(obj.pricing.address.pk),
+            'delivery_fee': str(quote.delivery_fee),
+            'eta_minutes': quote.eta_minutes,
+            'deliverable': quote.deliverable,
+        }
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -111,61 +134,81 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        """Create order from cart"""
+        """Create order from cart, reserving stock in one transaction"""
         user = self.context['request'].user
         store = validated_data['store']
         
-        # Get user's cart
-        cart = Cart.objects.get(user=user, store=store)
-        
-        # Calculate totals
-        subtotal = cart.subtotal
-        delivery_fee = store.delivery_fee
-        tax_amount = subtotal * 0.05  # 5% tax
-        total_amount = subtotal + delivery_fee + tax_amount
-        
-        # Create order
-        order = Order.objects.create(
-            customer=user,
-            store=store,
-            delivery_address=validated_data['delivery_address'],
-            payment_method=validated_data['payment_method'],
-            delivery_instructions=validated_data.get('delivery_instructions', ''),
-            subtotal=subtotal,
-            delivery_fee=delivery_fee,
-            tax_amount=tax_amount,
-            total_amount=total_amount,
-            status='pending',
-            payment_status='pending'
-        )
-        
-        # Create order items from cart items
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
+        with transaction.atomic():
+            cart = Cart.objects.get(user=user, store=store)
+            cart.store = store
+            pricing = cart.price_for(validated_data['delivery_address'])
+            cart_items = pricing.items
+            if not cart_items:
+                raise serializers.ValidationError("Cart is empty for this store")
+            
+            # Calculate totals
+            subtotal = pricing.subtotal
+            quote = pricing.quote
+            if quote is not None and not quote.deliverable:
+                raise serializers.ValidationError({
+                    'delivery_address': f'{store.name} does not deliver to this address'
+                })
+            delivery_fee = pricing.delivery_fee
+            tax_amount = (subtotal * TAX_RATE).quantize(Decimal('0.01'))
+            total_amount = subtotal + delivery_fee + tax_amount
+            
+            # Create order
+            order = Order.objects.create(
+                customer=user,
+                store=store,
+                delivery_address=validated_data['delivery_address'],
+                payment_method=validated_data['payment_method'],
+                delivery_instructions=validated_data.get('delivery_instructions', ''),
+                subtotal=subtotal,
+                delivery_fee=delivery_fee,
+                tax_amount=tax_amount,
+                total_amount=total_amount,
+                estimated_delivery_time=timezone.now() + timedelta(minutes=quote.eta_minutes),
+                status='pending',
+                payment_status='pending'
+            )
+            
+            # Reserve stock for every line at once
+            quantities = {}
+            for item in cart_items:
+                quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+            try:
+                reserve_stock(quantities, user=user, notes=f"Order {order.order_number}")
+            except InsufficientStock as e:
+                raise serializers.ValidationError({
+                    'stock': e.errors or 'Stock changed during checkout, please try again'
+                })
+            
+            # Create order items from cart items
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=item.product,
+                    product_name=item.product.name,
+                    product_price=item.unit_price,
+                    quantity=item.quantity,
+                    subtotal=item.total_price,
+                    special_instructions=item.special_instructions
+                )
+                for item in cart_items
+            ])
+            
+            # Create status history
+            OrderStatusHistory.objects.create(
                 order=order,
-                product=cart_item.product,
-                product_name=cart_item.product.name,
-                product_price=cart_item.unit_price,
-                quantity=cart_item.quantity,
-                subtotal=cart_item.total_price,
-                special_instructions=cart_item.special_instructions
+                status='pending',
+                notes='Order created',
+                changed_by=user
             )
+            record_order_placed(order)
             
-            # Update product stock
-            cart_item.product.stock_quantity -= cart_item.quantity
-            cart_item.product.total_sold += cart_item.quantity
-            cart_item.product.save()
-        
-        # Create status history
-        OrderStatusHistory.objects.create(
-            order=order,
-            status='pending',
-            notes='Order created',
-            changed_by=user
-        )
-        
-        # Clear cart
-        cart.items.all().delete()
+            # Clear cart
+            cart.items.all().delete()
         
         return order
 
@@ -0,0 +1,26 @@
+"""
+QuickBite Connect - Order Signals
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from config.events import make_message, publish_on_commit, store_channel, user_channel
+from .models import OrderStatusHistory
+
+
+@receiver(post_save, sender=OrderStatusHistory)
+def publish_status_change(sender, instance, created, **kwargs):
+    """Push each recorded status to the customer and the store dashboard"""
+    if not created:
+        return
+    order = instance.order
+    message = make_message('order.status', {
+        'order_id': order.pk,
+        'order_number': order.order_number,
+        'status': instance.status,
+        'notes': instance.notes,
+        'changed_at': instance.created_at,
+    })
+    publish_on_commit([
+        (user_channel(order.customer_id), message),
+        (store_channel(order.store_id), message),
+    ])
@@ -1,90 +1,402 @@
 """
-QuickBite Connect - API Endpoint Testing Script
-Run this script to test if all APIs are working
+QuickBite Connect - Order Tests
 """
-import requests
+import asyncio
 import json
+import random
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
-BASE_URL = "http://127.0.0.1:8000"
-
-def test_api_endpoints():
-    """Test all API endpoints"""
-    
-    print("🧪 Testing QuickBite Connect APIs\n")
-    print("=" * 50)
-    
-    # Test 1: Health Check
-    print("\n1. Testing Server Connection...")
-    try:
-        response = requests.get(f"{BASE_URL}/admin/")
-        if response.status_code == 200 or response.status_code == 302:
-            print("   ✅ Server is running!")
-        else:
-            print(f"   ❌ Server returned status {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ Server not running: {e}")
-        return
-    
-    # Test 2: User Registration
-    print("\n2. Testing User Registration API...")
-    user_data = {
-        "email": f"testuser{int(time.time())}@test.com",
-        "password": "TestPass123!",
-        "password2": "TestPass123!",
-        "first_name": "Test",
-        "last_name": "User",
-        "phone_number": "+1234567890",
-        "user_type": "customer"
-    }
-    try:
-        response = requests.post(f"{BASE_URL}/api/users/register/", json=user_data)
-        if response.status_code == 201:
-            print("   ✅ User registration works!")
-            print(f"   Created user: {response.json()['user']['email']}")
-        else:
-            print(f"   ❌ Registration failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test 3: Store List API
-    print("\n3. Testing Store List API...")
-    try:
-        response = requests.get(f"{BASE_URL}/api/stores/")
-        if response.status_code == 200:
-            stores = response.json()
-            print(f"   ✅ Store list works! Found {stores.get('count', 0)} stores")
-        else:
-            print(f"   ❌ Store list failed: {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test 4: Product Categories API
-    print("\n4. Testing Product Categories API...")
-    try:
-        response = requests.get(f"{BASE_URL}/api/products/categories/")
-        if response.status_code == 200:
-            print("   ✅ Product categories API works!")
-        else:
-            print(f"   ❌ Categories failed: {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test 5: Product List API
-    print("\n5. Testing Product List API...")
-    try:
-        response = requests.get(f"{BASE_URL}/api/products/")
-        if response.status_code == 200:
-            products = response.json()
-            print(f"   ✅ Product list works! Found {products.get('count', 0)} products")
-        else:
-            print(f"   ❌ Product list failed: {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    print("\n" + "=" * 50)
-    print("🎯 Testing Complete!\n")
-
-if __name__ == "__main__":
-    import time
-    test_api_endpoints()
\ No newline at end of file
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from config.events import InProcessBroker, store_channel, user_channel
+from config.streams import stream_events
+from config.testing import make_owner, make_store
+from orders import loadtest
+from orders.numbering import (
+    CODE_LENGTH, IdentifierGenerator, decode, encode, generate_order_number, identifier_timestamp
+)
+from orders.quotes import quote_stores
+from products.models import Product
+from users.models import Address, User
+from .models import Cart, CartItem, Order, OrderItem, OrderStatusHistory
+from .pricing import CartPricing
+
+
+class OrderQueryCountTests(TestCase):
+    """Order endpoints must not issue per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.store = make_store(cls.owner)
+
+    def create_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(
+                customer=self.customer, store=self.store, payment_method='cash',
+                subtotal=Decimal('10.00'), delivery_fee=Decimal('2.99'), total_amount=Decimal('12.99')
+            )
+            for i in range(3):
+                OrderItem.objects.create(
+                    order=order, product_name=f'Item {i}', product_price=Decimal('3.00'),
+                    quantity=1, subtotal=Decimal('3.00')
+                )
+            for status in ('pending', 'confirmed'):
+                OrderStatusHistory.objects.create(order=order, status=status, changed_by=self.owner)
+
+    def count_queries(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_store_orders_query_count_is_bounded(self):
+        self.create_orders(2)
+        small = self.count_queries(self.owner, '/api/orders/store/orders/')
+        self.create_orders(18)
+        large = self.count_queries(self.owner, '/api/orders/store/orders/')
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 5)
+
+    def test_order_list_query_count_is_bounded(self):
+        self.create_orders(2)
+        small = self.count_queries(self.customer, '/api/orders/')
+        self.create_orders(18)
+        large = self.count_queries(self.customer, '/api/orders/')
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+
+class CartPricingTests(TestCase):
+    """Cart lines and totals come from one query and add up"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.store = make_store(cls.owner, delivery_fee=Decimal('2.50'))
+        cls.cart = Cart.objects.create(user=cls.customer, store=cls.store)
+
+    def add_items(self, *lines):
+        for name, price, discount, quantity in lines:
+            product = Product.objects.create(
+                store=self.store, name=name, slug=name.lower(), description=name,
+                price=Decimal(price), discount_percentage=Decimal(discount), stock_quantity=50
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=quantity)
+
+    def test_totals_are_computed_from_one_query(self):
+        self.add_items(('Burger', '8.00', '0', 2), ('Fries', '4.00', '25', 3), ('Shake', '5.50', '10', 1))
+        cart = Cart.objects.select_related('store').get(pk=self.cart.pk)
+
+        with self.assertNumQueries(1):
+            pricing = CartPricing(cart)
+            totals = (pricing.total_items, pricing.subtotal, pricing.delivery_fee, pricing.total)
+
+        # 2 x 8.00 + 3 x 3.00 + 1 x 4.95
+        self.assertEqual(totals, (6, Decimal('29.95'), Decimal('2.50'), Decimal('32.45')))
+        self.assertEqual([item.product.name for item in pricing.items], ['Burger', 'Fries', 'Shake'])
+
+    def test_cart_endpoint_query_count_does_not_grow_with_items(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.add_items(('Burger', '8.00', '0', 1))
+        with CaptureQueriesContext(connection) as small:
+            client.get('/api/orders/cart/')
+        self.add_items(*[(f'Side{i}', '1.00', '0', 1) for i in range(9)])
+        with CaptureQueriesContext(connection) as large:
+            response = client.get('/api/orders/cart/')
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.data['items']), 10)
+        self.assertEqual((response.data['total_items'], Decimal(response.data['subtotal'])), (10, Decimal('17.00')))
+        self.assertEqual(Decimal(response.data['total']), Decimal('19.50'))
+
+
+class ApiSmokeTests(TestCase):
+    """The endpoints the old manual smoke script checked against a running server"""
+
+    def test_admin_is_reachable(self):
+        self.assertIn(self.client.get('/admin/').status_code, (200, 302))
+
+    def test_user_registration(self):
+        response = APIClient().post('/api/users/register/', {
+            'email': 'testuser@test.com', 'password': 'TestPass123!', 'password2': 'TestPass123!',
+            'first_name': 'Test', 'last_name': 'User', 'phone_number': '+1234567890', 'user_type': 'customer',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['user']['email'], 'testuser@test.com')
+
+    def test_public_listings(self):
+        client = APIClient()
+        for url in ('/api/stores/', '/api/products/categories/', '/api/products/'):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
+
+
+class OrderNumberingTests(TestCase):
+    """Generated numbers are unique, ordered, reversible and fit the column"""
+
+    def test_ids_are_unique_and_monotonic_across_threads(self):
+        generator = IdentifierGenerator(worker_id=7)
+        results = [[] for _ in range(8)]
+
+        def mint(ids):
+            for _ in range(2000):
+                ids.append(generator.next_id())
+
+        threads = [threading.Thread(target=mint, args=(ids,)) for ids in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for ids in results:
+            self.assertEqual(ids, sorted(set(ids)))
+        everything = [value for ids in results for value in ids]
+        self.assertEqual(len(set(everything)), len(everything))
+        # Codes sort the same way as the ids they encode
+        self.assertEqual(sorted(map(encode, everything)), list(map(encode, sorted(everything))))
+
+    def test_clock_going_backwards_never_reuses_an_id(self):
+        generator = IdentifierGenerator(worker_id=1)
+        with patch('orders.numbering.time.time', side_effect=[1750000000.5, 1750000000.0, 1749999999.0]):
+            ids = [generator.next_id() for _ in range(3)]
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_crockford_encoding_round_trips(self):
+        rng = random.Random(5)
+        values = [0, 1, 31, 32, (1 << 64) - 1] + [rng.getrandbits(64) for _ in range(200)]
+        for value in values:
+            code = encode(value)
+            self.assertEqual(len(code), CODE_LENGTH)
+            self.assertEqual(decode(code), value)
+            self.assertEqual(decode(code.lower()), value)
+        self.assertNotRegex(''.join(encode(value) for value in values), '[ILOU]')
+
+        before = timezone.now()
+        code = generate_order_number()
+        self.assertLess(abs(identifier_timestamp(code) - before), timedelta(seconds=1))
+
+    def test_numbers_fit_the_column(self):
+        max_length = Order._meta.get_field('order_number').max_length
+        self.assertLessEqual(len(generate_order_number()), max_length)
+        self.assertLessEqual(len('ORD-' + encode((1 << 64) - 1)), max_length)
+
+    def test_collision_is_retried_with_a_fresh_number(self):
+        customer = User.objects.create_user(email='customer@test.com', password='pass')
+        store = make_store(make_owner())
+        fields = dict(customer=customer, store=store, payment_method='cash', subtotal=Decimal('1.00'),
+                      delivery_fee=Decimal('0.00'), total_amount=Decimal('1.00'))
+        first = Order.objects.create(**fields)
+
+        fresh = generate_order_number()
+        with patch('orders.models.generate_order_number', side_effect=[first.order_number, fresh]):
+            second = Order.objects.create(**fields)
+        self.assertEqual(second.order_number, fresh)
+
+
+class LiveStatusEventTests(TestCase):
+    """Status changes are pushed to subscribed customers and stores"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.store = make_store(cls.owner)
+        cls.order = Order.objects.create(
+            customer=cls.customer, store=cls.store, payment_method='cash',
+            subtotal=Decimal('10.00'), delivery_fee=Decimal('2.99'), total_amount=Decimal('12.99')
+        )
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.broker = InProcessBroker()
+        patcher = patch('config.events._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.loop.close)
+
+    def subscribe(self, channels, max_pending=100):
+        async def subscribe():
+            return self.broker.subscribe(channels, max_pending)
+        return self.loop.run_until_complete(subscribe())
+
+    def pending(self, subscription):
+        async def drain():
+            await asyncio.sleep(0)
+            messages = []
+            while not subscription.queue.empty():
+                messages.append(subscription.queue.get_nowait())
+            return messages
+        return self.loop.run_until_complete(drain())
+
+    def test_status_change_reaches_customer_and_store(self):
+        customer = self.subscribe([user_channel(self.customer.pk)])
+        store = self.subscribe([store_channel(self.store.pk)])
+        other = self.subscribe([user_channel(self.owner.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderStatusHistory.objects.create(order=self.order, status='preparing', changed_by=self.owner)
+
+        for subscription in (customer, store):
+            [message] = self.pending(subscription)
+            self.assertEqual(message['event'], 'order.status')
+            data = json.loads(message['data'])
+            self.assertEqual((data['order_number'], data['status']), (self.order.order_number, 'preparing'))
+        self.assertEqual(self.pending(other), [])
+
+    def test_nothing_is_published_if_the_transaction_rolls_back(self):
+        subscription = self.subscribe([user_channel(self.customer.pk)])
+
+        with self.captureOnCommitCallbacks(execute=False):
+            OrderStatusHistory.objects.create(order=self.order, status='cancelled')
+
+        self.assertEqual(self.pending(subscription), [])
+
+    def test_slow_client_is_told_to_resync(self):
+        subscription = self.subscribe([user_channel(self.customer.pk)], max_pending=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            for status in ('confirmed', 'preparing', 'ready'):
+                OrderStatusHistory.objects.create(order=self.order, status=status)
+
+        async def read_frames(count):
+            stream = stream_events(subscription, keepalive=1)
+            frames = [await stream.__anext__() for _ in range(count)]
+            await stream.aclose()
+            return frames
+
+        ready, status, resync = self.loop.run_until_complete(read_frames(3))
+        self.assertIn('event: ready', ready)
+        self.assertIn('"status": "confirmed"', status)
+        self.assertEqual(resync, 'event: resync\ndata: {}\n\n')
+        self.assertNotIn(subscription, self.broker._subscriptions.get(user_channel(self.customer.pk), ()))
+
+
+class CheckoutLoadTests(TransactionTestCase):
+    """Concurrent checkouts never sell more than the stock"""
+
+    def test_concurrent_checkouts_keep_inventory_consistent(self):
+        report = loadtest.run(workers=3, attempts=4, products=2, stock=5)
+
+        self.assertTrue(report['consistent'], report['inventory'])
+        self.assertEqual(sum(report['outcomes'].values()), 12)
+        for row in report['inventory']:
+            self.assertLessEqual(row['sold'], 5)
+            self.assertEqual(row['sold'], report['outcomes'].get('success', 0))
+        self.assertFalse(Product.objects.exists())
+
+
+@override_settings(
+    DELIVERY_FEE_BANDS=[(2.0, Decimal('0.00'), 10), (10.0, Decimal('3.50'), 28)],
+    DELIVERY_MINUTES_PER_ACTIVE_ORDER=3, DELIVERY_BUSY_THRESHOLD=2, DELIVERY_BUSY_FEE=Decimal('1.00'),
+)
+class DeliveryQuoteTests(TestCase):
+    """Delivery fee and ETA follow distance bands and store load"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.address = Address.objects.create(
+            user=cls.customer, address_line1='5 Hudson St', city='New York', state='NY', postal_code='10013',
+            latitude=Decimal('40.720000'), longitude=Decimal('-74.000000')
+        )
+        cls.near = cls.create_store('near', '40.712800', '-74.006000')
+        cls.far = cls.create_store('far', '40.800000', '-73.950000')
+
+    @classmethod
+    def create_store(cls, slug, latitude, longitude):
+        return make_store(
+            cls.owner, slug, latitude=Decimal(latitude), longitude=Decimal(longitude),
+            delivery_fee=Decimal('2.99'), estimated_delivery_time=20, delivery_radius=Decimal('5.00')
+        )
+
+    def add_orders(self, store, *statuses):
+        for status in statuses:
+            Order.objects.create(
+                customer=self.customer, store=store, payment_method='cash', status=status,
+                subtotal=Decimal('10.00'), delivery_fee=Decimal('2.99'), total_amount=Decimal('12.99')
+            )
+
+    def test_batch_quote_uses_bands_and_in_flight_orders(self):
+        self.add_orders(self.near, 'confirmed', 'preparing', 'preparing', 'pending', 'delivered')
+
+        with self.assertNumQueries(1):
+            quotes = quote_stores([self.near, self.far], self.address.latitude, self.address.longitude)
+
+        near, far = quotes[self.near.pk], quotes[self.far.pk]
+        self.assertEqual((near.delivery_fee, near.eta_minutes, near.in_flight), (Decimal('3.99'), 39, 3))
+        self.assertTrue(near.deliverable)
+        self.assertEqual((far.delivery_fee, far.eta_minutes, far.in_flight), (Decimal('6.49'), 48, 0))
+        self.assertFalse(far.deliverable)
+        self.assertGreater(far.distance, 5)
+
+    def test_nearby_listing_includes_quotes(self):
+        self.add_orders(self.far, 'confirmed')
+        response = APIClient().get('/api/stores/nearby/', {'lat': '40.72', 'lng': '-74.0'})
+
+        self.assertEqual(response.status_code, 200)
+        quotes = {store['slug']: store['delivery_quote'] for store in response.data['results']}
+        self.assertEqual(quotes, {'near': {'delivery_fee': '2.99', 'eta_minutes': 30}})
+
+    def test_checkout_rejects_addresses_outside_the_delivery_radius(self):
+        product = Product.objects.create(
+            store=self.far, name='Soup', slug='soup', description='Soup', price=Decimal('6.00'), stock_quantity=5
+        )
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        client.post('/api/orders/cart/add/', {'product_id': str(product.pk), 'quantity': 1}, format='json')
+        self.assertFalse(client.get('/api/orders/cart/').data['delivery_quote']['deliverable'])
+
+        response = client.post('/api/orders/create/', {
+            'store': str(self.far.pk), 'delivery_address': str(self.address.pk), 'payment_method': 'cash',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('delivery_address', response.data)
+        self.assertFalse(Order.objects.filter(store=self.far).exists())
+        product.refresh_from_db()
+        self.assertEqual(product.stock_quantity, 5)
+
+    def test_checkout_charges_the_quote_and_sets_the_eta(self):
+        product = Product.objects.create(
+            store=self.far, name='Soup', slug='soup', description='Soup', price=Decimal('6.00'), stock_quantity=5
+        )
+        self.add_orders(self.far, 'preparing')
+        self.far.delivery_radius = Decimal('10.00')
+        self.far.save(update_fields=['delivery_radius'])
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        client.post('/api/orders/cart/add/', {'product_id': str(product.pk), 'quantity': 1}, format='json')
+        cart = client.get('/api/orders/cart/').data
+        self.assertEqual(client.get('/api/orders/cart/', {'delivery_address': 'nope'}).status_code, 400)
+
+        before = timezone.now()
+        response = client.post('/api/orders/create/', {
+            'store': str(self.far.pk), 'delivery_address': str(self.address.pk), 'payment_method': 'cash',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(order_number=response.data['order']['order_number'])
+        self.assertEqual(order.delivery_fee, Decimal('6.49'))
+        # The cart showed the same fee checkout charged
+        self.assertEqual(cart['delivery_quote']['delivery_fee'], '6.49')
+        self.assertEqual(Decimal(cart['delivery_fee']), order.delivery_fee)
+        self.assertEqual(Decimal(cart['total']), order.subtotal + order.delivery_fee)
+        self.assertEqual(order.total_amount, order.subtotal + order.delivery_fee + order.tax_amount)
+        self.assertGreaterEqual(order.estimated_delivery_time, before + timedelta(minutes=51))
+        self.assertLessEqual(order.estimated_delivery_time, timezone.now() + timedelta(minutes=51))
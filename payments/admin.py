@@ -2,7 +2,7 @@
 QuickBite Connect - Payment Admin
 """
 from django.contrib import admin
-from .models import Payment, PaymentCard, Refund, Payout
+from .models import Payment, PaymentCard, Refund, Payout, StripeEvent
 
 
 @admin.register(Payment)
@@ -80,4 +80,19 @@ class PayoutAdmin(admin.ModelAdmin):
     list_filter = ('status', 'created_at', 'period_start')
     search_fields = ('store__name', 'stripe_payout_id')
     readonly_fields = ('stripe_payout_id', 'created_at', 'processed_at')
-    filter_horizontal = ('orders',)
+    # Payouts can hold thousands of orders; don't render them as a picker
+    raw_id_fields = ('orders',)
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('status', 'event_type', 'received_at')
+    search_fields = ('event_id',)
+    readonly_fields = ('event_id', 'event_type', 'payload', 'received_at', 'processed_at', 'last_error')
+    
+    actions = ['retry_events']
+    
+    def retry_events(self, request, queryset):
+        queryset.update(status='pending', attempts=0, last_error='')
+    retry_events.short_description = "Retry selected events"
@@ -0,0 +1,412 @@
+"""
+QuickBite Connect - Payment Gateway
+Bounded, observable access to the payment provider
+
+Every provider call goes through a gateway that
+- runs it on a shared thread pool and waits at most STRIPE_TIMEOUT seconds,
+  so a slow provider cannot hold a web worker indefinitely; connection
+  retries happen inside that deadline, each attempt getting an equal share,
+- reuses one keep-alive HTTP session for the whole process,
+- stops calling a failing provider for a while (circuit breaker),
+- passes idempotency keys derived from Order.id, so retries never charge
+  or refund twice,
+- records per-operation latency histograms.
+
+FakeGateway implements the same interface in memory for tests and
+offline load testing (PAYMENT_GATEWAY=payments.gateway.FakeGateway).
+"""
+import bisect
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import stripe
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """A provider call failed; message is safe to show to the customer"""
+
+    def __init__(self, message, code='', retryable=False):
+        super().__init__(message)
+        self.code = code
+        self.retryable = retryable
+
+
+class GatewayUnavailable(GatewayError):
+    """The provider timed out or the circuit breaker is open"""
+
+    def __init__(self, message, code='unavailable'):
+        super().__init__(message, code=code, retryable=True)
+
+
+class LatencyHistogram:
+    """Thread-safe latency counts in fixed millisecond buckets"""
+
+    BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds, error=False):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if error:
+                self.errors += 1
+
+    def percentile(self, fraction, counts, total):
+        """Upper bound of the bucket holding the given fraction of calls"""
+        threshold = fraction * total
+        for bound, running in zip(self.BUCKETS_MS + (None,), itertools.accumulate(counts)):
+            if running >= threshold:
+                return bound if bound is not None else round(self.max_ms, 1)
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            errors, total_ms, max_ms = self.errors, self.total_ms, self.max_ms
+        total = sum(counts)
+        labels = [f'<={bound}ms' for bound in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}ms']
+        return {
+            'count': total,
+            'errors': errors,
+            'mean_ms': round(total_ms / total, 1) if total else None,
+            'max_ms': round(max_ms, 1),
+            'p50_ms': self.percentile(0.5, counts, total) if total else None,
+            'p95_ms': self.percentile(0.95, counts, total) if total else None,
+            'p99_ms': self.percentile(0.99, counts, total) if total else None,
+            'buckets': dict(zip(labels, counts)),
+        }
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, calls
+    are refused until reset_timeout has passed, then a single trial call
+    is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def intent_key(order, amount_cents):
+    return f'order-{order.id}-intent-{amount_cents}'
+
+
+def refund_key(order, sequence):
+    return f'order-{order.id}-refund-{sequence}'
+
+
+class BaseGateway:
+    """Deadline, breaker and histogram handling shared by gateways"""
+
+    # Provider errors that say nothing about the request itself
+    outage_errors = ()
+    # Errors after which the request is known not to have reached the
+    # provider, so it is retried on the same worker
+    retry_errors = ()
+
+    def __init__(self):
+        self.timeout = settings.STRIPE_TIMEOUT
+        self.retries = settings.STRIPE_MAX_NETWORK_RETRIES
+        # Every attempt gets an equal share, so all of them fit the deadline
+        self.attempt_timeout = self.timeout / (self.retries + 1)
+        self.breaker = CircuitBreaker(
+            settings.PAYMENT_CIRCUIT_FAILURE_THRESHOLD, settings.PAYMENT_CIRCUIT_RESET_TIMEOUT
+        )
+        self.executor = ThreadPoolExecutor(max_workers=settings.PAYMENT_GATEWAY_WORKERS, thread_name_prefix='gateway')
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+
+    def histogram(self, operation):
+        with self._histograms_lock:
+            return self.histograms.setdefault(operation, LatencyHistogram())
+
+    def stats(self):
+        return {
+            'circuit': self.breaker.state,
+            'operations': {operation: histogram.snapshot() for operation, histogram in list(self.histograms.items())},
+        }
+
+    def translate_error(self, error):
+        return GatewayError(str(error) or 'Payment provider error')
+
+    def attempt(self, func, *args, **kwargs):
+        """Run func, retrying retry_errors up to self.retries times"""
+        for remaining in range(self.retries, -1, -1):
+            try:
+                return func(*args, **kwargs)
+            except self.retry_errors:
+                if not remaining:
+                    raise
+
+    def call(self, operation, func, *args, **kwargs):
+        """
+        Run func on the pool with a deadline, breaker and latency tracking.
+
+        A call that misses the deadline cannot be interrupted: its worker
+        runs on until its attempts' HTTP timeouts, which together fit the
+        deadline, run out, so an abandoned call frees its thread soon after
+        the caller gives up (less any time it spent queued). If the
+        provider acts on it after we gave up, the idempotency key makes the
+        caller's retry get that same intent or refund back instead of a
+        second charge. Calls without a key (customers, cards) may leave an
+        unused object at the provider.
+        """
+        if not self.breaker.allow():
+            raise GatewayUnavailable('Payment provider is temporarily unavailable', code='circuit_open')
+
+        started = time.monotonic()
+        future = self.executor.submit(self.attempt, func, *args, **kwargs)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Only drops the call if it is still queued behind busy workers
+            future.cancel()
+            self.breaker.record_failure()
+            self.histogram(operation).observe(time.monotonic() - started, error=True)
+            raise GatewayUnavailable('Payment provider timed out', code='timeout')
+        except self.outage_errors as e:
+            self.breaker.record_failure()
+            self.histogram(operation).observe(time.monotonic() - started, error=True)
+            raise GatewayUnavailable(str(e) or 'Payment provider is unavailable')
+        except Exception as e:
+            # The provider answered (e.g. card declined): not an outage
+            self.breaker.record_success()
+            self.histogram(operation).observe(time.monotonic() - started, error=True)
+            raise self.translate_error(e)
+        self.breaker.record_success()
+        self.histogram(operation).observe(time.monotonic() - started)
+        return result
+
+
+class StripeGateway(BaseGateway):
+    """Stripe through one StripeClient and keep-alive requests session"""
+
+    outage_errors = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+    retry_errors = (stripe.APIConnectionError,)
+
+    def __init__(self):
+        super().__init__()
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        pool_size = settings.PAYMENT_GATEWAY_WORKERS
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        # Retries are ours (BaseGateway.attempt): the SDK's would each get
+        # the full timeout plus backoff and overrun the deadline
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            max_network_retries=0,
+            http_client=stripe.RequestsClient(timeout=self.attempt_timeout, session=session),
+        )
+
+    def translate_error(self, error):
+        if isinstance(error, stripe.StripeError):
+            return GatewayError(
+                error.user_message or str(error) or 'Payment provider error', code=error.code or ''
+            )
+        return super().translate_error(error)
+
+    @staticmethod
+    def as_dict(obj):
+        return json.loads(str(obj))
+
+    def create_payment_intent(self, order, amount_cents, currency):
+        intent = self.call(
+            'create_payment_intent', self.client.v1.payment_intents.create,
+            params={
+                'amount': amount_cents,
+                'currency': currency,
+                'metadata': {
+                    'order_id': str(order.id),
+                    'order_number': order.order_number,
+                    'customer_email': order.customer.email,
+                },
+            },
+            options={'idempotency_key': intent_key(order, amount_cents)},
+        )
+        return self.as_dict(intent)
+
+    def retrieve_payment_intent(self, intent_id):
+        return self.as_dict(self.call('retrieve_payment_intent', self.client.v1.payment_intents.retrieve, intent_id))
+
+    def create_refund(self, order, charge_id, amount_cents, sequence):
+        refund = self.call(
+            'create_refund', self.client.v1.refunds.create,
+            params={'charge': charge_id, 'amount': amount_cents},
+            options={'idempotency_key': refund_key(order, sequence)},
+        )
+        return self.as_dict(refund)
+
+    def create_customer(self, email, name):
+        return self.as_dict(self.call(
+            'create_customer', self.client.v1.customers.create, params={'email': email, 'name': name}
+        ))
+
+    def create_card(self, customer_id, token):
+        return self.as_dict(self.call(
+            'create_card', self.client.v1.customers.payment_sources.create, customer_id, params={'source': token}
+        ))
+
+
+class FakeGateway(BaseGateway):
+    """
+    In-memory provider for tests and offline load tests.
+
+    Intents succeed immediately unless their amount is in decline_amounts;
+    idempotency keys return the original object like Stripe does. latency
+    (seconds) is added to every call and fail_next makes the next n calls
+    fail as outages, to exercise timeouts and the circuit breaker.
+    """
+
+    class Outage(Exception):
+        pass
+
+    outage_errors = (Outage,)
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+        self.fail_next = 0
+        self.decline_amounts = set()
+        self.objects = {}
+        self.idempotent = {}
+        self.calls = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _new_id(self, prefix):
+        return f'{prefix}_fake_{next(self._ids)}'
+
+    def _run(self, operation, build, key=None):
+        def run():
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.calls.append(operation)
+                if self.fail_next:
+                    self.fail_next -= 1
+                    raise self.Outage('Simulated provider outage')
+                if key is not None and key in self.idempotent:
+                    return dict(self.idempotent[key])
+                obj = build()
+                self.objects[obj['id']] = obj
+                if key is not None:
+                    self.idempotent[key] = obj
+                return dict(obj)
+        return self.call(operation, run)
+
+    def create_payment_intent(self, order, amount_cents, currency):
+        def build():
+            intent_id = self._new_id('pi')
+            declined = amount_cents in self.decline_amounts
+            return {
+                'id': intent_id,
+                'object': 'payment_intent',
+                'amount': amount_cents,
+                'currency': currency,
+                'client_secret': f'{intent_id}_secret',
+                'status': 'requires_payment_method' if declined else 'succeeded',
+                'latest_charge': None if declined else self._new_id('ch'),
+                'metadata': {'order_id': str(order.id)},
+            }
+        return self._run('create_payment_intent', build, intent_key(order, amount_cents))
+
+    def retrieve_payment_intent(self, intent_id):
+        def build():
+            if intent_id not in self.objects:
+                raise GatewayError(f'No such payment_intent: {intent_id}', code='resource_missing')
+            return self.objects[intent_id]
+        return self._run('retrieve_payment_intent', build)
+
+    def create_refund(self, order, charge_id, amount_cents, sequence):
+        def build():
+            return {
+                'id': self._new_id('re'), 'object': 'refund', 'charge': charge_id,
+                'amount': amount_cents, 'status': 'succeeded',
+            }
+        return self._run('create_refund', build, refund_key(order, sequence))
+
+    def create_customer(self, email, name):
+        return self._run('create_customer', lambda: {'id': self._new_id('cus'), 'email': email, 'name': name})
+
+    def create_card(self, customer_id, token):
+        def build():
+            return {
+                'id': self._new_id('card'), 'object': 'card', 'customer': customer_id,
+                'brand': 'Visa', 'last4': '4242', 'exp_month': 12, 'exp_year': 2030, 'name': None,
+            }
+        return self._run('create_card', build)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide gateway built from settings.PAYMENT_GATEWAY"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
+
+
+def reset_gateway():
+    """Drop the process gateway (tests, settings changes)"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.executor.shutdown(wait=False)
+        _gateway = None
@@ -0,0 +1,47 @@
+"""
+QuickBite Connect - Compute Payouts Command
+Builds store payouts from delivered, paid orders
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from payments.payouts import compute_payouts, last_week
+from stores.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Computes store payouts for a period (default: last week); safe to re-run after a failure'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day of the period (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day of the period (YYYY-MM-DD)')
+        parser.add_argument('--store', action='append', help='Store slug (repeatable); all stores by default')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Orders attached per transaction')
+
+    def handle(self, *args, **options):
+        if bool(options['start']) != bool(options['end']):
+            raise CommandError('Pass both --start and --end, or neither')
+        period_start, period_end = (options['start'], options['end']) if options['start'] else last_week()
+        if period_start > period_end:
+            raise CommandError('--start must not be after --end')
+
+        store_ids = None
+        if options['store']:
+            store_ids = list(Store.objects.filter(slug__in=options['store']).values_list('id', flat=True))
+            if len(store_ids) != len(set(options['store'])):
+                raise CommandError('Unknown store slug')
+
+        self.stdout.write(f'Computing payouts for {period_start} to {period_end}...')
+        payouts = orders = skipped = 0
+        for payout, attached in compute_payouts(period_start, period_end, store_ids, options['chunk_size']):
+            if attached is None:
+                skipped += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{payout.store.name}: payout is {payout.status}, new orders left for a later period'
+                ))
+                continue
+            payouts += 1
+            orders += attached
+            self.stdout.write(f'{payout.store.name}: {attached} orders, ${payout.amount}')
+
+        self.stdout.write(self.style.SUCCESS(f'{payouts} payouts updated with {orders} orders, {skipped} skipped'))
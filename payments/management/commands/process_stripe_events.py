@@ -0,0 +1,41 @@
+"""
+QuickBite Connect - Process Stripe Events Command
+Worker that applies webhook events from the Stripe inbox
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from payments.webhooks import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Applies pending Stripe webhook events (payments, refunds) in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events applied per batch')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the inbox is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the inbox is drained')
+
+    def handle(self, *args, **options):
+        totals = {'processed': 0, 'ignored': 0, 'retried': 0, 'failed': 0}
+        self.stdout.write('Processing Stripe events...')
+        try:
+            while True:
+                try:
+                    stats = process_batch(options['batch_size'])
+                except Exception as e:
+                    self.stderr.write(f"Stripe event batch failed: {e}")
+                    stats = None
+                if stats is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                for key, value in stats.items():
+                    totals[key] += value
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping...'))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Processed {processed}, ignored {ignored}, retried {retried}, failed {failed}'.format(**totals)
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_stripe_event_inbox'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='payout',
+            constraint=models.UniqueConstraint(fields=('store', 'period_start', 'period_end'), name='unique_store_payout_period'),
+        ),
+    ]
@@ -5,6 +5,7 @@ import uuid
 from django.db import models
 from users.models import User
 from orders.models import Order
+from orders.numbering import generate_transaction_id, save_with_generated_number
 
 
 class Payment(models.Model):
@@ -68,10 +69,7 @@ class Payment(models.Model):
     
     def save(self, *args, **kwargs):
         """Generate transaction ID if not exists"""
-        if not self.transaction_id:
-            import random
-            self.transaction_id = f"TXN-{random.randint(100000000, 999999999)}"
-        super().save(*args, **kwargs)
+        save_with_generated_number(self, 'transaction_id', generate_transaction_id, super().save, *args, **kwargs)
 
 
 class PaymentCard(models.Model):
@@ -206,6 +204,48 @@ class Payout(models.Model):
         verbose_name = 'Payout'
         verbose_name_plural = 'Payouts'
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['store', 'period_start', 'period_end'], name='unique_store_payout_period'
+            ),
+        ]
     
     def __str__(self):
         return f"Payout ${self.amount} - {self.store.name}"
+
+
+class StripeEvent(models.Model):
+    """Inbox of verified Stripe webhook events, keyed by Stripe's event id"""
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    
+    # Processing
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    # Timestamps
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'stripe_events'
+        verbose_name = 'Stripe Event'
+        verbose_name_plural = 'Stripe Events'
+        ordering = ['received_at']
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} - {self.event_id}"
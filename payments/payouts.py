@@ -0,0 +1,118 @@
+"""
+QuickBite Connect - Payouts
+Computing store payouts from delivered, paid orders
+
+An order is payable when it was delivered (completed_at) within the
+period, was paid online and is not yet part of any payout. Each store's
+orders are attached in key-ordered chunks; every chunk adds its orders
+to the payout and their net amount (total less completed refunds) to
+Payout.amount in one transaction. A crashed run can therefore simply be
+started again: attached orders are skipped and the amount stays exact.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from orders.models import Order
+from .models import Payout, Refund
+
+PAID_STATUSES = ('completed', 'partially_refunded')
+
+
+def day_start(day):
+    """Midnight at the start of day in the current timezone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def payable_orders(period_start, period_end):
+    """Delivered, paid orders in the period that no payout includes yet"""
+    # A plain range on completed_at (not __date) keeps the
+    # (status, completed_at) index usable
+    return Order.objects.filter(
+        status='delivered',
+        payment_status__in=PAID_STATUSES,
+        completed_at__gte=day_start(period_start),
+        completed_at__lt=day_start(period_end + timedelta(days=1)),
+        payouts__isnull=True,
+    ).order_by()
+
+
+def net_amount(order_ids):
+    """Order totals less completed refunds, summed in the database"""
+    gross = Order.objects.filter(pk__in=order_ids).aggregate(total=Sum('total_amount'))['total']
+    refunded = Refund.objects.filter(order_id__in=order_ids, status='completed').aggregate(
+        total=Sum('amount')
+    )['total']
+    return (gross or Decimal('0')) - (refunded or Decimal('0'))
+
+
+def attach_chunk(payout, order_ids):
+    """Add orders to a payout and their net amount to its total"""
+    Through = Payout.orders.through
+    with transaction.atomic():
+        # Serialise concurrent runs on this payout, then drop orders another
+        # run attached in the meantime
+        Payout.objects.select_for_update().filter(pk=payout.pk).exists()
+        order_ids = list(
+            Order.objects.filter(pk__in=order_ids, payouts__isnull=True).values_list('pk', flat=True)
+        )
+        if not order_ids:
+            return 0
+        Through.objects.bulk_create(
+            [Through(payout_id=payout.pk, order_id=order_id) for order_id in order_ids]
+        )
+        Payout.objects.filter(pk=payout.pk).update(amount=F('amount') + net_amount(order_ids))
+    return len(order_ids)
+
+
+def compute_store_payout(store_id, period_start, period_end, chunk_size=1000):
+    """
+    Attach a store's payable orders to its payout for the period.
+
+    Returns (payout, orders attached), or (payout, None) when the
+    period's payout has already moved past 'pending' and is left alone.
+    """
+    payout, _ = Payout.objects.get_or_create(
+        store_id=store_id, period_start=period_start, period_end=period_end,
+        defaults={'amount': Decimal('0.00')}
+    )
+    if payout.status != 'pending':
+        return payout, None
+
+    orders = payable_orders(period_start, period_end).filter(store_id=store_id).order_by('pk')
+    attached = 0
+    last_id = None
+    while True:
+        chunk = orders.filter(pk__gt=last_id) if last_id else orders
+        order_ids = list(chunk.values_list('pk', flat=True)[:chunk_size])
+        if not order_ids:
+            break
+        attached += attach_chunk(payout, order_ids)
+        last_id = order_ids[-1]
+
+    payout.refresh_from_db(fields=['amount'])
+    return payout, attached
+
+
+def compute_payouts(period_start, period_end, store_ids=None, chunk_size=1000):
+    """
+    Compute payouts for every store with payable orders in the period.
+
+    Yields (payout, orders attached) per store, as compute_store_payout.
+    """
+    stores = payable_orders(period_start, period_end)
+    if store_ids is not None:
+        stores = stores.filter(store_id__in=store_ids)
+    # Few enough to hold; the orders themselves are only read in chunks
+    store_ids = list(stores.values_list('store_id', flat=True).distinct().order_by('store_id'))
+    for store_id in store_ids:
+        yield compute_store_payout(store_id, period_start, period_end, chunk_size)
+
+
+def last_week(today=None):
+    """Monday to Sunday of the previous week"""
+    today = today or timezone.localdate()
+    end = today - timedelta(days=today.weekday() + 1)
+    return end - timedelta(days=6), end
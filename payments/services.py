@@ -2,116 +2,123 @@
 QuickBite Connect - Payment Services
 Stripe payment processing logic
 """
-import stripe
-from django.conf import settings
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from .gateway import GatewayError, get_gateway
 from .models import Payment, PaymentCard, Refund
+from .webhooks import complete_payments
 from orders.models import Order
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+
+def to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal('1')))
 
 
 class StripePaymentService:
     """Service class for Stripe payment operations"""
     
     @staticmethod
-    def create_payment_intent(order_id, amount, currency='usd'):
-        """Create a Stripe Payment Intent"""
+    def create_payment_intent(order_id, amount=None, currency='usd'):
+        """
+        Create a Stripe Payment Intent.
+        
+        The idempotency key is derived from the order and amount, so a
+        retried request returns the original intent instead of a new one.
+        """
         try:
-            order = Order.objects.get(id=order_id)
-            
-            # Create Payment Intent
-            intent = stripe.PaymentIntent.create(
-                amount=int(amount * 100),  # Convert to cents
-                currency=currency,
-                metadata={
-                    'order_id': str(order.id),
-                    'order_number': order.order_number,
-                    'customer_email': order.customer.email,
-                }
-            )
+            order = Order.objects.select_related('customer').get(id=order_id)
+            if order.payment_status == 'completed':
+                return {'success': False, 'error': 'Order is already paid'}
+            amount = Decimal(str(amount)) if amount else order.total_amount
+            
+            intent = get_gateway().create_payment_intent(order, to_cents(amount), currency)
             
-            # Create Payment record
-            payment = Payment.objects.create(
+            # Create or update the order's Payment record
+            payment, _ = Payment.objects.update_or_create(
                 order=order,
-                user=order.customer,
-                payment_method='card',
-                amount=amount,
-                currency=currency.upper(),
-                status='pending',
-                stripe_payment_intent_id=intent.id
+                defaults={
+                    'user': order.customer,
+                    'payment_method': 'card',
+                    'amount': amount,
+                    'currency': currency.upper(),
+                    'status': 'pending',
+                    'stripe_payment_intent_id': intent['id'],
+                }
             )
             
             return {
                 'success': True,
-                'client_secret': intent.client_secret,
-                'payment_intent_id': intent.id,
+                'client_secret': intent['client_secret'],
+                'payment_intent_id': intent['id'],
                 'payment': payment
             }
             
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        except Order.DoesNotExist:
+            return {'success': False, 'error': 'Order not found'}
+        except (InvalidOperation, ValueError):
+            return {'success': False, 'error': 'Invalid amount'}
+        except GatewayError as e:
+            return {'success': False, 'error': str(e)}
     
     @staticmethod
     def confirm_payment(payment_intent_id):
-        """Confirm payment after successful charge"""
+        """
+        Confirm payment after successful charge.
+        
+        Usually the payment_intent.succeeded webhook has already completed
+        the payment, in which case Stripe is not called at all.
+        """
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment = Payment.objects.select_related('order').get(stripe_payment_intent_id=payment_intent_id)
+            if payment.status == 'completed':
+                return {'success': True, 'payment': payment}
             
-            payment = Payment.objects.get(stripe_payment_intent_id=payment_intent_id)
+            intent = get_gateway().retrieve_payment_intent(payment_intent_id)
             
-            if intent.status == 'succeeded':
-                payment.status = 'completed'
-                payment.stripe_charge_id = intent.charges.data[0].id if intent.charges.data else None
-                payment.payment_gateway_response = intent
-                
-                from django.utils import timezone
-                payment.completed_at = timezone.now()
-                payment.save()
-                
-                # Update order
-                payment.order.payment_status = 'completed'
-                payment.order.status = 'confirmed'
-                payment.order.save()
-                
+            if intent['status'] == 'succeeded':
+                with transaction.atomic():
+                    complete_payments([(payment, intent)])
                 return {'success': True, 'payment': payment}
             else:
                 payment.status = 'failed'
-                payment.failure_reason = f"Payment intent status: {intent.status}"
+                payment.failure_reason = f"Payment intent status: {intent['status']}"
                 payment.save()
                 return {'success': False, 'error': 'Payment not successful'}
                 
-        except Exception as e:
+        except Payment.DoesNotExist:
+            return {'success': False, 'error': 'Payment not found'}
+        except GatewayError as e:
             return {'success': False, 'error': str(e)}
     
     @staticmethod
     def create_refund(payment_id, amount=None, reason='customer_request'):
         """Create a refund for a payment"""
         try:
-            payment = Payment.objects.get(id=payment_id)
+            payment = Payment.objects.select_related('order').get(id=payment_id)
             
             if not payment.stripe_charge_id:
                 return {'success': False, 'error': 'No charge ID found'}
             
-            # Create Stripe refund
-            refund_amount = int((amount or payment.amount) * 100)
-            stripe_refund = stripe.Refund.create(
-                charge=payment.stripe_charge_id,
-                amount=refund_amount
+            # Create Stripe refund; numbering refunds per order keeps the
+            # idempotency key stable across retries of the same request
+            amount = amount or payment.amount
+            sequence = payment.refunds.count() + 1
+            stripe_refund = get_gateway().create_refund(
+                payment.order, payment.stripe_charge_id, to_cents(amount), sequence
             )
             
             # Create Refund record
-            refund = Refund.objects.create(
-                payment=payment,
-                order=payment.order,
-                amount=amount or payment.amount,
-                reason=reason,
-                status='completed' if stripe_refund.status == 'succeeded' else 'processing',
-                stripe_refund_id=stripe_refund.id,
-                requested_by=payment.user
+            refund, _ = Refund.objects.get_or_create(
+                stripe_refund_id=stripe_refund['id'],
+                defaults={
+                    'payment': payment,
+                    'order': payment.order,
+                    'amount': amount,
+                    'reason': reason,
+                    'status': 'completed' if stripe_refund['status'] == 'succeeded' else 'processing',
+                    'requested_by': payment.user,
+                }
             )
             
             # Update payment status
@@ -120,41 +127,37 @@ class StripePaymentService:
             
             return {'success': True, 'refund': refund}
             
-        except Exception as e:
+        except Payment.DoesNotExist:
+            return {'success': False, 'error': 'Payment not found'}
+        except GatewayError as e:
             return {'success': False, 'error': str(e)}
     
     @staticmethod
     def add_payment_card(user, token):
         """Add a payment card for user"""
         try:
-            # Create or retrieve Stripe customer
-            if not hasattr(user, 'stripe_customer_id') or not user.stripe_customer_id:
-                customer = stripe.Customer.create(
-                    email=user.email,
-                    name=user.full_name
-                )
+            gateway = get_gateway()
+            # Create or reuse the Stripe customer
+            customer_id = getattr(user, 'stripe_customer_id', None)
+            if not customer_id:
+                customer_id = gateway.create_customer(user.email, user.full_name)['id']
                 # You might want to add stripe_customer_id to User model
-            else:
-                customer = stripe.Customer.retrieve(user.stripe_customer_id)
             
             # Add card to customer
-            card = stripe.Customer.create_source(
-                customer.id,
-                source=token
-            )
+            card = gateway.create_card(customer_id, token)
             
             # Save card details
             payment_card = PaymentCard.objects.create(
                 user=user,
-                stripe_card_id=card.id,
-                card_brand=card.brand,
-                last_four=card.last4,
-                exp_month=card.exp_month,
-                exp_year=card.exp_year,
-                cardholder_name=card.name or user.full_name
+                stripe_card_id=card['id'],
+                card_brand=card['brand'],
+                last_four=card['last4'],
+                exp_month=card['exp_month'],
+                exp_year=card['exp_year'],
+                cardholder_name=card.get('name') or user.full_name
             )
             
             return {'success': True, 'card': payment_card}
             
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+        except GatewayError as e:
+            return {'success': False, 'error': str(e)}
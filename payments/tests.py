@@ -1,3 +1,307 @@
-from django.test import TestCase
+"""
+QuickBite Connect - Payment Tests
+"""
+import hashlib
+import hmac
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.testing import make_owner, make_store
+from users.models import User
+from orders.models import Order
+from .gateway import GatewayUnavailable, get_gateway, reset_gateway
+from .models import Payment, Payout, Refund, StripeEvent
+from .payouts import attach_chunk, compute_payouts, payable_orders
+from .services import StripePaymentService
+from .webhooks import process_batch
+
+WEBHOOK_SECRET = 'whsec_test'
+FAKE_GATEWAY = 'payments.gateway.FakeGateway'
+
+
+def sign(payload, secret=WEBHOOK_SECRET, timestamp=None):
+    timestamp = timestamp or int(time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={signature}'
+
+
+def make_event(event_id, event_type, obj):
+    return {'id': event_id, 'object': 'event', 'type': event_type, 'data': {'object': obj}}
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, PAYMENT_GATEWAY=FAKE_GATEWAY)
+class StripeWebhookTests(TestCase):
+    """Webhooks are stored and acknowledged; the worker applies them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        store = make_store(make_owner())
+        cls.order = Order.objects.create(
+            customer=cls.customer, store=store, payment_method='card',
+            subtotal=Decimal('10.00'), delivery_fee=Decimal('2.00'), total_amount=Decimal('12.00')
+        )
+        cls.payment = Payment.objects.create(
+            order=cls.order, user=cls.customer, payment_method='card', amount=Decimal('12.00'),
+            stripe_payment_intent_id='pi_1'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        reset_gateway()
+        self.addCleanup(reset_gateway)
+
+    def deliver(self, event, signature=None):
+        payload = json.dumps(event)
+        return self.client.post(
+            '/api/payments/webhook/', payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=signature or sign(payload)
+        )
+
+    def drain(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return process_batch()
+
+    def succeeded_event(self, event_id='evt_1'):
+        return make_event(event_id, 'payment_intent.succeeded', {
+            'id': 'pi_1', 'object': 'payment_intent', 'status': 'succeeded', 'latest_charge': 'ch_1'
+        })
+
+    def test_bad_signature_is_rejected(self):
+        response = self.deliver(self.succeeded_event(), signature=sign('{}'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_webhook_is_stored_once_and_acknowledged_without_applying(self):
+        for _ in range(2):
+            response = self.deliver(self.succeeded_event())
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(StripeEvent.objects.get().status, 'pending')
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'pending')
+
+    def test_worker_completes_payment_and_confirms_order(self):
+        self.deliver(self.succeeded_event())
+        self.deliver(make_event('evt_2', 'customer.created', {'id': 'cus_1'}))
+
+        stats = self.drain()
+
+        self.assertEqual((stats['processed'], stats['ignored']), (1, 1))
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.stripe_charge_id), ('completed', 'ch_1'))
+        self.assertEqual((self.order.status, self.order.payment_status), ('confirmed', 'completed'))
+        self.assertTrue(self.order.status_history.filter(status='confirmed').exists())
+        self.assertIsNone(process_batch())
+
+    def test_bad_event_does_not_block_its_batch(self):
+        self.deliver(self.succeeded_event())
+        self.deliver(make_event('evt_bad', 'payment_intent.succeeded', {'object': 'payment_intent'}))
+
+        stats = self.drain()
+
+        self.assertEqual((stats['processed'], stats['retried']), (1, 1))
+        bad = StripeEvent.objects.get(event_id='evt_bad')
+        self.assertEqual((bad.status, bad.attempts), ('pending', 1))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'completed')
+
+    def test_charge_refunded_updates_refunds_payment_and_order(self):
+        Payment.objects.filter(pk=self.payment.pk).update(status='completed', stripe_charge_id='ch_1')
+        pending = Refund.objects.create(
+            payment=self.payment, order=self.order, amount=Decimal('5.00'), reason='customer_request',
+            status='processing', stripe_refund_id='re_1'
+        )
+        self.deliver(make_event('evt_3', 'charge.refunded', {
+            'id': 'ch_1', 'object': 'charge', 'payment_intent': 'pi_1', 'amount_refunded': 1200, 'refunded': True,
+            'refunds': {'data': [
+                {'id': 're_1', 'amount': 500, 'status': 'succeeded', 'reason': 'requested_by_customer'},
+                {'id': 're_2', 'amount': 700, 'status': 'succeeded', 'reason': 'duplicate'},
+            ]},
+        }))
+
+        self.drain()
+
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'completed')
+        created = Refund.objects.get(stripe_refund_id='re_2')
+        self.assertEqual((created.amount, created.reason), (Decimal('7.00'), 'duplicate_charge'))
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.order.payment_status), ('refunded', 'refunded'))
+
+    def test_partial_refund_without_listed_refunds_records_the_difference(self):
+        Payment.objects.filter(pk=self.payment.pk).update(status='completed', stripe_charge_id='ch_1')
+        self.deliver(make_event('evt_4', 'charge.refunded', {
+            'id': 'ch_1', 'object': 'charge', 'payment_intent': 'pi_1', 'amount_refunded': 300, 'refunded': False,
+        }))
+
+        self.drain()
+
+        self.assertEqual(Refund.objects.get().amount, Decimal('3.00'))
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.order.payment_status), ('completed', 'partially_refunded'))
+
+    def test_confirm_skips_stripe_once_the_webhook_completed_the_payment(self):
+        self.deliver(self.succeeded_event())
+        self.drain()
+
+        result = StripePaymentService.confirm_payment('pi_1')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(get_gateway().calls, [])
+
+    def test_confirm_falls_back_to_stripe_before_the_webhook_arrives(self):
+        get_gateway().objects['pi_1'] = {'id': 'pi_1', 'status': 'succeeded', 'latest_charge': 'ch_9'}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = StripePaymentService.confirm_payment('pi_1')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(get_gateway().calls, ['retrieve_payment_intent'])
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.stripe_charge_id), ('completed', 'ch_9'))
+
+
+@override_settings(
+    PAYMENT_GATEWAY=FAKE_GATEWAY, STRIPE_TIMEOUT=0.2,
+    PAYMENT_CIRCUIT_FAILURE_THRESHOLD=2, PAYMENT_CIRCUIT_RESET_TIMEOUT=60
+)
+class PaymentGatewayTests(TestCase):
+    """Provider calls are idempotent per order, bounded and circuit-broken"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        store = make_store(make_owner())
+        cls.order = Order.objects.create(
+            customer=cls.customer, store=store, payment_method='card',
+            subtotal=Decimal('10.00'), delivery_fee=Decimal('2.00'), total_amount=Decimal('12.00')
+        )
+
+    def setUp(self):
+        reset_gateway()
+        self.addCleanup(reset_gateway)
+        self.gateway = get_gateway()
+
+    def test_retried_intent_reuses_the_order_key(self):
+        first = StripePaymentService.create_payment_intent(self.order.id)
+        second = StripePaymentService.create_payment_intent(self.order.id)
+
+        self.assertTrue(first['success'])
+        self.assertEqual(first['payment_intent_id'], second['payment_intent_id'])
+        self.assertEqual(Payment.objects.get().amount, Decimal('12.00'))
+        self.assertEqual(self.gateway.stats()['operations']['create_payment_intent']['count'], 2)
+
+    def test_slow_provider_call_hits_the_deadline(self):
+        self.gateway.latency = 0.5
+
+        result = StripePaymentService.create_payment_intent(self.order.id)
+
+        self.assertEqual(result, {'success': False, 'error': 'Payment provider timed out'})
+        self.assertFalse(Payment.objects.exists())
+
+    def test_repeated_outages_open_the_circuit(self):
+        self.gateway.fail_next = 2
+        for _ in range(2):
+            with self.assertRaises(GatewayUnavailable):
+                self.gateway.create_customer('a@test.com', 'A')
+
+        with self.assertRaises(GatewayUnavailable) as raised:
+            self.gateway.create_customer('a@test.com', 'A')
+
+        self.assertEqual(raised.exception.code, 'circuit_open')
+        self.assertEqual(len(self.gateway.calls), 2)
+        self.assertEqual(self.gateway.stats()['circuit'], 'open')
+
+    @override_settings(STRIPE_TIMEOUT=0.3, STRIPE_MAX_NETWORK_RETRIES=2)
+    def test_retries_share_the_deadline(self):
+        reset_gateway()
+        gateway = get_gateway()
+        gateway.retry_errors = (gateway.Outage,)
+        self.assertAlmostEqual(gateway.attempt_timeout, 0.1)
+
+        gateway.fail_next = 2
+        gateway.create_customer('a@test.com', 'A')
+        self.assertEqual(len(gateway.calls), 3)
+        self.assertEqual(gateway.stats()['circuit'], 'closed')
+
+        gateway.fail_next = 3
+        with self.assertRaises(GatewayUnavailable):
+            gateway.create_customer('a@test.com', 'A')
+        self.assertEqual(len(gateway.calls), 6)
+
+
+class PayoutTests(TestCase):
+    """Payouts net refunds, skip unpaid orders and survive being re-run"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(email='customer@test.com', password='pass')
+        cls.store = make_store(make_owner())
+        cls.day = date(2025, 3, 5)
+        delivered_at = timezone.make_aware(datetime(2025, 3, 5, 12))
+        cls.orders = [
+            cls.make_order('10.00', 'delivered', 'completed', delivered_at),
+            cls.make_order('20.00', 'delivered', 'partially_refunded', delivered_at),
+            cls.make_order('30.00', 'delivered', 'completed', delivered_at),
+            cls.make_order('40.00', 'delivered', 'pending', delivered_at),  # cash, not paid online
+            cls.make_order('50.00', 'preparing', 'completed', None),
+        ]
+        payment = Payment.objects.create(
+            order=cls.orders[1], user=cls.customer, payment_method='card', amount=Decimal('20.00')
+        )
+        Refund.objects.create(
+            payment=payment, order=cls.orders[1], amount=Decimal('5.00'), reason='other', status='completed'
+        )
+        Refund.objects.create(
+            payment=payment, order=cls.orders[1], amount=Decimal('3.00'), reason='other', status='failed'
+        )
+
+    @classmethod
+    def make_order(cls, total, status, payment_status, completed_at):
+        return Order.objects.create(
+            customer=cls.customer, store=cls.store, payment_method='card', status=status,
+            payment_status=payment_status, completed_at=completed_at,
+            subtotal=Decimal(total), delivery_fee=Decimal('0.00'), total_amount=Decimal(total)
+        )
+
+    def test_payout_nets_refunds_over_paid_delivered_orders(self):
+        [(payout, attached)] = compute_payouts(self.day, self.day, chunk_size=2)
+
+        self.assertEqual((attached, payout.amount), (3, Decimal('55.00')))
+        self.assertEqual(set(payout.orders.all()), set(self.orders[:3]))
+
+    def test_rerun_after_partial_run_does_not_double_count(self):
+        payout = Payout.objects.create(store=self.store, amount=0, period_start=self.day, period_end=self.day)
+        attach_chunk(payout, [self.orders[0].pk])  # run interrupted after its first chunk
+
+        [(payout, attached)] = compute_payouts(self.day, self.day)
+        self.assertEqual((attached, payout.amount), (2, Decimal('55.00')))
+        self.assertEqual(list(compute_payouts(self.day, self.day)), [])
+        self.assertEqual(Payout.orders.through.objects.count(), 3)
+
+    def test_period_covers_whole_local_days(self):
+        edges = [
+            datetime(2025, 3, 4, 23, 59, 59, 999999),
+            datetime(2025, 3, 5, 0, 0),
+            datetime(2025, 3, 6, 23, 59, 59, 999999),
+            datetime(2025, 3, 7, 0, 0),
+        ]
+        before, first, last, after = [
+            self.make_order('1.00', 'delivered', 'completed', timezone.make_aware(moment)) for moment in edges
+        ]
+
+        payable = set(payable_orders(self.day, date(2025, 3, 6)))
+        self.assertEqual(payable, {first, last, *self.orders[:3]})
+        # Compared as a plain column, not cast to a date, so the index applies
+        self.assertIn('"orders"."completed_at" >=', str(payable_orders(self.day, self.day).query))
@@ -10,6 +10,8 @@ urlpatterns = [
     # Payment Intent
     path('create-intent/', views.CreatePaymentIntentView.as_view(), name='create-intent'),
     path('confirm/', views.ConfirmPaymentView.as_view(), name='confirm-payment'),
+    path('webhook/', views.StripeWebhookView.as_view(), name='stripe-webhook'),
+    path('gateway-stats/', views.GatewayStatsView.as_view(), name='gateway-stats'),
     
     # Payment History
     path('', views.PaymentListView.as_view(), name='payment-list'),
@@ -4,10 +4,12 @@ QuickBite Connect - Payment Views
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from .models import Payment, PaymentCard, Refund
 from .serializers import PaymentSerializer, PaymentCardSerializer, RefundSerializer
+from .gateway import get_gateway
 from .services import StripePaymentService
+from .webhooks import InvalidWebhook, store_event, verify_event
 
 
 class CreatePaymentIntentView(APIView):
@@ -127,4 +129,32 @@ class RefundRequestView(APIView):
             return Response(
                 {'error': result['error']},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
+
+
+class StripeWebhookView(APIView):
+    """
+    Stripe webhook endpoint.
+    
+    Verifies the signature, stores the event in the inbox and acknowledges
+    right away; process_stripe_events applies it.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        try:
+            event = verify_event(request.body, request.META.get('HTTP_STRIPE_SIGNATURE'))
+        except InvalidWebhook as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        store_event(event)
+        return Response({'received': True})
+
+
+class GatewayStatsView(APIView):
+    """Latency histograms and circuit breaker state of this process's gateway"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_gateway().stats())
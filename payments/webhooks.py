@@ -0,0 +1,270 @@
+"""
+QuickBite Connect - Stripe Webhooks
+Verifying, storing and applying Stripe webhook events
+
+The endpoint only checks the signature and inserts the event into the
+StripeEvent inbox (a repeated delivery hits the unique event_id and is
+dropped), so Stripe is acknowledged immediately. The process_stripe_events
+worker then applies pending events in batches.
+"""
+import json
+from collections import defaultdict
+from decimal import Decimal
+
+import stripe
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from orders.models import Order
+from .models import Payment, Refund, StripeEvent
+
+REFUND_STATUSES = {
+    'succeeded': 'completed',
+    'pending': 'processing',
+    'requires_action': 'processing',
+    'failed': 'failed',
+    'canceled': 'cancelled',
+}
+
+REFUND_REASONS = {
+    'requested_by_customer': 'customer_request',
+    'duplicate': 'duplicate_charge',
+}
+
+
+class InvalidWebhook(Exception):
+    """Raised for webhook requests that fail verification"""
+    pass
+
+
+def verify_event(payload, signature):
+    """Return the decoded event if the Stripe-Signature header is valid"""
+    try:
+        stripe.WebhookSignature.verify_header(
+            payload, signature, settings.STRIPE_WEBHOOK_SECRET, settings.STRIPE_WEBHOOK_TOLERANCE
+        )
+        event = json.loads(payload)
+    except (stripe.SignatureVerificationError, ValueError) as e:
+        raise InvalidWebhook(str(e))
+    if not isinstance(event, dict) or not event.get('id') or not event.get('type'):
+        raise InvalidWebhook('Malformed event')
+    return event
+
+
+def store_event(event):
+    """Insert an event into the inbox; duplicates are silently ignored"""
+    StripeEvent.objects.bulk_create(
+        [StripeEvent(event_id=event['id'], event_type=event['type'], payload=event)],
+        ignore_conflicts=True
+    )
+
+
+def to_amount(cents):
+    return (Decimal(cents or 0) / 100).quantize(Decimal('0.01'))
+
+
+def intent_charge_id(intent):
+    """Charge id of a PaymentIntent, for both current and pre-2022 API versions"""
+    charge = intent.get('latest_charge')
+    if charge:
+        return charge['id'] if isinstance(charge, dict) else charge
+    charges = (intent.get('charges') or {}).get('data') or []
+    return charges[0]['id'] if charges else None
+
+
+def complete_payments(pairs, now=None):
+    """
+    Mark (payment, intent) pairs as paid and confirm their pending orders.
+
+    Payments must be loaded with select_related('order'). Already
+    completed payments are left alone, so replays are harmless.
+    """
+    now = now or timezone.now()
+    changed = []
+    for payment, intent in pairs:
+        if payment.status == 'completed':
+            continue
+        payment.status = 'completed'
+        payment.stripe_charge_id = intent_charge_id(intent) or payment.stripe_charge_id
+        payment.payment_gateway_response = intent
+        payment.completed_at = now
+        payment.updated_at = now
+        changed.append(payment)
+    if not changed:
+        return changed
+
+    Payment.objects.bulk_update(
+        changed, ['status', 'stripe_charge_id', 'payment_gateway_response', 'completed_at', 'updated_at']
+    )
+    Order.objects.filter(pk__in=[payment.order_id for payment in changed]).update(
+        payment_status='completed', updated_at=now
+    )
+    for payment in changed:
+        payment.order.payment_status = 'completed'
+        if payment.order.status == 'pending':
+            payment.order.transition_to('confirmed', notes='Payment received')
+    return changed
+
+
+def apply_payment_intents_succeeded(intents, now):
+    by_id = {intent['id']: intent for intent in intents}
+    payments = Payment.objects.select_related('order').filter(stripe_payment_intent_id__in=by_id)
+    complete_payments([(payment, by_id[payment.stripe_payment_intent_id]) for payment in payments], now)
+
+
+def _payments_for_charges(charges):
+    """{charge id: payment}, matching by charge id or, failing that, PaymentIntent"""
+    payments = {
+        payment.stripe_charge_id: payment
+        for payment in Payment.objects.select_related('order').filter(stripe_charge_id__in=charges)
+    }
+    by_intent = {
+        charge['payment_intent']: charge_id
+        for charge_id, charge in charges.items()
+        if charge_id not in payments and charge.get('payment_intent')
+    }
+    if by_intent:
+        for payment in Payment.objects.select_related('order').filter(stripe_payment_intent_id__in=by_intent):
+            payment.stripe_charge_id = by_intent[payment.stripe_payment_intent_id]
+            payments[payment.stripe_charge_id] = payment
+    return payments
+
+
+def apply_charges_refunded(charges, now):
+    charges = {charge['id']: charge for charge in charges}
+    payments = _payments_for_charges(charges)
+
+    # Refund objects listed on the charge (older API versions embed them)
+    listed = {
+        refund['id']: (charge_id, refund)
+        for charge_id, charge in charges.items()
+        for refund in (charge.get('refunds') or {}).get('data') or []
+    }
+    existing = {refund.stripe_refund_id: refund for refund in Refund.objects.filter(stripe_refund_id__in=listed)}
+    new_refunds, updated_refunds = [], []
+    for refund_id, (charge_id, data) in listed.items():
+        payment = payments.get(charge_id)
+        if payment is None:
+            continue
+        status = REFUND_STATUSES.get(data.get('status'), 'processing')
+        processed_at = now if status == 'completed' else None
+        refund = existing.get(refund_id)
+        if refund is None:
+            new_refunds.append(Refund(
+                payment=payment,
+                order_id=payment.order_id,
+                amount=to_amount(data.get('amount')),
+                reason=REFUND_REASONS.get(data.get('reason'), 'other'),
+                status=status,
+                stripe_refund_id=refund_id,
+                processed_at=processed_at
+            ))
+        elif refund.status != status:
+            refund.status = status
+            refund.processed_at = processed_at
+            updated_refunds.append(refund)
+
+    # Otherwise record whatever amount_refunded has that our refunds don't cover
+    unlisted = [charge_id for charge_id in payments if not (charges[charge_id].get('refunds') or {}).get('data')]
+    if unlisted:
+        recorded = dict(
+            Refund.objects.filter(payment__in=[payments[charge_id] for charge_id in unlisted])
+            .exclude(status__in=('failed', 'cancelled')).order_by().values('payment_id')
+            .annotate(total=Sum('amount')).values_list('payment_id', 'total')
+        )
+        for charge_id in unlisted:
+            payment = payments[charge_id]
+            missing = to_amount(charges[charge_id].get('amount_refunded')) - recorded.get(payment.pk, 0)
+            if missing > 0:
+                new_refunds.append(Refund(
+                    payment=payment, order_id=payment.order_id, amount=missing, reason='other',
+                    status='completed', processed_at=now
+                ))
+
+    Refund.objects.bulk_create(new_refunds)
+    Refund.objects.bulk_update(updated_refunds, ['status', 'processed_at'])
+
+    order_statuses = defaultdict(list)
+    for charge_id, payment in payments.items():
+        fully_refunded = bool(charges[charge_id].get('refunded'))
+        if fully_refunded:
+            payment.status = 'refunded'
+        payment.updated_at = now
+        order_statuses['refunded' if fully_refunded else 'partially_refunded'].append(payment.order_id)
+    Payment.objects.bulk_update(list(payments.values()), ['status', 'stripe_charge_id', 'updated_at'])
+    for payment_status, order_ids in order_statuses.items():
+        Order.objects.filter(pk__in=order_ids).update(payment_status=payment_status, updated_at=now)
+
+
+HANDLERS = {
+    'payment_intent.succeeded': apply_payment_intents_succeeded,
+    'charge.refunded': apply_charges_refunded,
+}
+
+
+def _apply(handler, events, now):
+    with transaction.atomic():
+        handler([event.payload['data']['object'] for event in events], now)
+
+
+def process_batch(batch_size=100):
+    """
+    Apply up to batch_size pending events, oldest first.
+
+    Events of one type are applied together; if that fails they are
+    retried one by one so a single bad event cannot hold back the rest.
+    Returns outcome counts, or None when the inbox is empty.
+    """
+    max_attempts = settings.STRIPE_EVENT_MAX_ATTEMPTS
+    stats = {'processed': 0, 'ignored': 0, 'retried': 0, 'failed': 0}
+
+    with transaction.atomic():
+        events = list(
+            StripeEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('received_at')[:batch_size]
+        )
+        if not events:
+            return None
+        now = timezone.now()
+
+        by_type = defaultdict(list)
+        for event in events:
+            by_type[event.event_type].append(event)
+
+        for event_type, group in by_type.items():
+            handler = HANDLERS.get(event_type)
+            if handler is None:
+                for event in group:
+                    event.status = 'ignored'
+                    event.processed_at = now
+                stats['ignored'] += len(group)
+                continue
+            try:
+                _apply(handler, group, now)
+                done, errors = group, []
+            except Exception:
+                done, errors = [], []
+                for event in group:
+                    try:
+                        _apply(handler, [event], now)
+                        done.append(event)
+                    except Exception as e:
+                        errors.append((event, e))
+            for event in done:
+                event.attempts += 1
+                event.status = 'processed'
+                event.processed_at = now
+                event.last_error = ''
+            stats['processed'] += len(done)
+            for event, error in errors:
+                event.attempts += 1
+                event.last_error = str(error)
+                if event.attempts >= max_attempts:
+                    event.status = 'failed'
+                    stats['failed'] += 1
+                else:
+                    stats['retried'] += 1
+
+        StripeEvent.objects.bulk_update(events, ['status', 'attempts', 'last_error', 'processed_at'])
+    return stats
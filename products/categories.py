@@ -0,0 +1,37 @@
+"""
+QuickBite Connect - Category Tree
+Builds the product category tree from a single query
+"""
+from config.caching import get_or_build
+from .models import ProductCategory
+
+TREE_CACHE_NAMESPACES = ('product_categories',)
+TREE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def build_category_tree():
+    """
+    Load all active categories in one query and link them in memory.
+
+    Returns the root categories; every node carries its active children in
+    ``tree_children``. Children of an inactive category are left out, just
+    as they were when the tree was walked one level at a time.
+    """
+    categories = ProductCategory.objects.filter(is_active=True).order_by('depth', 'display_order', 'name')
+    nodes = {}
+    roots = []
+    for category in categories:
+        category.tree_children = []
+        if category.parent_id is None:
+            roots.append(category)
+        elif category.parent_id in nodes:
+            nodes[category.parent_id].tree_children.append(category)
+        else:
+            continue
+        nodes[category.id] = category
+    return roots
+
+
+def get_category_tree():
+    """The active category tree, cached until a category changes"""
+    return get_or_build('category-tree', TREE_CACHE_NAMESPACES, build_category_tree, TREE_CACHE_TIMEOUT)
@@ -0,0 +1,103 @@
+"""
+QuickBite Connect - Inventory
+Set-based stock reservation for checkout
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from .models import Product, InventoryLog
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more products cannot cover the requested quantity"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('Insufficient stock')
+
+
+class _ReservationFailed(Exception):
+    pass
+
+
+def reserve_stock(quantities, user=None, notes=''):
+    """
+    Decrement stock for {product_id: quantity} in a fixed number of queries.
+
+    A single conditional UPDATE only touches rows that still have enough
+    stock; if any row is short the whole reservation is rolled back and
+    InsufficientStock is raised with a message per failing product.
+    The same UPDATE adds the quantities to total_sold, so it commits or
+    rolls back with the checkout. Writes one 'sale' InventoryLog per
+    product on success.
+    """
+    if not quantities:
+        return
+
+    product_ids = list(quantities)
+    requested = Case(
+        *[When(id=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField()
+    )
+
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(
+                id__in=product_ids,
+                is_available=True,
+                stock_quantity__gte=requested
+            ).update(
+                stock_quantity=F('stock_quantity') - requested,
+                total_sold=F('total_sold') + requested
+            )
+            if updated != len(product_ids):
+                raise _ReservationFailed
+    except _ReservationFailed:
+        raise InsufficientStock(_shortages(quantities))
+
+    remaining = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'stock_quantity'))
+    InventoryLog.objects.bulk_create([
+        InventoryLog(
+            product_id=product_id,
+            action='sale',
+            quantity_change=-quantity,
+            previous_quantity=remaining[product_id] + quantity,
+            new_quantity=remaining[product_id],
+            notes=notes,
+            created_by=user
+        )
+        for product_id, quantity in quantities.items()
+    ])
+
+
+def adjust_total_sold(quantities):
+    """Add {product_id: quantity} (negative to take sales back) to total_sold in one UPDATE"""
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity}
+    if not quantities:
+        return
+    change = Case(
+        *[When(id=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField()
+    )
+    Product.objects.filter(id__in=list(quantities)).update(total_sold=F('total_sold') + change)
+
+
+def _shortages(quantities):
+    """Describe why each product could not be reserved"""
+    products = {
+        row['id']: row
+        for row in Product.objects.filter(id__in=list(quantities)).values(
+            'id', 'name', 'stock_quantity', 'is_available'
+        )
+    }
+    errors = {}
+    for product_id, quantity in quantities.items():
+        product = products.get(product_id)
+        if product is None:
+            errors[str(product_id)] = 'Product no longer exists'
+        elif not product['is_available']:
+            errors[str(product_id)] = f"{product['name']} is not available"
+        elif product['stock_quantity'] < quantity:
+            errors[str(product_id)] = (
+                f"Only {product['stock_quantity']} {product['name']} available, {quantity} requested"
+            )
+    return errors
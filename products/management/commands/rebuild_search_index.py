@@ -0,0 +1,20 @@
+"""
+QuickBite Connect - Rebuild Search Index Command
+Recomputes full-text search documents for products and stores
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from config.search import rebuild_index
+from stores.models import Store
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for products and stores'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stores = rebuild_index(Store)
+            products = rebuild_index(Product)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {stores} stores and {products} products'))
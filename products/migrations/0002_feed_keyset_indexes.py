@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('stores', '0002_store_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', '-created_at', '-id'], name='products_is_avai_9e58c7_idx'),
+        ),
+    ]
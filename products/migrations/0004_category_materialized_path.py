@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:09
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    ProductCategory = apps.get_model('products', 'ProductCategory')
+    children = {}
+    for category in ProductCategory.objects.only('id', 'parent_id'):
+        children.setdefault(category.parent_id, []).append(category)
+
+    updated = []
+    level = [(category, '', 0) for category in children.get(None, [])]
+    while level:
+        next_level = []
+        for category, parent_path, depth in level:
+            category.path = f"{parent_path}{category.id.hex}/"
+            category.depth = depth
+            updated.append(category)
+            next_level.extend((child, category.path, depth + 1) for child in children.get(category.id, []))
+        level = next_level
+    ProductCategory.objects.bulk_update(updated, ['path', 'depth'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productcategory',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=330),
+        ),
+        migrations.AddIndex(
+            model_name='productcategory',
+            index=models.Index(fields=['path'], name='product_cat_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
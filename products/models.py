@@ -2,11 +2,14 @@
 QuickBite Connect - Product Models
 """
 import uuid
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.core.validators import MinValueValidator, MaxValueValidator
 from stores.models import Store
-
-from stores.utils import update_product_rating
+from stores.utils import rebuild_rating_totals
 
 
 class ProductCategory(models.Model):
@@ -21,16 +24,60 @@ class ProductCategory(models.Model):
     is_active = models.BooleanField(default=True)
     display_order = models.IntegerField(default=0)
     
+    # Materialized path: ancestor ids (hex) from the root down to this
+    # category, each followed by '/'. Descendants share the path as prefix.
+    path = models.CharField(max_length=330, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    
     class Meta:
         db_table = 'product_categories'
         verbose_name = 'Product Category'
         verbose_name_plural = 'Product Categories'
         ordering = ['display_order', 'name']
+        indexes = [
+            models.Index(fields=['path'], name='product_cat_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
     
     def __str__(self):
         if self.parent:
             return f"{self.parent.name} > {self.name}"
         return self.name
+    
+    def clean(self):
+        if self.parent_id and self.path and self.parent.path.startswith(self.path):
+            raise ValidationError({'parent': 'A category cannot be moved under itself or its descendants'})
+    
+    def save(self, *args, **kwargs):
+        """Maintain path/depth and re-root descendants when moved"""
+        old_path = self.path
+        if self.parent_id:
+            parent = self.parent
+            if old_path and parent.path.startswith(old_path):
+                raise ValueError('A category cannot be moved under itself or its descendants')
+            self.path = f"{parent.path}{self.id.hex}/"
+            self.depth = parent.depth + 1
+        else:
+            self.path = f"{self.id.hex}/"
+            self.depth = 0
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'path', 'depth'}
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.path:
+                ProductCategory.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                    depth=F('depth') + (self.depth - old_path.count('/') + 1)
+                )
+    
+    def get_descendants(self, include_self=True):
+        """All categories below this one, found with a single prefix scan"""
+        queryset = ProductCategory.objects.filter(path__startswith=self.path)
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
 
 
 class Product(models.Model):
@@ -89,9 +136,14 @@ class Product(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
     total_reviews = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0, help_text="Sum of approved review ratings")
     total_sold = models.IntegerField(default=0)
     view_count = models.IntegerField(default=0)
     
+    # Full-text search (see config.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_document = (('name', 'A'), ('short_description', 'B'), ('description', 'C'))
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -104,6 +156,7 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['store', 'is_available']),
             models.Index(fields=['category', 'is_available']),
+            models.Index(fields=['is_available', '-created_at', '-id']),
         ]
         unique_together = ('store', 'slug')
     
@@ -127,14 +180,12 @@ class Product(models.Model):
     def is_in_stock(self):
         """Check if product is in stock"""
         return self.stock_quantity > 0
+    
     def update_rating(self):
-       update_product_rating(self)
-     
-     
-    def update_rating(self):
-        """Update store's average rating"""
-        from stores.utils import update_product_rating
-        update_product_rating(self)
+        """Recompute the rating totals from this product's approved reviews"""
+        from reviews.models import ProductReview
+        rebuild_rating_totals(Product, ProductReview, 'product', pks=[self.pk])
+        self.refresh_from_db(fields=['rating_sum', 'total_reviews', 'average_rating'])
 
 class ProductImage(models.Model):
     """Additional images for products"""
@@ -11,12 +11,16 @@ class ProductCategorySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ProductCategory
-        fields = '__all__'
+        # The materialized path is an internal index, not part of the API
+        exclude = ('path', 'depth')
     
     def get_subcategories(self, obj):
-        if obj.subcategories.exists():
-            return ProductCategorySerializer(obj.subcategories.filter(is_active=True), many=True).data
-        return []
+        # Nodes from products.categories.build_category_tree carry their
+        # children already; anything else falls back to a query per level
+        children = getattr(obj, 'tree_children', None)
+        if children is None:
+            children = obj.subcategories.filter(is_active=True)
+        return ProductCategorySerializer(children, many=True, context=self.context).data
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -66,7 +70,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ('search_vector',)
 
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -74,7 +78,7 @@ class ProductCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        exclude = ('average_rating', 'total_reviews', 'total_sold', 'view_count')
+        exclude = ('average_rating', 'total_reviews', 'total_sold', 'view_count', 'search_vector')
     
     def create(self, validated_data):
         # Auto-generate slug from name
@@ -0,0 +1,34 @@
+"""
+QuickBite Connect - Product Signals
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from config import search
+from config.caching import invalidate
+from .models import Product, ProductCategory, ProductImage, ProductVariant
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def invalidate_product_cache(sender, **kwargs):
+    invalidate('products')
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_product_category_cache(sender, **kwargs):
+    invalidate('product_categories', 'products')
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    search.index_instance(instance, update_fields)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove_instance(instance)
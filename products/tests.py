@@ -1,3 +1,145 @@
-from django.test import TestCase
+"""
+QuickBite Connect - Product Tests
+"""
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from config.search import ContainsSearchBackend, get_backend, rebuild_index, search
+from config.testing import make_owner, make_store
+from .models import Product, ProductCategory
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'product-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CategoryTreeTests(TestCase):
+    """Materialized paths follow moves and the tree is served from one query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.food = cls.create_category('Food')
+        cls.burgers = cls.create_category('Burgers', cls.food)
+        cls.smash = cls.create_category('Smash', cls.burgers)
+        cls.drinks = cls.create_category('Drinks')
+        cls.hidden = cls.create_category('Hidden', cls.drinks, is_active=False)
+        cls.create_category('Under Hidden', cls.hidden)
+
+    @classmethod
+    def create_category(cls, name, parent=None, **kwargs):
+        return ProductCategory.objects.create(name=name, slug=name.lower().replace(' ', '-'), parent=parent, **kwargs)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_paths_are_rebuilt_when_a_subtree_moves(self):
+        self.assertEqual(self.smash.path, f'{self.food.id.hex}/{self.burgers.id.hex}/{self.smash.id.hex}/')
+        self.assertEqual(self.smash.depth, 2)
+
+        self.burgers.parent = self.drinks
+        self.burgers.save()
+
+        self.smash.refresh_from_db()
+        self.assertEqual(self.smash.path, f'{self.drinks.id.hex}/{self.burgers.id.hex}/{self.smash.id.hex}/')
+        self.assertEqual(set(self.drinks.get_descendants(include_self=False)), {
+            self.burgers, self.smash, self.hidden, ProductCategory.objects.get(slug='under-hidden')
+        })
+        self.assertEqual(list(self.food.get_descendants()), [self.food])
+
+        self.burgers.parent = None
+        self.burgers.save(update_fields=['parent'])
+        self.smash.refresh_from_db()
+        self.assertEqual((self.smash.path, self.smash.depth), (f'{self.burgers.id.hex}/{self.smash.id.hex}/', 1))
+
+        self.burgers.parent = self.smash
+        with self.assertRaises(ValueError):
+            self.burgers.save()
+
+    def test_tree_endpoint_uses_one_query(self):
+        with self.assertNumQueries(1):
+            response = APIClient().get('/api/products/categories/')
+
+        self.assertEqual(response.status_code, 200)
+        tree = {row['name']: row for row in response.data['results']}
+        self.assertEqual(set(tree), {'Food', 'Drinks'})
+        [burgers] = tree['Food']['subcategories']
+        self.assertNotIn('path', burgers)
+        self.assertNotIn('depth', burgers)
+        self.assertEqual([child['name'] for child in burgers['subcategories']], ['Smash'])
+        # Inactive categories are left out together with their subtrees
+        self.assertEqual(tree['Drinks']['subcategories'], [])
+
+    def test_category_tree_filter_includes_descendants(self):
+        store = make_store(make_owner())
+        for name, category in (('Double', self.smash), ('Cola', self.drinks)):
+            Product.objects.create(
+                store=store, category=category, name=name, slug=name.lower(), description=name, price=Decimal('5.00')
+            )
+
+        response = APIClient().get('/api/products/', {'category_tree': 'food'})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Double'])
+        self.assertEqual(APIClient().get('/api/products/', {'category_tree': 'nope'}).status_code, 400)
+
+
+class ProductSearchTests(TestCase):
+    """FTS5 ranking on SQLite, index upkeep and the icontains fallback"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.store = make_store(make_owner())
+        cls.burger = cls.create_product('Cheese Burger', 'Grilled beef patty with cheddar')
+        cls.salad = cls.create_product('Garden Salad', 'Greens, tomato and a side of burger sauce')
+        cls.soup = cls.create_product('Tomato Soup', 'Slow cooked tomatoes')
+
+    @classmethod
+    def create_product(cls, name, description):
+        return Product.objects.create(
+            store=cls.store, name=name, slug=name.lower().replace(' ', '-'), description=description,
+            price=Decimal('5.00')
+        )
+
+    def names(self, queryset):
+        return [product.name for product in queryset.order_by('-search_rank')]
+
+    def test_name_matches_outrank_description_matches(self):
+        self.assertEqual(self.names(search(Product.objects.all(), 'burger')), ['Cheese Burger', 'Garden Salad'])
+        # Stemmed, and the last word may be a prefix
+        self.assertEqual(self.names(search(Product.objects.all(), 'tomatoes')), ['Tomato Soup', 'Garden Salad'])
+        self.assertEqual(self.names(search(Product.objects.all(), 'chees')), ['Cheese Burger'])
+
+    def test_typos_fall_back_to_trigrams(self):
+        self.assertEqual(self.names(search(Product.objects.all(), 'burgr')), ['Cheese Burger'])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.soup.name = 'Pumpkin Soup'
+        self.soup.description = 'Roasted pumpkin'
+        self.soup.save()
+        self.assertEqual(self.names(search(Product.objects.all(), 'pumpkin')), ['Pumpkin Soup'])
+        self.assertEqual(self.names(search(Product.objects.all(), 'tomato')), ['Garden Salad'])
+
+        self.burger.delete()
+        self.assertEqual(self.names(search(Product.objects.all(), 'burger')), ['Garden Salad'])
+
+        self.assertEqual(rebuild_index(Product), 2)
+        self.assertEqual(self.names(search(Product.objects.all(), 'pumpkin')), ['Pumpkin Soup'])
+
+    def test_search_param_ranks_the_listing(self):
+        response = APIClient().get('/api/products/', {'search': 'burger'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data['results']], ['Cheese Burger', 'Garden Salad'])
+
+    def test_other_databases_fall_back_to_icontains(self):
+        with patch.object(connection, 'vendor', 'other'):
+            self.assertIsInstance(get_backend(), ContainsSearchBackend)
+            self.assertEqual(
+                set(search(Product.objects.all(), 'TOMATO').values_list('name', flat=True)),
+                {'Garden Salad', 'Tomato Soup'}
+            )
+            self.assertFalse(search(Product.objects.all(), 'burgr').exists())
+            # Saves must not fail for want of an index
+            self.soup.save()
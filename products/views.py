@@ -1,10 +1,17 @@
 """
 QuickBite Connect - Product Views
 """
+import uuid
 from rest_framework import generics, filters, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import F
+from config.caching import CachedResponseMixin
+from config.search import RankedSearchFilter
+from config.pagination import FeedPagination
+from .categories import get_category_tree
 from .models import ProductCategory, Product, ProductImage, ProductVariant
 from .serializers import (
     ProductCategorySerializer,
@@ -16,20 +23,30 @@ from .serializers import (
 )
 
 
-class ProductCategoryListView(generics.ListAPIView):
+class ProductCategoryListView(CachedResponseMixin, generics.ListAPIView):
     """API endpoint to list product categories"""
-    queryset = ProductCategory.objects.filter(is_active=True, parent=None)
+    cache_namespaces = ('product_categories',)
+    cache_timeout = 3600
+    queryset = ProductCategory.objects.filter(is_active=True, parent__isnull=True)
     serializer_class = ProductCategorySerializer
     permission_classes = [AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        # Root categories with their subtrees attached, built from one query
+        tree = get_category_tree()
+        page = self.paginate_queryset(tree)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(tree, many=True).data)
 
 
 class ProductListView(generics.ListAPIView):
     """API endpoint to list products"""
     serializer_class = ProductListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = FeedPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, RankedSearchFilter]
     filterset_fields = ['store', 'category', 'is_available', 'is_featured', 'is_vegetarian', 'is_vegan']
-    search_fields = ['name', 'description', 'short_description']
     ordering_fields = ['price', 'average_rating', 'created_at', 'total_sold']
     ordering = ['-is_featured', '-created_at']
     
@@ -41,6 +58,11 @@ class ProductListView(generics.ListAPIView):
         if store_slug:
             queryset = queryset.filter(store__slug=store_slug)
         
+        # Filter by a category and everything below it
+        category_tree = self.request.query_params.get('category_tree', None)
+        if category_tree:
+            queryset = queryset.filter(category__path__startswith=self.get_category_path(category_tree))
+        
         # Filter by price range
         min_price = self.request.query_params.get('min_price', None)
         max_price = self.request.query_params.get('max_price', None)
@@ -50,22 +72,37 @@ class ProductListView(generics.ListAPIView):
             queryset = queryset.filter(price__lte=max_price)
         
         return queryset
+    
+    def get_category_path(self, value):
+        """Resolve a category id or slug to its materialized path"""
+        try:
+            lookup = {'id': uuid.UUID(value)}
+        except ValueError:
+            lookup = {'slug': value}
+        path = ProductCategory.objects.filter(**lookup).values_list('path', flat=True).first()
+        if path is None:
+            raise ValidationError({'error': 'Unknown category'})
+        return path
 
 
-class ProductDetailView(generics.RetrieveAPIView):
+class ProductDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     """API endpoint for product detail"""
-    queryset = Product.objects.filter(is_available=True)
+    queryset = Product.objects.filter(is_available=True).select_related(
+        'store', 'category'
+    ).prefetch_related('images', 'variants')
     serializer_class = ProductDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    cache_namespaces = ('products',)
+    cache_timeout = 120
     
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.view_count += 1
-        instance.save(update_fields=['view_count'])
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    def get(self, request, *args, **kwargs):
+        # Count the view even when served from cache; a queryset update
+        # skips post_save so views don't invalidate the product cache
+        Product.objects.filter(slug=kwargs['slug'], is_available=True).update(
+            view_count=F('view_count') + 1
+        )
+        return super().get(request, *args, **kwargs)
 
 
 class ProductCreateView(generics.CreateAPIView):
@@ -40,12 +40,16 @@ class StoreReviewAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['approve_reviews', 'flag_reviews', 'unflag_reviews']
+    actions = ['approve_reviews', 'unapprove_reviews', 'flag_reviews', 'unflag_reviews']
     
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True, is_flagged=False)
+        queryset.set_approved(True, is_flagged=False)
     approve_reviews.short_description = "Approve selected reviews"
     
+    def unapprove_reviews(self, request, queryset):
+        queryset.set_approved(False)
+    unapprove_reviews.short_description = "Unapprove selected reviews"
+    
     def flag_reviews(self, request, queryset):
         queryset.update(is_flagged=True)
     flag_reviews.short_description = "Flag selected reviews"
@@ -89,12 +93,16 @@ class ProductReviewAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['approve_reviews', 'flag_reviews', 'unflag_reviews']
+    actions = ['approve_reviews', 'unapprove_reviews', 'flag_reviews', 'unflag_reviews']
     
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True, is_flagged=False)
+        queryset.set_approved(True, is_flagged=False)
     approve_reviews.short_description = "Approve selected reviews"
     
+    def unapprove_reviews(self, request, queryset):
+        queryset.set_approved(False)
+    unapprove_reviews.short_description = "Unapprove selected reviews"
+    
     def flag_reviews(self, request, queryset):
         queryset.update(is_flagged=True)
     flag_reviews.short_description = "Flag selected reviews"
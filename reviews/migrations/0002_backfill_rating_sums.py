@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:06
+
+from django.db import migrations
+
+
+def backfill_rating_sums(apps, schema_editor):
+    from stores.utils import rebuild_rating_totals
+
+    rebuild_rating_totals(apps.get_model('stores', 'Store'), apps.get_model('reviews', 'StoreReview'), 'store')
+    rebuild_rating_totals(apps.get_model('products', 'Product'), apps.get_model('reviews', 'ProductReview'), 'product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        ('stores', '0003_store_rating_sum'),
+        ('products', '0003_product_rating_sum'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_sums, migrations.RunPython.noop),
+    ]
@@ -3,17 +3,129 @@ from django.db import models
 QuickBite Connect - Review Models
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import User
 from stores.models import Store
 from products.models import Product
 from orders.models import Order
+from stores.utils import apply_rating_change
+from analytics.rollups import record_rating_changes
+
+
+class RatingAggregateMixin:
+    """
+    Keeps the reviewed object's running rating totals in sync.
+    
+    Subclasses set rating_target to the name of the FK whose
+    rating_sum/total_reviews/average_rating columns they feed. Deltas are
+    always taken against the stored row, locked for the transaction, so
+    stale instances of the same review cannot apply one twice.
+    """
+    rating_target = None
+    
+    @staticmethod
+    def contribution(target_id, rating, is_approved):
+        """(target id, rating sum, count) a review with these values adds"""
+        if not is_approved:
+            return target_id, 0, 0
+        return target_id, rating, 1
+    
+    def rating_contribution(self):
+        """What this instance, as it is in memory, adds to its target"""
+        return self.contribution(getattr(self, f'{self.rating_target}_id'), self.rating, self.is_approved)
+    
+    def stored_contribution(self):
+        """
+        What the stored row adds to its target, locking the row.
+        
+        Must run inside a transaction. A row that no longer exists adds
+        nothing.
+        """
+        row = type(self)._default_manager.select_for_update().filter(pk=self.pk).values_list(
+            f'{self.rating_target}_id', 'rating', 'is_approved'
+        ).first()
+        if row is None:
+            return None, 0, 0
+        return self.contribution(*row)
+    
+    def apply_rating_contribution(self, old, new):
+        """Move the difference between two contributions onto the targets"""
+        model = self._meta.get_field(self.rating_target).related_model
+        old_target, old_sum, old_count = old
+        new_target, new_sum, new_count = new
+        if old_target == new_target:
+            apply_rating_change(model, new_target, new_sum - old_sum, new_count - old_count)
+        else:
+            if old_target is not None:
+                apply_rating_change(model, old_target, -old_sum, -old_count)
+            apply_rating_change(model, new_target, new_sum, new_count)
+        day = timezone.localdate(self.created_at)
+        record_rating_changes(model, [(old_target, day, -old_sum, -old_count), (new_target, day, new_sum, new_count)])
+    
+    def save(self, *args, **kwargs):
+        """Apply the rating delta between the stored row and this save"""
+        update_fields = kwargs.get('update_fields')
+        rating_fields = {'rating', 'is_approved', self.rating_target, f'{self.rating_target}_id'}
+        with transaction.atomic():
+            previous = (None, 0, 0) if self._state.adding else self.stored_contribution()
+            super().save(*args, **kwargs)
+            if update_fields is not None and not rating_fields & set(update_fields):
+                return
+            self.apply_rating_contribution(previous, self.rating_contribution())
+
+
+class ReviewQuerySet(models.QuerySet):
+    """Bulk moderation that keeps rating totals in sync"""
+    
+    def set_approved(self, approved, **extra):
+        """
+        Approve or unapprove the reviews in this queryset.
+        
+        The rows are locked first, so concurrent moderation of the same
+        reviews waits and then finds nothing left to change. Only rows
+        whose approval actually changes move the totals; their ratings are
+        summed per target and applied with one UPDATE each.
+        """
+        target = self.model.rating_target
+        related_model = self.model._meta.get_field(target).related_model
+        sign = 1 if approved else -1
+        rows = self.model._default_manager
+        
+        with transaction.atomic():
+            locked = list(self.order_by().select_for_update().values_list('pk', 'is_approved'))
+            changing = rows.filter(pk__in=[pk for pk, is_approved in locked if is_approved != approved])
+            deltas = list(
+                changing.order_by().values(target, day=TruncDate('created_at')).annotate(
+                    rating_sum=models.Sum('rating'), count=models.Count('id')
+                )
+            )
+            # By locked pk: a queryset filtered on is_approved would no
+            # longer match the changed rows once they are updated
+            if extra:
+                rows.filter(pk__in=[pk for pk, _ in locked]).update(is_approved=approved, **extra)
+            else:
+                changing.update(is_approved=approved)
+            totals = {}
+            for row in deltas:
+                rating_sum, count = totals.get(row[target], (0, 0))
+                totals[row[target]] = (rating_sum + row['rating_sum'], count + row['count'])
+            for target_id, (rating_sum, count) in totals.items():
+                apply_rating_change(related_model, target_id, sign * rating_sum, sign * count)
+            record_rating_changes(related_model, [
+                (row[target], row['day'], sign * row['rating_sum'], sign * row['count']) for row in deltas
+            ])
 
 
-class StoreReview(models.Model):
+class StoreReview(RatingAggregateMixin, models.Model):
     """Reviews for stores"""
     
+    rating_target = 'store'
+    
+    objects = ReviewQuerySet.as_manager()
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='store_reviews')
@@ -66,19 +178,15 @@ class StoreReview(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.store.name} - {self.rating} stars"
-    
-    def save(self, *args, **kwargs):
-        """Update store average rating on save"""
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        if is_new or 'rating' in kwargs.get('update_fields', []):
-            self.store.update_rating()
 
 
-class ProductReview(models.Model):
+class ProductReview(RatingAggregateMixin, models.Model):
     """Reviews for products"""
     
+    rating_target = 'product'
+    
+    objects = ReviewQuerySet.as_manager()
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='product_reviews')
@@ -130,14 +238,6 @@ class ProductReview(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.product.name} - {self.rating} stars"
-    
-    def save(self, *args, **kwargs):
-        """Update product average rating on save"""
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        if is_new or 'rating' in kwargs.get('update_fields', []):
-            self.product.update_rating()
 
 
 class ReviewHelpful(models.Model):
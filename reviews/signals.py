@@ -0,0 +1,22 @@
+"""
+QuickBite Connect - Review Signals
+"""
+from django.db.models.signals import pre_delete, post_delete
+from django.dispatch import receiver
+from .models import StoreReview, ProductReview
+
+
+@receiver(pre_delete, sender=StoreReview)
+@receiver(pre_delete, sender=ProductReview)
+def lock_review_rating(sender, instance, **kwargs):
+    """Lock the row and note what it adds, not what a stale instance says"""
+    instance._deleted_contribution = instance.stored_contribution()
+
+
+@receiver(post_delete, sender=StoreReview)
+@receiver(post_delete, sender=ProductReview)
+def remove_review_rating(sender, instance, **kwargs):
+    """Take a deleted review's rating out of its target's totals"""
+    target_id, rating_sum, count = instance._deleted_contribution
+    if count:
+        instance.apply_rating_contribution((target_id, rating_sum, count), (target_id, 0, 0))
@@ -1,3 +1,110 @@
+from decimal import Decimal
+
+from django.db.models import Avg, Count, Sum
 from django.test import TestCase
 
-# Create your tests here.
+from config.testing import make_owner, make_store
+from users.models import User
+from stores.models import Store
+from products.models import Product
+from .models import StoreReview, ProductReview
+
+
+class RatingTotalsTests(TestCase):
+    """Running rating totals always match a fresh aggregate of approved reviews"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.store = make_store(cls.owner)
+        cls.product = Product.objects.create(
+            store=cls.store, name='Burger', slug='burger', description='Test', price=Decimal('9.00')
+        )
+        cls.users = [User.objects.create_user(email=f'customer{i}@test.com', password='pass') for i in range(4)]
+
+    def review(self, user, rating, **kwargs):
+        return StoreReview.objects.create(
+            store=self.store, user=user, rating=rating, title='Review', comment='Text', **kwargs
+        )
+
+    def assertTotalsMatch(self, target=None, reviews=StoreReview):
+        target = target or self.store
+        target.refresh_from_db()
+        field = reviews.rating_target
+        fresh = reviews.objects.filter(**{field: target}, is_approved=True).aggregate(
+            rating_sum=Sum('rating'), count=Count('id'), average=Avg('rating')
+        )
+        self.assertEqual(target.rating_sum, fresh['rating_sum'] or 0)
+        self.assertEqual(target.total_reviews, fresh['count'])
+        self.assertEqual(target.average_rating, round(Decimal(fresh['average'] or 0), 2))
+
+    def test_create_edit_and_delete(self):
+        first = self.review(self.users[0], 5)
+        second = self.review(self.users[1], 2)
+        self.review(self.users[2], 4, is_approved=False)
+        self.assertTotalsMatch()
+
+        first.rating = 3
+        first.save()
+        self.assertTotalsMatch()
+
+        second.delete()
+        self.assertTotalsMatch()
+
+        product_review = ProductReview.objects.create(
+            product=self.product, user=self.users[0], rating=4, title='Review', comment='Text'
+        )
+        product_review.rating = 1
+        product_review.save()
+        self.assertTotalsMatch(self.product, ProductReview)
+
+    def test_stale_instances_apply_deltas_against_the_stored_row(self):
+        review = self.review(self.users[0], 5)
+        self.review(self.users[1], 3)
+        admin_copy = StoreReview.objects.get(pk=review.pk)
+        api_copy = StoreReview.objects.get(pk=review.pk)
+
+        admin_copy.is_approved = False
+        admin_copy.save()
+        api_copy.rating = 1
+        api_copy.save()  # writes its own is_approved=True back
+        self.assertTotalsMatch()
+
+        unapprove = StoreReview.objects.get(pk=review.pk)
+        stale = StoreReview.objects.get(pk=review.pk)
+        unapprove.is_approved = False
+        unapprove.save()
+        stale.delete()
+        self.assertTotalsMatch()
+        self.assertEqual(self.store.total_reviews, 1)
+
+    def test_approve_and_unapprove(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 1, is_approved=False)
+        self.review(self.users[2], 2, is_approved=False, is_flagged=True)
+
+        StoreReview.objects.filter(is_approved=False).set_approved(True, is_flagged=False)
+        self.assertTotalsMatch()
+        self.assertFalse(StoreReview.objects.filter(is_flagged=True).exists())
+
+        StoreReview.objects.filter(rating__lte=2).set_approved(False)
+        self.assertTotalsMatch()
+
+        # Already-approved rows are not counted twice
+        StoreReview.objects.all().set_approved(True)
+        StoreReview.objects.all().set_approved(True)
+        self.assertTotalsMatch()
+        self.assertEqual(self.store.total_reviews, 3)
+
+        StoreReview.objects.all().set_approved(False)
+        self.assertTotalsMatch()
+        self.assertEqual(self.store.average_rating, 0)
+
+    def test_update_rating_repairs_drifted_totals(self):
+        self.review(self.users[0], 4)
+        self.review(self.users[1], 2)
+        Store.objects.filter(pk=self.store.pk).update(rating_sum=99, total_reviews=7)
+
+        self.store.update_rating()
+        self.assertEqual((self.store.rating_sum, self.store.total_reviews), (6, 2))
+        self.assertTotalsMatch()
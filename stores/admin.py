@@ -24,7 +24,7 @@ class StoreAdmin(admin.ModelAdmin):
             'fields': ('address_line1', 'address_line2', 'city', 'state', 'postal_code', 'country', 'latitude', 'longitude')
         }),
         ('Business Settings', {
-            'fields': ('delivery_radius', 'min_order_amount', 'delivery_fee', 'estimated_delivery_time', 'business_hours')
+            'fields': ('delivery_radius', 'min_order_amount', 'delivery_fee', 'estimated_delivery_time', 'business_hours', 'timezone')
         }),
         ('Status & Verification', {
             'fields': ('status', 'is_open', 'is_featured', 'is_verified', 'business_license', 'tax_id')
@@ -0,0 +1,107 @@
+"""
+QuickBite Connect - Geo Utilities
+Geohash encoding, bounding boxes and haversine distance
+"""
+import math
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+GEOHASH_PRECISION = 8
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """Return (height, width) in degrees of a geohash cell"""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_miles):
+    """Return (min_lat, max_lat, min_lng, max_lng) around a point"""
+    latitude = float(latitude)
+    longitude = float(longitude)
+    lat_delta = radius_miles / MILES_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    lng_delta = radius_miles / (MILES_PER_DEGREE_LAT * cos_lat)
+    return (
+        max(latitude - lat_delta, -90.0),
+        min(latitude + lat_delta, 90.0),
+        max(longitude - lng_delta, -180.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def covering_geohashes(latitude, longitude, radius_miles, max_precision=GEOHASH_PRECISION):
+    """
+    Return the geohash prefixes covering a search circle.
+
+    Picks the finest precision whose cells are at least as large as the
+    bounding box, so the box spans at most 2x2 cells and its corners
+    identify every cell. Returns an empty list when no precision is coarse
+    enough, in which case callers should rely on the bounding box alone.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_miles)
+    box_height = max_lat - min_lat
+    box_width = max_lng - min_lng
+
+    for precision in range(max_precision, 0, -1):
+        cell_height, cell_width = geohash_cell_size(precision)
+        if cell_height >= box_height and cell_width >= box_width:
+            corners = (
+                (min_lat, min_lng), (min_lat, max_lng),
+                (max_lat, min_lng), (max_lat, max_lng),
+            )
+            return sorted({encode_geohash(lat, lng, precision) for lat, lng in corners})
+    return []
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in miles"""
+    lat1, lng1, lat2, lng2 = map(float, (lat1, lng1, lat2, lng2))
+    d_lat = math.radians(lat2 - lat1)
+    d_lng = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_lat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lng / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
@@ -0,0 +1,21 @@
+"""
+QuickBite Connect - Rebuild Ratings Command
+Recomputes store and product rating totals from approved reviews
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from stores.models import Store
+from stores.utils import rebuild_rating_totals
+from products.models import Product
+from reviews.models import StoreReview, ProductReview
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds rating_sum, total_reviews and average_rating from approved reviews'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stores = rebuild_rating_totals(Store, StoreReview, 'store')
+            products = rebuild_rating_totals(Product, ProductReview, 'product')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {stores} stores and {products} products'))
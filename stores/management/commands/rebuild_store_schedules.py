@@ -0,0 +1,21 @@
+"""
+QuickBite Connect - Rebuild Store Schedules Command
+Recompiles business_hours into the opening-interval table
+"""
+from django.core.management.base import BaseCommand
+from stores.models import StoreOpeningInterval
+
+
+class Command(BaseCommand):
+    help = 'Recompiles every store\'s business_hours into StoreOpeningInterval rows (after bulk imports)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Stores compiled per transaction')
+
+    def handle(self, *args, **options):
+        stores, invalid = StoreOpeningInterval.rebuild_all(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt schedules for {stores} stores'))
+        if invalid:
+            self.stdout.write(self.style.WARNING(
+                f'{invalid} stores have business hours that do not parse and are treated as always open'
+            ))
@@ -1,15 +1,20 @@
 """
 QuickBite Connect - Seed Data Command
-Creates sample data for testing
+Creates sample data for testing, or large load-testing datasets with --scale
 """
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
 from django.utils.text import slugify
 from users.models import User, CustomerProfile, Address
 from stores.models import Store, StoreCategory
 from products.models import Product, ProductCategory
+from stores.seeding import PRESETS, SeedPlan, generate, rebuild_derived
 from decimal import Decimal
 import random
 
+COUNT_OPTIONS = ('stores', 'products', 'customers', 'orders', 'reviews', 'notifications')
+
 
 class Command(BaseCommand):
     help = 'Seeds the database with sample data'
@@ -20,6 +25,23 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before seeding',
         )
+        parser.add_argument(
+            '--scale',
+            choices=sorted(PRESETS),
+            help='Generate a load-testing dataset of this size instead of the demo data',
+        )
+        for name in COUNT_OPTIONS:
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name} (overrides the --scale preset)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--days', type=int, default=180, help='Days of order history')
+        parser.add_argument('--until', help='Last day of history (YYYY-MM-DD, default today)')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (PostgreSQL only)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows generated per task')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help="Don't rebuild ratings, counters, analytics rollups and the search index afterwards",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING('🌱 Starting data seeding...'))
@@ -34,6 +56,9 @@ class Command(BaseCommand):
             StoreCategory.objects.all().delete()
             ProductCategory.objects.all().delete()
 
+        if options['scale'] or any(options[name] is not None for name in COUNT_OPTIONS):
+            return self.seed_at_scale(options)
+
         # Create Store Categories
         self.stdout.write('Creating store categories...')
         store_categories = []
@@ -228,4 +253,44 @@ class Command(BaseCommand):
         self.stdout.write(f'  - Users: {User.objects.count()}')
         self.stdout.write(f'  - Stores: {Store.objects.count()}')
         self.stdout.write(f'  - Products: {Product.objects.count()}')
-        self.stdout.write(self.style.SUCCESS('\n🎉 Ready to test!'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('\n🎉 Ready to test!'))
+
+    def seed_at_scale(self, options):
+        """Bulk-generate a deterministic dataset sized by --scale and the count options"""
+        counts = dict(PRESETS[options['scale'] or 'small'])
+        counts.update({name: options[name] for name in COUNT_OPTIONS if options[name] is not None})
+        if min(counts.values()) < 0 or not counts['stores'] or not counts['customers']:
+            raise CommandError('Counts must be positive, with at least one store and one customer')
+        if counts['products'] < counts['stores']:
+            raise CommandError('Need at least one product per store')
+        if not 0 <= options['seed'] < 10 ** 6:
+            raise CommandError('--seed must be between 0 and 999999')
+        until = None
+        if options['until']:
+            until = parse_date(options['until'])
+            if until is None:
+                raise CommandError('--until must be a date (YYYY-MM-DD)')
+
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite allows one writer at a time; using a single worker'))
+            workers = 1
+
+        plan = SeedPlan(seed=options['seed'], days=options['days'], until=until, **counts)
+        self.stdout.write(self.style.WARNING(
+            f"🌱 Generating {', '.join(f'{count:,} {name}' for name, count in counts.items())} "
+            f"(seed {plan.seed}, {workers} worker{'s' if workers > 1 else ''})..."
+        ))
+
+        def progress(phase, rows, seconds):
+            self.stdout.write(f'  ✅ {phase}: {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-6):,.0f}/s)')
+
+        generate(plan, workers, options['chunk_size'], options['batch_size'], progress)
+
+        if not options['skip_derived']:
+            self.stdout.write('Rebuilding ratings, counters, rollups and search index...')
+            rebuild_derived()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✨ Seeded dataset {plan.tag}. Log in as customer0@{plan.tag}.seed.quickbite.test / password123'
+        ))
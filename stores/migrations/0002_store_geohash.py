@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:00
+
+from django.db import migrations, models
+
+
+def populate_geohash(apps, schema_editor):
+    from stores.geo import encode_geohash
+
+    Store = apps.get_model('stores', 'Store')
+    stores = Store.objects.exclude(latitude=None).exclude(longitude=None).only('id', 'latitude', 'longitude')
+    batch = []
+    for store in stores.iterator(chunk_size=1000):
+        store.geohash = encode_geohash(store.latitude, store.longitude)
+        batch.append(store)
+        if len(batch) >= 1000:
+            Store.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Store.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='rating_sum',
+            field=models.IntegerField(default=0, help_text='Sum of approved review ratings'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:11
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def build_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS stores_search_vector_gin ON stores USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS stores_name_trgm ON stores USING gin (name gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            "UPDATE stores SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(city, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+        )
+    elif vendor == 'sqlite':
+        # FTS5 tables are created on connect by config.search
+        schema_editor.execute(
+            "INSERT INTO search_documents (model, object_id, a, b, c, d) "
+            "SELECT 'stores.store', id, name, city, description, '' FROM stores"
+        )
+        schema_editor.execute(
+            "INSERT INTO search_trigrams (model, object_id, a) SELECT 'stores.store', id, name FROM stores"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS stores_search_vector_gin')
+        schema_editor.execute('DROP INDEX IF EXISTS stores_name_trgm')
+    elif vendor == 'sqlite':
+        schema_editor.execute("DELETE FROM search_documents WHERE model = 'stores.store'")
+        schema_editor.execute("DELETE FROM search_trigrams WHERE model = 'stores.store'")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0003_store_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:50
+
+import django.db.models.deletion
+import stores.schedule
+from django.db import migrations, models
+
+
+def compile_schedules(apps, schema_editor):
+    Store = apps.get_model('stores', 'Store')
+    StoreOpeningInterval = apps.get_model('stores', 'StoreOpeningInterval')
+    rows = []
+    for store in Store.objects.only('id', 'business_hours', 'timezone').iterator(chunk_size=2000):
+        try:
+            intervals = stores.schedule.compile_hours(store.business_hours)
+        except stores.schedule.ScheduleError:
+            intervals = stores.schedule.compile_hours({})
+        rows.extend(
+            StoreOpeningInterval(store_id=store.pk, timezone=store.timezone, start_minute=start, end_minute=end)
+            for start, end in intervals
+        )
+    StoreOpeningInterval.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0004_store_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='timezone',
+            field=models.CharField(default=stores.schedule.default_timezone, help_text='IANA timezone the business hours are in', max_length=64, validators=[stores.schedule.validate_timezone]),
+        ),
+        migrations.AlterField(
+            model_name='store',
+            name='business_hours',
+            field=models.JSONField(blank=True, default=dict, help_text='Store business hours, e.g. {"monday": {"open": "09:00", "close": "22:00"}}', validators=[stores.schedule.validate_business_hours]),
+        ),
+        migrations.CreateModel(
+            name='StoreOpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timezone', models.CharField(max_length=64)),
+                ('start_minute', models.PositiveSmallIntegerField()),
+                ('end_minute', models.PositiveSmallIntegerField()),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='stores.store')),
+            ],
+            options={
+                'db_table': 'store_opening_intervals',
+                'ordering': ['store', 'start_minute'],
+                'indexes': [models.Index(fields=['timezone', 'start_minute', 'end_minute'], name='store_openi_timezon_085901_idx')],
+            },
+        ),
+        migrations.RunPython(compile_schedules, migrations.RunPython.noop),
+    ]
@@ -2,10 +2,76 @@
 QuickBite Connect - Store Models
 """
 import uuid
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import BooleanField, Exists, ExpressionWrapper, FloatField, OuterRef, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
 from users.models import User
-from stores.utils import update_store_rating
+from stores.utils import rebuild_rating_totals
+from stores.geo import EARTH_RADIUS_MILES, bounding_box, covering_geohashes, encode_geohash
+from stores.schedule import (
+    compile_hours, default_timezone, minute_of_week, ScheduleError, validate_business_hours, validate_timezone
+)
+
+
+class StoreQuerySet(models.QuerySet):
+    """Custom queryset for stores"""
+    
+    def nearby(self, latitude, longitude, max_radius):
+        """
+        Stores whose delivery radius covers the given point, nearest first.
+        
+        Candidates are narrowed with an indexed geohash prefix match and a
+        bounding box before the exact haversine distance is evaluated in SQL.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, max_radius)
+        
+        cells = Q()
+        for prefix in covering_geohashes(latitude, longitude, max_radius):
+            cells |= Q(geohash__startswith=prefix)
+        
+        lat = float(latitude)
+        lng = float(longitude)
+        store_lat = Cast('latitude', FloatField())
+        store_lng = Cast('longitude', FloatField())
+        a = (
+            Power(Sin(Radians(store_lat - lat) / 2), 2)
+            + Cos(Radians(store_lat)) * Cos(Radians(lat)) * Power(Sin(Radians(store_lng - lng) / 2), 2)
+        )
+        distance = 2 * EARTH_RADIUS_MILES * ASin(Least(Sqrt(a), 1.0))
+        
+        return self.filter(
+            cells,
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=min_lng,
+            longitude__lte=max_lng,
+        ).annotate(
+            distance=distance
+        ).filter(
+            distance__lte=Cast('delivery_radius', FloatField())
+        ).order_by('distance')
+    
+    def with_open_status(self, moment):
+        """
+        Annotate open_now: is_open is set and the compiled schedule covers moment.
+        
+        Each timezone in use contributes one range condition on
+        StoreOpeningInterval, so the check stays in SQL however many
+        stores are listed.
+        """
+        zones = StoreOpeningInterval.objects.values_list('timezone', flat=True).distinct().order_by()
+        covering = Q()
+        for zone in zones:
+            minute = minute_of_week(moment, zone)
+            covering |= Q(timezone=zone, start_minute__lte=minute, end_minute__gt=minute)
+        if not covering:
+            return self.annotate(open_now=Value(False, output_field=BooleanField()))
+        scheduled = StoreOpeningInterval.objects.filter(covering, store=OuterRef('pk'))
+        return self.annotate(
+            open_now=ExpressionWrapper(Q(Exists(scheduled), is_open=True), output_field=BooleanField())
+        )
 
 
 class Store(models.Model):
@@ -49,6 +115,7 @@ class Store(models.Model):
     country = models.CharField(max_length=100, default='USA')
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     
     # Business Settings
     delivery_radius = models.DecimalField(
@@ -65,7 +132,18 @@ class Store(models.Model):
     )
     
     # Business Hours (stored as JSON)
-    business_hours = models.JSONField(default=dict, blank=True, help_text="Store business hours")
+    business_hours = models.JSONField(
+        default=dict,
+        blank=True,
+        validators=[validate_business_hours],
+        help_text="Store business hours, e.g. {\"monday\": {\"open\": \"09:00\", \"close\": \"22:00\"}}"
+    )
+    timezone = models.CharField(
+        max_length=64,
+        default=default_timezone,
+        validators=[validate_timezone],
+        help_text="IANA timezone the business hours are in"
+    )
     
     # Status and Rating
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -78,6 +156,7 @@ class Store(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
     total_reviews = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0, help_text="Sum of approved review ratings")
     total_orders = models.IntegerField(default=0)
     
     # Certifications and Documents
@@ -85,10 +164,16 @@ class Store(models.Model):
     tax_id = models.CharField(max_length=50, blank=True)
     is_verified = models.BooleanField(default=False)
     
+    # Full-text search (see config.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_document = (('name', 'A'), ('city', 'B'), ('description', 'C'))
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StoreQuerySet.as_manager()
+    
     class Meta:
         db_table = 'stores'
         verbose_name = 'Store'
@@ -102,6 +187,17 @@ class Store(models.Model):
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        """Keep geohash in sync with coordinates"""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+    
     @property
     def full_address(self):
         """Return full address as string"""
@@ -110,13 +206,77 @@ class Store(models.Model):
             parts.append(self.address_line2)
         parts.extend([self.city, self.state, self.postal_code])
         return ', '.join(parts)
+    
     def update_rating(self):
-      update_store_rating(self)
-      
-    def update_rating(self):
-        """Update store's average rating"""
-        from stores.utils import update_store_rating
-        update_store_rating(self)
+        """Recompute the rating totals from this store's approved reviews"""
+        from reviews.models import StoreReview
+        rebuild_rating_totals(Store, StoreReview, 'store', pks=[self.pk])
+        self.refresh_from_db(fields=['rating_sum', 'total_reviews', 'average_rating'])
+
+class StoreOpeningInterval(models.Model):
+    """
+    One open period of a store's compiled business_hours, in minutes
+    since Monday 00:00 of the store's timezone (see stores.schedule).
+    """
+    
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='opening_intervals')
+    timezone = models.CharField(max_length=64)
+    start_minute = models.PositiveSmallIntegerField()
+    end_minute = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        db_table = 'store_opening_intervals'
+        ordering = ['store', 'start_minute']
+        indexes = [
+            models.Index(fields=['timezone', 'start_minute', 'end_minute']),
+        ]
+    
+    def __str__(self):
+        return f"{self.store_id} {self.start_minute}-{self.end_minute}"
+    
+    @classmethod
+    def rebuild(cls, stores):
+        """
+        Replace the intervals of the given stores from their business_hours.
+        
+        Hours that do not parse (saved before validation existed) count as
+        no schedule. Returns the number of such stores.
+        """
+        stores = list(stores)
+        rows = []
+        invalid = 0
+        for store in stores:
+            try:
+                intervals = compile_hours(store.business_hours)
+            except ScheduleError:
+                intervals = compile_hours({})
+                invalid += 1
+            rows.extend(
+                cls(store_id=store.pk, timezone=store.timezone, start_minute=start, end_minute=end)
+                for start, end in intervals
+            )
+        with transaction.atomic():
+            cls.objects.filter(store__in=[store.pk for store in stores]).delete()
+            cls.objects.bulk_create(rows)
+        return invalid
+    
+    @classmethod
+    def rebuild_all(cls, stores=None, chunk_size=2000):
+        """Rebuild intervals for stores (default all) in chunks; returns (stores, invalid)"""
+        stores = Store.objects.all() if stores is None else stores
+        total = invalid = 0
+        chunk = []
+        for store in stores.only('id', 'business_hours', 'timezone').order_by('pk').iterator(chunk_size=chunk_size):
+            chunk.append(store)
+            if len(chunk) == chunk_size:
+                invalid += cls.rebuild(chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            invalid += cls.rebuild(chunk)
+            total += len(chunk)
+        return total, invalid
+
 
 class StoreStaff(models.Model):
     """Store staff management"""
@@ -0,0 +1,171 @@
+"""
+QuickBite Connect - Store Schedules
+Parsing business_hours into weekly opening intervals
+
+business_hours maps day names to the hours of that day, in the store's
+own timezone:
+
+    {'monday': {'open': '09:00', 'close': '22:00'},
+     'friday': [{'open': '11:00', 'close': '14:00'}, {'open': '17:00', 'close': '02:00'}],
+     'sunday': {'closed': True}}
+
+A close time at or before the open time runs past midnight into the next
+day ('00:00' to '00:00' is open all day). Days that are missing or
+closed have no hours. An empty business_hours means the store keeps no
+schedule and is open whenever is_open is set.
+
+compile_hours() turns this into sorted, merged [start, end) intervals of
+minutes since Monday 00:00 (0 to MINUTES_PER_WEEK), splitting any shift
+that runs past Sunday midnight. StoreOpeningInterval stores them so
+open/closed checks are a range lookup in SQL.
+"""
+import re
+from datetime import timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError as ParamError
+
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+ALWAYS_OPEN = [(0, MINUTES_PER_WEEK)]
+
+_TIME = re.compile(r'^(\d{1,2}):(\d{2})$')
+
+
+class ScheduleError(ValueError):
+    """business_hours cannot be understood"""
+
+
+def default_timezone():
+    return settings.STORE_DEFAULT_TIMEZONE
+
+
+def parse_time(value, day, allow_midnight_end=False):
+    """Minutes since midnight for 'HH:MM'; '24:00' only as a closing time"""
+    match = _TIME.match(value.strip()) if isinstance(value, str) else None
+    if match is None:
+        raise ScheduleError(f'{day}: {value!r} is not a time in HH:MM format')
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if minutes >= 60 or hours > 24 or (hours == 24 and (minutes or not allow_midnight_end)):
+        raise ScheduleError(f'{day}: {value!r} is not a valid time')
+    return hours * 60 + minutes
+
+
+def day_shifts(day, value):
+    """The (open, close) minute pairs listed for one day"""
+    if value in (None, {}, []):
+        return []
+    shifts = value if isinstance(value, list) else [value]
+    pairs = []
+    for shift in shifts:
+        if not isinstance(shift, dict):
+            raise ScheduleError(f'{day}: expected {{"open": "HH:MM", "close": "HH:MM"}}')
+        if shift.get('closed'):
+            if len(shifts) > 1:
+                raise ScheduleError(f'{day}: a closed day cannot also have hours')
+            continue
+        if 'open' not in shift or 'close' not in shift:
+            raise ScheduleError(f'{day}: both "open" and "close" are required')
+        unknown = set(shift) - {'open', 'close', 'closed'}
+        if unknown:
+            raise ScheduleError(f'{day}: unknown keys {", ".join(sorted(unknown))}')
+        pairs.append((parse_time(shift['open'], day), parse_time(shift['close'], day, allow_midnight_end=True)))
+    return pairs
+
+
+def merge(intervals):
+    """Sort intervals and join the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def compile_hours(hours):
+    """
+    Weekly [start, end) minute intervals for a business_hours value.
+
+    Raises ScheduleError for anything that is not a valid schedule.
+    """
+    if not hours:
+        return list(ALWAYS_OPEN)
+    if not isinstance(hours, dict):
+        raise ScheduleError('Business hours must map day names to opening hours')
+
+    intervals = []
+    for key, value in hours.items():
+        day = key.strip().lower() if isinstance(key, str) else key
+        if day not in DAYS:
+            raise ScheduleError(f'{key!r} is not a day of the week')
+        day_start = DAYS.index(day) * MINUTES_PER_DAY
+        for opens, closes in day_shifts(day, value):
+            if closes <= opens:
+                # Runs past midnight; equal times mean open around the clock
+                closes += MINUTES_PER_DAY
+            start, end = day_start + opens, day_start + closes
+            if end > MINUTES_PER_WEEK:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+    return merge(intervals)
+
+
+def validate_business_hours(value):
+    try:
+        compile_hours(value)
+    except ScheduleError as e:
+        raise ValidationError(str(e))
+
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f'{value!r} is not a known timezone')
+
+
+def minute_of_week(moment, zone):
+    """Minutes since Monday 00:00 in zone for an aware datetime"""
+    local = moment.astimezone(ZoneInfo(zone))
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def parse_moment(value):
+    """Aware datetime from an ISO 8601 string; naive values are taken as UTC"""
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ParamError({'error': 'open_at must be an ISO 8601 date and time'})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+class OpenStatusFilter(filters.BaseFilterBackend):
+    """
+    Annotates open_now on store listings and filters on it.
+
+    ?open_now=true keeps stores open right now; ?open_at=<ISO datetime>
+    keeps stores open at that moment (and reports open_now for it).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        moment = parse_moment(params['open_at']) if params.get('open_at') else timezone.now()
+        queryset = queryset.with_open_status(moment)
+        if params.get('open_at') or params.get('open_now', '').lower() in ('1', 'true', 'yes'):
+            queryset = queryset.filter(open_now=True)
+        return queryset
+
@@ -0,0 +1,505 @@
+"""
+QuickBite Connect - Load-Test Data Generator
+Deterministic, production-shaped datasets for performance work
+
+Every row is a pure function of (seed, kind, index): ids are derived from
+a hash, and each order, review and notification draws from its own
+random.Random. Any index range can therefore be generated by any worker
+process, in any order, and the same seed always produces the same data.
+Inserts use bulk_create(ignore_conflicts=True), so an interrupted run
+can be repeated with the same arguments to fill in the missing rows.
+
+Shapes follow what production looks like: order volume per store and
+per customer is Zipf-distributed, catalogue sizes are log-normal, order
+times peak at lunch and dinner, and ratings are skewed towards 5 stars.
+"""
+import bisect
+import hashlib
+import itertools
+import math
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+PRESETS = {
+    'small': {
+        'stores': 100, 'products': 5_000, 'customers': 2_000,
+        'orders': 20_000, 'reviews': 5_000, 'notifications': 20_000,
+    },
+    'medium': {
+        'stores': 1_000, 'products': 100_000, 'customers': 50_000,
+        'orders': 1_000_000, 'reviews': 500_000, 'notifications': 1_000_000,
+    },
+    'large': {
+        'stores': 10_000, 'products': 1_000_000, 'customers': 500_000,
+        'orders': 10_000_000, 'reviews': 10_000_000, 'notifications': 10_000_000,
+    },
+}
+
+# (city, state, postal code, latitude, longitude, share of stores/customers)
+CITIES = (
+    ('New York', 'NY', '10001', 40.7128, -74.0060, 30),
+    ('Los Angeles', 'CA', '90012', 34.0522, -118.2437, 20),
+    ('Chicago', 'IL', '60601', 41.8781, -87.6298, 14),
+    ('Houston', 'TX', '77002', 29.7604, -95.3698, 10),
+    ('Phoenix', 'AZ', '85004', 33.4484, -112.0740, 8),
+    ('Philadelphia', 'PA', '19107', 39.9526, -75.1652, 8),
+    ('San Diego', 'CA', '92101', 32.7157, -117.1611, 5),
+    ('Austin', 'TX', '78701', 30.2672, -97.7431, 5),
+)
+CITY_WEIGHTS = list(itertools.accumulate(city[-1] for city in CITIES))
+
+STORE_TYPES = (('restaurant', 55), ('local', 15), ('grocery', 12), ('chain', 10), ('supermarket', 8))
+STORE_ADJECTIVES = ('Golden', 'Fresh', 'Urban', 'Sunny', 'Corner', 'Happy', 'Little', 'Royal', 'Green', 'Rapid')
+STORE_NOUNS = ('Kitchen', 'Bistro', 'Market', 'Grill', 'Pantry', 'Deli', 'Bakery', 'Noodle Bar', 'Pizzeria', 'Cafe')
+PRODUCT_WORDS = (
+    'Burger', 'Pizza', 'Salad', 'Burrito', 'Ramen', 'Sushi Roll', 'Sandwich', 'Curry', 'Smoothie',
+    'Bagel', 'Milk', 'Bread', 'Apples', 'Coffee', 'Yogurt', 'Pasta', 'Tacos', 'Soup', 'Cookies', 'Juice',
+)
+PRODUCT_STYLES = ('Classic', 'Spicy', 'Vegan', 'Deluxe', 'Family Size', 'Organic', 'House', 'Mini', 'Double')
+
+# Relative order volume for each hour of the day (lunch and dinner peaks)
+HOUR_WEIGHTS = list(itertools.accumulate(
+    (1, 1, 1, 1, 1, 1, 2, 4, 5, 4, 5, 12, 16, 10, 5, 4, 6, 11, 16, 14, 9, 6, 3, 2)
+))
+ITEM_COUNTS = list(itertools.accumulate((35, 30, 20, 10, 5)))
+PAYMENT_METHODS = (('card', 70), ('cash', 20), ('wallet', 10))
+IN_PROGRESS = ('pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery')
+
+# Rating weights (1..5 stars) for poor, average and great stores
+RATING_WEIGHTS = (
+    list(itertools.accumulate((25, 20, 20, 20, 15))),
+    list(itertools.accumulate((8, 6, 12, 30, 44))),
+    list(itertools.accumulate((3, 2, 5, 20, 70))),
+)
+
+NOTIFICATION_TYPES = (
+    ('order_confirmed', 20, 'Order confirmed', 'Your order has been confirmed by the store.'),
+    ('order_delivered', 20, 'Order delivered', 'Your order has been delivered. Enjoy!'),
+    ('order_preparing', 10, 'Order preparing', 'The store has started preparing your order.'),
+    ('payment_received', 15, 'Payment received', 'We have received your payment.'),
+    ('promotion', 25, 'Weekend deal', '20% off your next order this weekend.'),
+    ('new_product', 7, 'New on the menu', 'A store you follow added something new.'),
+    ('system', 3, 'Account update', 'We have updated our terms of service.'),
+)
+
+SEED_PASSWORD = 'password123'
+
+
+def cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def pick(rng, cum_weights):
+    """Index drawn according to cumulative weights"""
+    return bisect.bisect_right(cum_weights, rng.random() * cum_weights[-1])
+
+
+def weighted(rng, choices):
+    return choices[pick(rng, cumulative(weight for _, weight in choices))][0]
+
+
+def zipf_weights(n, exponent):
+    return cumulative(1 / (rank ** exponent) for rank in range(1, n + 1))
+
+
+class SeedPlan:
+    """
+    Row counts, seed and time window of a generated dataset, plus the
+    derived tables every worker needs (store sizes, popularity).
+    """
+
+    def __init__(self, seed=42, days=180, until=None, **counts):
+        self.seed = seed
+        self.days = days
+        self.until = until or timezone.localdate()
+        self.end = timezone.make_aware(datetime.combine(self.until, time.min))
+        self.start = self.end - timedelta(days=days)
+        self.counts = counts
+        self.tag = f's{seed}'
+
+        rng = random.Random(f'{seed}:plan')
+        # Log-normal catalogue sizes, at least one product per store
+        sizes = [rng.lognormvariate(0, 0.9) for _ in range(counts['stores'])]
+        spare = max(counts['products'] - counts['stores'], 0)
+        total = sum(sizes)
+        per_store = [1 + int(spare * size / total) for size in sizes]
+        per_store[0] += counts['products'] - sum(per_store)
+        self.product_offsets = [0] + cumulative(per_store)
+
+        self.store_popularity = zipf_weights(counts['stores'], 1.07)
+        self.customer_activity = zipf_weights(counts['customers'], 0.8)
+        self.password = make_password(SEED_PASSWORD)
+
+    def params(self):
+        return {'seed': self.seed, 'days': self.days, 'until': self.until, **self.counts}
+
+    # Identity -------------------------------------------------------------
+
+    def digest(self, kind, index):
+        return hashlib.blake2b(f'{self.seed}:{kind}:{index}'.encode(), digest_size=16).digest()
+
+    def uuid(self, kind, index):
+        return uuid.UUID(bytes=self.digest(kind, index), version=4)
+
+    def rng(self, kind, index):
+        return random.Random(f'{self.seed}:{kind}:{index}')
+
+    # Stores and products ---------------------------------------------------
+
+    def store_city(self, store):
+        return CITIES[pick(self.rng('store-city', store), CITY_WEIGHTS)]
+
+    def store_fee(self, store):
+        return Decimal(('0.99', '1.99', '2.99', '3.99', '4.99')[self.digest('store', store)[0] % 5])
+
+    def store_quality(self, store):
+        return self.digest('store', store)[1] % 3
+
+    def store_products(self, store):
+        return range(self.product_offsets[store], self.product_offsets[store + 1])
+
+    def product_price(self, product):
+        cents = 199 + int.from_bytes(self.digest('product', product)[:4], 'big') % 2800
+        return Decimal(cents).scaleb(-2)
+
+    def product_name(self, product):
+        digest = self.digest('product', product)
+        return f'{PRODUCT_STYLES[digest[4] % len(PRODUCT_STYLES)]} {PRODUCT_WORDS[digest[5] % len(PRODUCT_WORDS)]}'
+
+    # Orders ------------------------------------------------------------------
+
+    def timestamp(self, rng):
+        """A time in the window, denser towards the end and at meal times"""
+        day = int(self.days * (1 - rng.random() ** 1.5))
+        moment = self.start + timedelta(days=min(day, self.days - 1), hours=pick(rng, HOUR_WEIGHTS))
+        return moment + timedelta(seconds=rng.randrange(3600))
+
+    def order(self, index):
+        """Everything about order index, recomputable from the index alone"""
+        rng = self.rng('order', index)
+        store = pick(rng, self.store_popularity)
+        customer = pick(rng, self.customer_activity)
+        created_at = self.timestamp(rng)
+        if self.end - created_at < timedelta(hours=2):
+            status = rng.choice(IN_PROGRESS)
+        else:
+            status = 'cancelled' if rng.random() < 0.07 else 'delivered'
+        products = self.store_products(store)
+        lines = {}
+        for _ in range(pick(rng, ITEM_COUNTS) + 1):
+            # Popular items first: the head of each catalogue sells most
+            product = products[int(len(products) * rng.random() ** 2)]
+            lines[product] = lines.get(product, 0) + rng.choice((1, 1, 1, 2, 2, 3))
+        return {
+            'rng': rng, 'store': store, 'customer': customer, 'created_at': created_at,
+            'status': status, 'payment_method': weighted(rng, PAYMENT_METHODS), 'lines': lines,
+        }
+
+
+@contextmanager
+def explicit_timestamps(rows):
+    """
+    Let bulk_create keep generated created_at/updated_at values; rows
+    without one get the current time as usual.
+    """
+    now = timezone.now()
+    saved = []
+    for model, objects in rows.items():
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+                for obj in objects:
+                    if getattr(obj, field.attname) is None:
+                        setattr(obj, field.attname, now)
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# Row builders: each returns {model: [instances]} for an index range ---------
+
+def build_users(plan, indexes):
+    from users.models import Address, CustomerProfile, User
+
+    users, profiles, addresses = [], [], []
+    for index in indexes:
+        if index < plan.counts['stores']:
+            kind, number, user_type = 'owner', index, 'store_owner'
+        else:
+            kind, number, user_type = 'customer', index - plan.counts['stores'], 'customer'
+        rng = plan.rng(kind, number)
+        joined = plan.start - timedelta(days=rng.randrange(365))
+        user_id = plan.uuid(kind, number)
+        users.append(User(
+            id=user_id, email=f'{kind}{number}@{plan.tag}.seed.quickbite.test',
+            password=plan.password, first_name=kind.title(), last_name=str(number), user_type=user_type,
+            is_email_verified=True, date_joined=joined, updated_at=joined,
+        ))
+        if kind == 'customer':
+            profiles.append(CustomerProfile(
+                id=plan.uuid('profile', number), user_id=user_id, loyalty_points=int(rng.expovariate(1 / 150)),
+                created_at=joined, updated_at=joined,
+            ))
+            city, state, postal_code, latitude, longitude, _ = CITIES[pick(rng, CITY_WEIGHTS)]
+            addresses.append(Address(
+                id=plan.uuid('address', number), user_id=user_id, address_type='home',
+                address_line1=f'{rng.randrange(1, 9999)} Main Street', city=city, state=state,
+                postal_code=postal_code, latitude=round(Decimal(latitude + rng.gauss(0, 0.05)), 6),
+                longitude=round(Decimal(longitude + rng.gauss(0, 0.05)), 6), is_default=True,
+                created_at=joined, updated_at=joined,
+            ))
+    return {User: users, CustomerProfile: profiles, Address: addresses}
+
+
+def business_hours(rng):
+    opens = rng.choice(('07:00', '08:00', '10:00', '11:00'))
+    closes = rng.choice(('20:00', '21:00', '22:00', '23:00', '01:00'))
+    closed_day = rng.choice(('monday', 'tuesday', None, None, None))
+    return {
+        day: {'open': opens, 'close': closes}
+        for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+        if day != closed_day
+    }
+
+
+def build_stores(plan, indexes):
+    from stores.geo import encode_geohash
+    from stores.models import Store
+
+    stores = []
+    for index in indexes:
+        rng = plan.rng('store', index)
+        city, state, postal_code, latitude, longitude, _ = plan.store_city(index)
+        latitude = round(Decimal(latitude + rng.gauss(0, 0.04)), 6)
+        longitude = round(Decimal(longitude + rng.gauss(0, 0.04)), 6)
+        name = f'{rng.choice(STORE_ADJECTIVES)} {rng.choice(STORE_NOUNS)} {index}'
+        created = plan.start - timedelta(days=rng.randrange(30, 720))
+        stores.append(Store(
+            id=plan.uuid('store', index), owner_id=plan.uuid('owner', index), name=name,
+            slug=f'{slugify(name)}-{plan.tag}', description=f'{name} in {city}',
+            store_type=weighted(rng, STORE_TYPES), phone_number=f'+1555{index:07d}',
+            email=f'store{index}@{plan.tag}.seed.quickbite.test', address_line1=f'{rng.randrange(1, 999)} Market St',
+            city=city, state=state, postal_code=postal_code, latitude=latitude, longitude=longitude,
+            geohash=encode_geohash(latitude, longitude), delivery_radius=Decimal(rng.choice((3, 5, 5, 8, 10))),
+            min_order_amount=Decimal(rng.choice((0, 10, 10, 15))), delivery_fee=plan.store_fee(index),
+            estimated_delivery_time=rng.choice((20, 30, 30, 45)), business_hours=business_hours(rng),
+            status='approved' if rng.random() < 0.95 else 'pending', is_open=rng.random() < 0.9,
+            is_featured=rng.random() < 0.02, is_verified=True, created_at=created, updated_at=created,
+        ))
+    return {Store: stores}
+
+
+def build_products(plan, indexes):
+    from products.models import Product
+
+    products = []
+    store = bisect.bisect_right(plan.product_offsets, indexes[0]) - 1
+    for index in indexes:
+        while index >= plan.product_offsets[store + 1]:
+            store += 1
+        rng = plan.rng('product', index)
+        name = plan.product_name(index)
+        created = plan.start - timedelta(days=rng.randrange(0, 365))
+        products.append(Product(
+            id=plan.uuid('product', index), store_id=plan.uuid('store', store), name=name,
+            slug=f'{slugify(name)}-{index}', description=f'{name} made fresh to order',
+            short_description=name, price=plan.product_price(index), stock_quantity=rng.randrange(0, 500),
+            is_available=rng.random() < 0.93, is_vegetarian=rng.random() < 0.3, is_vegan=rng.random() < 0.1,
+            created_at=created, updated_at=created,
+        ))
+    return {Product: products}
+
+
+def build_orders(plan, indexes):
+    from orders.models import Order, OrderItem
+
+    orders, items = [], []
+    for index in indexes:
+        spec = plan.order(index)
+        rng, created_at = spec['rng'], spec['created_at']
+        order_id = plan.uuid('order', index)
+        subtotal = Decimal('0.00')
+        for position, (product, quantity) in enumerate(spec['lines'].items()):
+            price = plan.product_price(product)
+            subtotal += price * quantity
+            items.append(OrderItem(
+                id=plan.uuid(f'item{position}', index), order_id=order_id, product_id=plan.uuid('product', product),
+                product_name=plan.product_name(product), product_price=price, quantity=quantity,
+                subtotal=price * quantity,
+            ))
+        delivery_fee = plan.store_fee(spec['store'])
+        tax = (subtotal * Decimal('0.08')).quantize(Decimal('0.01'))
+        status = spec['status']
+        delivered = status == 'delivered'
+        completed_at = created_at + timedelta(minutes=rng.randrange(20, 70)) if delivered else None
+        paid = spec['payment_method'] != 'cash' and status != 'cancelled'
+        orders.append(Order(
+            id=order_id, order_number=f'ORD-{plan.tag}-{index}', customer_id=plan.uuid('customer', spec['customer']),
+            store_id=plan.uuid('store', spec['store']), delivery_address_id=plan.uuid('address', spec['customer']),
+            status=status, payment_method=spec['payment_method'], payment_status='completed' if paid else 'pending',
+            subtotal=subtotal, delivery_fee=delivery_fee, tax_amount=tax, total_amount=subtotal + delivery_fee + tax,
+            created_at=created_at, updated_at=completed_at or created_at,
+            confirmed_at=created_at + timedelta(minutes=2) if status not in ('pending', 'cancelled') else None,
+            completed_at=completed_at, actual_delivery_time=completed_at,
+        ))
+    return {Order: orders, OrderItem: items}
+
+
+def review_order(plan, index):
+    """Reviews map onto distinct orders by stepping through them with a coprime stride"""
+    orders = plan.counts['orders']
+    stride = next(step for step in itertools.count(7919) if math.gcd(step, orders) == 1)
+    return (index * stride) % orders
+
+
+def build_reviews(plan, indexes):
+    from reviews.models import ProductReview, StoreReview
+
+    store_reviews, product_reviews = [], []
+    for index in indexes:
+        order_index = review_order(plan, index)
+        spec = plan.order(order_index)
+        if spec['status'] != 'delivered':
+            continue
+        rng = plan.rng('review', index)
+        rating = pick(rng, RATING_WEIGHTS[plan.store_quality(spec['store'])]) + 1
+        created_at = min(spec['created_at'] + timedelta(hours=rng.randrange(1, 72)), plan.end)
+        common = {
+            'user_id': plan.uuid('customer', spec['customer']), 'order_id': plan.uuid('order', order_index),
+            'rating': rating, 'title': ('Awful', 'Poor', 'Okay', 'Good', 'Excellent')[rating - 1],
+            'comment': f'{rating} stars', 'is_verified_purchase': True, 'is_approved': rng.random() < 0.97,
+            'created_at': created_at, 'updated_at': created_at,
+        }
+        if rng.random() < 0.4:
+            store_reviews.append(StoreReview(
+                id=plan.uuid('store-review', index), store_id=plan.uuid('store', spec['store']), **common
+            ))
+        else:
+            product = next(iter(spec['lines']))
+            product_reviews.append(ProductReview(
+                id=plan.uuid('product-review', index), product_id=plan.uuid('product', product), **common
+            ))
+    return {StoreReview: store_reviews, ProductReview: product_reviews}
+
+
+def build_notifications(plan, indexes):
+    from notifications.models import Notification
+
+    types = cumulative(weight for _, weight, _, _ in NOTIFICATION_TYPES)
+    notifications = []
+    for index in indexes:
+        rng = plan.rng('notification', index)
+        notification_type, _, title, message = NOTIFICATION_TYPES[pick(rng, types)]
+        created_at = plan.timestamp(rng)
+        is_read = rng.random() < (0.8 if plan.end - created_at > timedelta(days=7) else 0.3)
+        notifications.append(Notification(
+            id=plan.uuid('notification', index), user_id=plan.uuid('customer', pick(rng, plan.customer_activity)),
+            notification_type=notification_type, title=title, message=message, is_read=is_read,
+            read_at=created_at + timedelta(hours=rng.randrange(1, 48)) if is_read else None, created_at=created_at,
+        ))
+    return {Notification: notifications}
+
+
+# Phases run in order; rows within a phase are generated in parallel chunks
+PHASES = (
+    ('users', build_users, lambda counts: counts['stores'] + counts['customers']),
+    ('stores', build_stores, lambda counts: counts['stores']),
+    ('products', build_products, lambda counts: counts['products']),
+    ('orders', build_orders, lambda counts: counts['orders']),
+    ('reviews', build_reviews, lambda counts: min(counts['reviews'], counts['orders'])),
+    ('notifications', build_notifications, lambda counts: counts['notifications']),
+)
+BUILDERS = {name: builder for name, builder, _ in PHASES}
+
+_plan = None
+
+
+def init_worker(params):
+    """Pool initializer: set up Django and this process's plan"""
+    global _plan
+    import django
+    django.setup()
+    _plan = SeedPlan(**params)
+
+
+def insert_chunk(phase, start, stop, batch_size, plan=None):
+    """Build and insert rows [start, stop) of a phase; returns rows inserted"""
+    plan = plan or _plan
+    rows = BUILDERS[phase](plan, range(start, stop))
+    with explicit_timestamps(rows), transaction.atomic():
+        for model, objects in rows.items():
+            model.objects.bulk_create(objects, batch_size=batch_size, ignore_conflicts=True)
+    return sum(len(objects) for objects in rows.values())
+
+
+def _insert_chunk(args):
+    return insert_chunk(*args)
+
+
+def chunks(total, size):
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def generate(plan, workers=1, chunk_size=5000, batch_size=1000, progress=None):
+    """
+    Insert the dataset described by plan, phase by phase.
+
+    With workers > 1 chunks are spread over a spawned process pool (each
+    with its own database connection). progress(phase, rows, seconds) is
+    called after each phase. Returns {phase: rows inserted}.
+    """
+    import multiprocessing
+    import time as clock
+    from django.db import connections
+
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        pool = multiprocessing.get_context('spawn').Pool(workers, init_worker, (plan.params(),))
+    totals = {}
+    try:
+        for phase, _, count in PHASES:
+            started = clock.monotonic()
+            tasks = [(phase, start, stop, batch_size) for start, stop in chunks(count(plan.counts), chunk_size)]
+            if pool:
+                inserted = sum(pool.imap_unordered(_insert_chunk, tasks))
+            else:
+                inserted = sum(insert_chunk(*task, plan=plan) for task in tasks)
+            totals[phase] = inserted
+            if progress:
+                progress(phase, inserted, clock.monotonic() - started)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return totals
+
+
+def rebuild_derived():
+    """Recompute what bulk inserts bypass: ratings, counters, rollups, search, schedules"""
+    from analytics.backfill import backfill
+    from config.search import rebuild_index
+    from products.models import Product
+    from reviews.models import ProductReview, StoreReview
+    from stores.models import Store, StoreOpeningInterval
+    from stores.utils import rebuild_rating_totals
+
+    with transaction.atomic():
+        rebuild_rating_totals(Store, StoreReview, 'store')
+        rebuild_rating_totals(Product, ProductReview, 'product')
+    backfill()
+    with transaction.atomic():
+        rebuild_index(Store)
+        rebuild_index(Product)
+    StoreOpeningInterval.rebuild_all()
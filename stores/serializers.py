@@ -27,7 +27,7 @@ class StoreSerializer(serializers.ModelSerializer):
             'website', 'address_line1', 'address_line2', 'city', 'state',
             'postal_code', 'country', 'latitude', 'longitude',
             'delivery_radius', 'min_order_amount', 'delivery_fee',
-            'estimated_delivery_time', 'business_hours', 'status',
+            'estimated_delivery_time', 'business_hours', 'timezone', 'status',
             'is_open', 'is_featured', 'average_rating', 'total_reviews',
             'total_orders', 'is_verified', 'categories', 'created_at', 'full_address'
         )
@@ -48,7 +48,7 @@ class StoreCreateSerializer(serializers.ModelSerializer):
             'address_line2', 'city', 'state', 'postal_code', 'country',
             'latitude', 'longitude', 'delivery_radius', 'min_order_amount',
             'delivery_fee', 'estimated_delivery_time', 'business_hours',
-            'business_license', 'tax_id'
+            'timezone', 'business_license', 'tax_id'
         )
     
     def create(self, validated_data):
@@ -73,11 +73,26 @@ class StoreStaffSerializer(serializers.ModelSerializer):
 
 class StoreListSerializer(serializers.ModelSerializer):
     """Minimal serializer for store listings"""
+    open_now = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Store
         fields = (
             'id', 'name', 'slug', 'logo', 'store_type', 'city',
-            'is_open', 'average_rating', 'total_reviews',
+            'is_open', 'open_now', 'average_rating', 'total_reviews',
             'delivery_fee', 'estimated_delivery_time', 'min_order_amount'
-        )
\ No newline at end of file
+        )
+
+class StoreNearbySerializer(StoreListSerializer):
+    """Store listing with distance and a delivery quote for the requested point"""
+    distance = serializers.FloatField(read_only=True)
+    delivery_quote = serializers.SerializerMethodField()
+    
+    class Meta(StoreListSerializer.Meta):
+        fields = StoreListSerializer.Meta.fields + ('distance', 'delivery_quote')
+    
+    def get_delivery_quote(self, obj):
+        quote = self.context.get('quotes', {}).get(obj.pk)
+        if quote is None:
+            return None
+        return {'delivery_fee': str(quote.delivery_fee), 'eta_minutes': quote.eta_minutes}
@@ -0,0 +1,43 @@
+"""
+QuickBite Connect - Store Signals
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from config import search
+from config.caching import invalidate
+from .models import Store, StoreCategory, StoreCategoryMapping, StoreOpeningInterval
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store_cache(sender, **kwargs):
+    """Product payloads embed store name/slug, so both namespaces go"""
+    invalidate('stores', 'products')
+
+
+@receiver(post_save, sender=StoreCategory)
+@receiver(post_delete, sender=StoreCategory)
+def invalidate_store_category_cache(sender, **kwargs):
+    invalidate('store_categories', 'stores')
+
+
+@receiver(post_save, sender=StoreCategoryMapping)
+@receiver(post_delete, sender=StoreCategoryMapping)
+def invalidate_store_mapping_cache(sender, **kwargs):
+    invalidate('stores')
+
+
+@receiver(post_save, sender=Store)
+def index_store(sender, instance, update_fields=None, **kwargs):
+    search.index_instance(instance, update_fields)
+
+
+@receiver(post_delete, sender=Store)
+def unindex_store(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+@receiver(post_save, sender=Store)
+def compile_store_schedule(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'business_hours', 'timezone'} & set(update_fields):
+        StoreOpeningInterval.rebuild([instance])
@@ -1,3 +1,267 @@
-from django.test import TestCase
+"""
+QuickBite Connect - Store Tests
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from config.testing import make_owner, make_store
+from users.models import Address, User
+from orders.models import Order, OrderItem
+from .geo import covering_geohashes, encode_geohash, haversine_miles
+from .models import Store, StoreCategory, StoreOpeningInterval
+from .schedule import MINUTES_PER_DAY, MINUTES_PER_WEEK, ScheduleError, compile_hours
+from .seeding import SeedPlan, build_orders, generate
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'store-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CatalogCacheTests(TestCase):
+    """Public catalog responses are cached and invalidated on writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.store = make_store(cls.owner)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_store_list_is_served_from_cache(self):
+        first = self.client.get('/api/stores/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/stores/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get('/api/stores/?city=New York')
+        response = self.client.get('/api/stores/?city=Boston')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_open_now_listings_expire_with_the_minute(self):
+        def get_at(moment, **params):
+            with patch('django.utils.timezone.now', return_value=datetime.fromisoformat(moment)):
+                return self.client.get('/api/stores/', params)['X-Cache']
+
+        self.assertEqual(get_at('2025-06-06T19:00:05+00:00', open_now='true'), 'MISS')
+        self.assertEqual(get_at('2025-06-06T19:00:55+00:00', open_now='true'), 'HIT')
+        self.assertEqual(get_at('2025-06-06T19:01:00+00:00', open_now='true'), 'MISS')
+        # An explicit moment does not depend on the clock
+        self.assertEqual(get_at('2025-06-06T19:00:05+00:00', open_at='2025-06-07T12:00:00Z'), 'MISS')
+        self.assertEqual(get_at('2025-06-06T19:05:00+00:00', open_at='2025-06-07T12:00:00Z'), 'HIT')
+
+    def test_store_save_invalidates_cached_detail(self):
+        self.client.get('/api/stores/test-store/')
+        self.store.name = 'Renamed Store'
+        self.store.save()
+        response = self.client.get('/api/stores/test-store/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Renamed Store')
+
+    def test_category_save_invalidates_category_list(self):
+        self.client.get('/api/stores/categories/')
+        StoreCategory.objects.create(name='Bakery', slug='bakery')
+        response = self.client.get('/api/stores/categories/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class NearbyStoreTests(TestCase):
+    """Geohash prefilter, radius filtering and distance ordering for /api/stores/nearby/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        # Around the equator/prime meridian corner, where every cell boundary meets
+        cls.close = cls.create_store('close', '0.005000', '0.005000', '3.00')
+        cls.across = cls.create_store('across', '-0.010000', '-0.010000', '3.00')
+        cls.small_radius = cls.create_store('small-radius', '0.020000', '0.020000', '1.00')
+        cls.far = cls.create_store('far', '0.600000', '0.600000', '100.00')
+        cls.pending = cls.create_store('pending', '0.001000', '0.001000', '3.00', status='pending')
+
+    @classmethod
+    def create_store(cls, slug, latitude, longitude, radius, status='approved'):
+        return make_store(
+            cls.owner, slug, status=status, latitude=Decimal(latitude), longitude=Decimal(longitude),
+            delivery_radius=Decimal(radius)
+        )
+
+    def nearby(self, **params):
+        return APIClient().get('/api/stores/nearby/', params)
+
+    def test_geohash_encoding_at_cell_edges(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        # A point on a cell edge belongs to the cell above/right of it
+        self.assertEqual(encode_geohash(0, 0), 's0000000')
+        self.assertEqual(encode_geohash(-0.000001, -0.000001), '7zzzzzzz')
+        self.assertEqual(encode_geohash(-90, -180), '00000000')
+        self.assertEqual(encode_geohash(90, 180), 'zzzzzzzz')
+        self.assertEqual(self.close.geohash, encode_geohash(self.close.latitude, self.close.longitude))
+
+        # A search circle over the corner is covered by all four cells around it
+        cells = covering_geohashes(0, 0, 2)
+        self.assertEqual({cell[0] for cell in cells}, {'7', 'k', 'e', 's'})
+        for store in (self.close, self.across):
+            self.assertTrue(any(store.geohash.startswith(cell) for cell in cells))
+
+    def test_radius_filtering_and_distance_ordering(self):
+        response = self.nearby(lat='0.0', lng='0.0')
+
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results']
+        # small-radius is 1.95 miles away but only delivers within 1; far is
+        # beyond the search radius; pending is not approved
+        self.assertEqual([row['slug'] for row in rows], ['close', 'across'])
+        distances = [row['distance'] for row in rows]
+        self.assertEqual(distances, sorted(distances))
+        self.assertAlmostEqual(distances[0], haversine_miles(0, 0, 0.005, 0.005), places=3)
+
+        self.assertEqual(
+            [row['slug'] for row in self.nearby(lat='0.02', lng='0.02').data['results']],
+            ['small-radius', 'close', 'across']
+        )
+
+    def test_missing_or_invalid_coordinates_are_rejected(self):
+        for params in ({}, {'lat': '0.0'}, {'lat': 'north', 'lng': '0'}, {'lat': '91', 'lng': '0'},
+                       {'lat': '0', 'lng': '-180.5'}):
+            with self.subTest(params=params):
+                response = self.nearby(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+        customer = User.objects.create_user(email='customer@test.com', password='pass')
+        address = Address.objects.create(
+            user=customer, address_line1='1 Main St', city='New York', state='NY', postal_code='10001'
+        )
+        self.assertEqual(self.nearby(address=str(address.pk)).status_code, 400)
+        client = APIClient()
+        client.force_authenticate(customer)
+        response = client.get('/api/stores/nearby/', {'address': str(address.pk)})
+        self.assertEqual((response.status_code, response.data), (400, {'error': 'Address has no coordinates'}))
+
+
+class StoreScheduleTests(TestCase):
+    """business_hours compile to weekly intervals that listings filter on in SQL"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        # Late-night store in New York: Sunday 22:00 runs into Monday 02:00
+        cls.diner = cls.create_store('diner', 'America/New_York', {
+            'friday': {'open': '18:00', 'close': '02:00'},
+            'sunday': {'open': '22:00', 'close': '02:00'},
+        })
+        # Lunch and dinner in Los Angeles, closed on Sunday
+        cls.bistro = cls.create_store('bistro', 'America/Los_Angeles', {
+            'friday': [{'open': '11:00', 'close': '14:00'}, {'open': '17:00', 'close': '22:00'}],
+            'sunday': {'closed': True},
+        })
+
+    @classmethod
+    def create_store(cls, slug, zone, hours):
+        return make_store(cls.owner, slug, timezone=zone, business_hours=hours)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def open_at(self, moment):
+        response = self.client.get('/api/stores/', {'open_at': moment})
+        self.assertEqual(response.status_code, 200)
+        return sorted(store['slug'] for store in response.data['results'])
+
+    def test_compile_splits_shifts_past_the_end_of_the_week(self):
+        intervals = compile_hours({
+            'Sunday': {'open': '22:00', 'close': '02:00'},
+            'monday': [{'open': '01:00', 'close': '03:00'}, {'open': '09:00', 'close': '24:00'}],
+        })
+
+        self.assertEqual(intervals, [
+            (0, 180), (9 * 60, MINUTES_PER_DAY), (6 * MINUTES_PER_DAY + 22 * 60, MINUTES_PER_WEEK),
+        ])
+        self.assertEqual(compile_hours({}), [(0, MINUTES_PER_WEEK)])
+        for invalid in ({'funday': {'open': '09:00', 'close': '17:00'}}, {'monday': {'open': '9am'}},
+                        {'monday': {'open': '25:00', 'close': '17:00'}}, ['monday']):
+            with self.assertRaises(ScheduleError):
+                compile_hours(invalid)
+
+    def test_open_at_uses_each_store_timezone(self):
+        # Friday 2025-06-06 19:00 UTC = 15:00 in New York, 12:00 in Los Angeles
+        self.assertEqual(self.open_at('2025-06-06T19:00:00Z'), ['bistro'])
+        # Saturday 05:30 UTC = Saturday 01:30 in New York, Friday 22:30 in Los Angeles
+        self.assertEqual(self.open_at('2025-06-07T05:30:00Z'), ['diner'])
+        # Monday 05:00 UTC = Monday 01:00 in New York, after the Sunday night shift
+        self.assertEqual(self.open_at('2025-06-09T05:00:00+00:00'), ['diner'])
+        self.assertEqual(self.open_at('2025-06-09T07:00:00Z'), [])
+
+    def test_manual_close_and_schedule_changes_are_respected(self):
+        Store.objects.filter(pk=self.diner.pk).update(is_open=False)
+        self.assertEqual(self.open_at('2025-06-07T05:30:00Z'), [])
+
+        self.bistro.business_hours = {}
+        self.bistro.save(update_fields=['business_hours'])
+        self.assertEqual(self.open_at('2025-06-08T12:00:00Z'), ['bistro'])
+        self.assertEqual(StoreOpeningInterval.objects.filter(store=self.bistro).count(), 1)
+
+    def test_listing_reports_open_now_and_rejects_bad_input(self):
+        response = self.client.get('/api/stores/')
+        self.assertEqual({store['slug'] for store in response.data['results']}, {'diner', 'bistro'})
+        self.assertTrue(all('open_now' in store for store in response.data['results']))
+
+        self.assertEqual(self.client.get('/api/stores/', {'open_at': 'tomorrow'}).status_code, 400)
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f'/api/stores/{self.diner.pk}/update/',
+            {'business_hours': {'monday': {'open': '09:00', 'close': '99:00'}}, 'timezone': 'Mars/Olympus'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('business_hours', response.data)
+        self.assertIn('timezone', response.data)
+
+
+class SeedDataTests(TestCase):
+    """Load-test data is deterministic and safe to generate again"""
+
+    COUNTS = {'stores': 3, 'products': 30, 'customers': 10, 'orders': 60, 'reviews': 20, 'notifications': 30}
+
+    def plan(self, seed=7):
+        return SeedPlan(seed=seed, until=date(2025, 6, 1), **self.COUNTS)
+
+    def test_same_seed_gives_same_rows_regardless_of_chunking(self):
+        whole = generate(self.plan(), chunk_size=1000)
+        orders = list(Order.objects.order_by('id').values_list('id', 'store_id', 'total_amount', 'created_at'))
+
+        again = generate(self.plan(), chunk_size=7)
+
+        self.assertEqual(whole, again)
+        self.assertEqual(Order.objects.count(), 60)
+        self.assertEqual(
+            list(Order.objects.order_by('id').values_list('id', 'store_id', 'total_amount', 'created_at')), orders
+        )
+        other_seed = build_orders(self.plan(seed=8), range(1))[Order][0]
+        self.assertNotEqual(other_seed.id, build_orders(self.plan(), range(1))[Order][0].id)
+
+    def test_order_items_add_up_to_the_order(self):
+        plan = self.plan()
+        rows = build_orders(plan, range(20))
+
+        for order in rows[Order]:
+            lines = sum(item.subtotal for item in rows[OrderItem] if item.order_id == order.id)
+            self.assertEqual(order.subtotal, lines)
+            self.assertEqual(order.total_amount, order.subtotal + order.delivery_fee + order.tax_amount)
+            self.assertTrue(plan.start <= order.created_at < plan.end)
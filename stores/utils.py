@@ -1,38 +1,72 @@
 """
 QuickBite Connect - Store Utilities
 """
-from django.db.models import Avg, Count
+from django.db.models import (
+    Case, Count, DecimalField, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Round
+from config.caching import invalidate
 
+# Cache namespaces whose payloads include a model's rating columns
+RATING_CACHE_NAMESPACES = {
+    'stores.store': ('stores',),
+    'products.product': ('products',),
+}
 
-def update_store_rating(store):
-    """Update store's average rating"""
-    from reviews.models import StoreReview
+
+def apply_rating_change(model, pk, rating_delta, count_delta):
+    """
+    Atomically adjust a running rating sum/count and the derived average.
     
-    stats = StoreReview.objects.filter(
-        store=store,
-        is_approved=True
-    ).aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id')
-    )
+    Works for any model with rating_sum, total_reviews and average_rating
+    columns (Store, Product) using a single UPDATE with F() expressions.
+    """
+    if not rating_delta and not count_delta:
+        return
     
-    store.average_rating = stats['avg_rating'] or 0
-    store.total_reviews = stats['total_reviews'] or 0
-    store.save(update_fields=['average_rating', 'total_reviews'])
+    new_sum = F('rating_sum') + rating_delta
+    new_count = F('total_reviews') + count_delta
+    model.objects.filter(pk=pk).update(
+        rating_sum=new_sum,
+        total_reviews=new_count,
+        average_rating=Case(
+            When(total_reviews__lte=-count_delta, then=Value(0)),
+            default=Round(Cast(new_sum, FloatField()) / new_count, 2),
+            output_field=DecimalField(max_digits=3, decimal_places=2)
+        )
+    )
+    invalidate(*RATING_CACHE_NAMESPACES.get(model._meta.label_lower, ()))
 
 
-def update_product_rating(product):
-    """Update product's average rating"""
-    from reviews.models import ProductReview
-    
-    stats = ProductReview.objects.filter(
-        product=product,
-        is_approved=True
-    ).aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id')
+def derived_average_rating():
+    """Expression computing average_rating from rating_sum/total_reviews"""
+    return Case(
+        When(total_reviews__lte=0, then=Value(0)),
+        default=Round(Cast('rating_sum', FloatField()) / F('total_reviews'), 2),
+        output_field=DecimalField(max_digits=3, decimal_places=2)
     )
+
+
+def rebuild_rating_totals(model, review_model, target_field, pks=None):
+    """
+    Recompute rating totals for every row of model (or just pks) from
+    approved reviews.
     
-    product.average_rating = stats['avg_rating'] or 0
-    product.total_reviews = stats['total_reviews'] or 0
-    product.save(update_fields=['average_rating', 'total_reviews'])
\ No newline at end of file
+    Runs as two set-based UPDATEs regardless of table size; used by the
+    rebuild_ratings command, the backfill migration and update_rating().
+    """
+    approved = review_model.objects.filter(
+        **{target_field: OuterRef('pk'), 'is_approved': True}
+    ).order_by().values(target_field)
+    rows = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    rows.update(
+        rating_sum=Coalesce(
+            Subquery(approved.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()), 0
+        ),
+        total_reviews=Coalesce(
+            Subquery(approved.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0
+        )
+    )
+    updated = rows.update(average_rating=derived_average_rating())
+    invalidate(*RATING_CACHE_NAMESPACES.get(model._meta.label_lower, ()))
+    return updated
@@ -4,31 +4,106 @@ QuickBite Connect - Store Views
 from rest_framework import generics, filters, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from config.caching import CachedResponseMixin
+from config.search import RankedSearchFilter
+from orders.quotes import quote_stores
+from users.models import Address
 from .models import Store, StoreStaff, StoreCategory
+from .schedule import OpenStatusFilter
 from .serializers import (
     StoreSerializer,
     StoreCreateSerializer,
     StoreListSerializer,
+    StoreNearbySerializer,
     StoreStaffSerializer,
     StoreCategorySerializer
 )
 
 
-class StoreListView(generics.ListAPIView):
+class StoreListView(CachedResponseMixin, generics.ListAPIView):
     """API endpoint to list all approved stores"""
+    cache_namespaces = ('stores',)
+    cache_timeout = 60
     queryset = Store.objects.filter(status='approved')
     serializer_class = StoreListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OpenStatusFilter, filters.OrderingFilter, RankedSearchFilter]
     filterset_fields = ['city', 'store_type', 'is_open']
-    search_fields = ['name', 'description', 'city']
     ordering_fields = ['average_rating', 'created_at', 'name']
     ordering = ['-is_featured', '-average_rating']
+    
+    def get_cache_key(self, request):
+        key = super().get_cache_key(request)
+        if request.query_params.get('open_at'):
+            return key
+        # open_now is computed for the current time; opening hours have
+        # minute resolution, so a listing is good for the minute it was built in
+        return f'{key}:{timezone.now():%Y%m%d%H%M}'
+
+
+class StoreNearbyView(generics.ListAPIView):
+    """API endpoint to list approved stores delivering to a location"""
+    serializer_class = StoreNearbySerializer
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend, OpenStatusFilter]
+    filterset_fields = ['store_type', 'is_open']
+    
+    def get_location(self):
+        """Resolve coordinates from lat/lng or a saved address"""
+        params = self.request.query_params
+        address_id = params.get('address')
+        if address_id:
+            if not self.request.user.is_authenticated:
+                raise ValidationError({'error': 'Authentication required to use a saved address'})
+            address = get_object_or_404(Address, id=address_id, user=self.request.user)
+            if address.latitude is None or address.longitude is None:
+                raise ValidationError({'error': 'Address has no coordinates'})
+            return address.latitude, address.longitude
+        
+        try:
+            latitude = float(params['lat'])
+            longitude = float(params['lng'])
+        except (KeyError, ValueError):
+            raise ValidationError({'error': 'Valid lat and lng query parameters are required'})
+        
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'error': 'Coordinates out of range'})
+        return latitude, longitude
+    
+    def get_queryset(self):
+        latitude, longitude = self.location = self.get_location()
+        return Store.objects.filter(status='approved').nearby(
+            latitude,
+            longitude,
+            max_radius=settings.NEARBY_STORES_MAX_RADIUS
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Quote the whole page in one pass before serializing it"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        stores = list(queryset) if page is None else page
+        self.quotes = quote_stores(stores, *self.location)
+        serializer = self.get_serializer(stores, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['quotes'] = getattr(self, 'quotes', {})
+        return context
 
 
-class StoreDetailView(generics.RetrieveAPIView):
+class StoreDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     """API endpoint for store detail"""
+    cache_namespaces = ('stores',)
+    cache_timeout = 300
     queryset = Store.objects.filter(status='approved')
     serializer_class = StoreSerializer
     permission_classes = [AllowAny]
@@ -77,8 +152,10 @@ class StoreUpdateView(generics.RetrieveUpdateAPIView):
         return Store.objects.filter(owner=self.request.user)
 
 
-class StoreCategoryListView(generics.ListAPIView):
+class StoreCategoryListView(CachedResponseMixin, generics.ListAPIView):
     """API endpoint to list store categories"""
+    cache_namespaces = ('store_categories',)
+    cache_timeout = 3600
     queryset = StoreCategory.objects.filter(is_active=True)
     serializer_class = StoreCategorySerializer
     permission_classes = [AllowAny]